@@ -0,0 +1,183 @@
+# SPDX-License-Identifier: MPL-2.0
+"""Serve cached metamodels from a single zip archive, e.g. for offline deployments.
+
+Members of the archive are named after the host and path of their URL, e.g.
+`secorolab.github.io/metamodels/languages/python.json`, so an archive needs no URL map.
+"""
+
+import argparse
+import gzip
+import io
+import lzma
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+import urllib.response
+import zipfile
+from email.message import EmailMessage
+from os.path import join, relpath
+from socket import _GLOBAL_DEFAULT_TIMEOUT
+
+from rdf_utils.caching import PKG_CACHE_ROOT
+from rdf_utils.http_pool import build_pooled_opener
+from rdf_utils.resolver import (
+    COMPRESSION_SUFFIXES,
+    get_connection_pool,
+    get_default_url_map,
+    split_url_segments,
+)
+
+DEFAULT_ARCHIVE_PATH = join(PKG_CACHE_ROOT, "cache-bundle.zip")
+_DECOMPRESS_FUNCS = {"gzip": gzip.decompress, "lzma": lzma.decompress}
+
+
+def get_archive_member_name(url: str) -> str:
+    """Name of the archive member for a URL, i.e. its host and path without the scheme.
+
+    Examples:
+        >>> get_archive_member_name("https://secorolab.github.io/metamodels/a.json")
+        'secorolab.github.io/metamodels/a.json'
+    """
+    return "/".join(split_url_segments(url)[1:])
+
+
+class ArchiveResolver(urllib.request.OpenerDirector):
+    """
+    An [`OpenerDirector`](urllib.request.OpenerDirector) serving URLs from a zip archive.
+
+    The archive's central directory is read once, after which each request is a dictionary
+    lookup and a read at a known offset, without extracting files.
+    Archives can be built with [`build_cache_archive`](rdf_utils.archive.build_cache_archive).
+    Like for [`IriToFileResolver`](rdf_utils.resolver.IriToFileResolver), members compressed
+    with gzip or lzma are found with a ".gz" or ".xz" suffix and decompressed.
+
+    Parameters:
+        archive_path: path of the zip archive
+        fallback: if true, URLs not in the archive are opened with the default opener, which
+                  reuses connections from the pool shared with
+                  [`IriToFileResolver`](rdf_utils.resolver.IriToFileResolver),
+                  otherwise a `URLError` is raised
+    """
+
+    def __init__(self, archive_path: str = DEFAULT_ARCHIVE_PATH, fallback: bool = True):
+        super().__init__()
+        self.default_opener = build_pooled_opener(get_connection_pool())
+        self.archive_path = archive_path
+        self._fallback = fallback
+        self._archive = zipfile.ZipFile(archive_path)
+        # ZipFile handles concurrent reads, but not reads concurrent with closing
+        self._lock = threading.Lock()
+        self._empty_header = EmailMessage()  # header expected by addinfourl
+
+    def __contains__(self, url: str) -> bool:
+        return self._find_member(url) is not None
+
+    def _find_member(self, url: str) -> tuple[zipfile.ZipInfo, str | None] | None:
+        member_name = get_archive_member_name(url)
+        member_info = self._archive.NameToInfo.get(member_name)
+        if member_info is not None and not member_info.is_dir():
+            return member_info, None
+        for compression, suffix in COMPRESSION_SUFFIXES.items():
+            member_info = self._archive.NameToInfo.get(member_name + suffix)
+            if member_info is not None and not member_info.is_dir():
+                return member_info, compression
+        return None
+
+    def open(self, fullurl, data=None, timeout=_GLOBAL_DEFAULT_TIMEOUT):
+        if isinstance(fullurl, str):
+            url_req = urllib.request.Request(fullurl)
+        elif isinstance(fullurl, urllib.request.Request):
+            url_req = fullurl
+        else:
+            raise TypeError(
+                f"expected URL of type 'str' or 'urllib.request.Request', got type '{type(fullurl)}'"
+            )
+
+        member = self._find_member(url_req.full_url)
+        if member is not None:
+            member_info, compression = member
+            with self._lock:
+                content = self._archive.read(member_info)
+            if compression is not None:
+                content = _DECOMPRESS_FUNCS[compression](content)
+            return urllib.response.addinfourl(
+                io.BytesIO(content), headers=self._empty_header, url=url_req.full_url, code=200
+            )
+
+        if not self._fallback:
+            raise urllib.error.URLError(f"'{url_req.full_url}' not in '{self.archive_path}'")
+        return self.default_opener.open(url_req, data=data, timeout=timeout)
+
+    def close(self) -> None:
+        """Close the archive file."""
+        with self._lock:
+            self._archive.close()
+        super().close()
+
+
+def build_cache_archive(
+    archive_path: str = DEFAULT_ARCHIVE_PATH,
+    url_map: dict[str, str] | None = None,
+    compression: int = zipfile.ZIP_DEFLATED,
+) -> int:
+    """Pack the files cached by an [`IriToFileResolver`](rdf_utils.resolver.IriToFileResolver)
+    into a zip archive for [`ArchiveResolver`](rdf_utils.archive.ArchiveResolver).
+
+    Hidden files, e.g. download locks and partial downloads, are skipped.
+
+    Parameters:
+        archive_path: path of the archive to write, replaced if it exists
+        url_map: URL prefix to local directory mapping of the resolver.
+                 Default: [`get_default_url_map`](rdf_utils.resolver.get_default_url_map)
+        compression: `zipfile` compression method, e.g. `ZIP_STORED` for faster reads
+
+    Returns:
+        number of files in the archive
+    """
+    if url_map is None:
+        url_map = get_default_url_map()
+
+    members: dict[str, str] = {}
+    for prefix, directory in url_map.items():
+        prefix_name = get_archive_member_name(prefix)
+        for dir_path, dir_names, file_names in os.walk(directory):
+            dir_names[:] = sorted(name for name in dir_names if not name.startswith("."))
+            for file_name in sorted(file_names):
+                if file_name.startswith("."):
+                    continue
+                file_path = join(dir_path, file_name)
+                rel_path = relpath(file_path, directory).replace(os.sep, "/")
+                members[f"{prefix_name}/{rel_path}"] = file_path
+
+    tmp_path = f"{archive_path}.part"
+    with zipfile.ZipFile(tmp_path, "w", compression=compression) as archive:
+        for member_name, file_path in members.items():
+            archive.write(file_path, arcname=member_name)
+    os.replace(tmp_path, archive_path)
+    return len(members)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point for building a cache archive."""
+    parser = argparse.ArgumentParser(
+        prog="rdf-utils-bundle",
+        description="Pack the rdf-utils resolver cache into a zip archive for offline use",
+    )
+    parser.add_argument(
+        "archive", nargs="?", default=DEFAULT_ARCHIVE_PATH, help="path of the archive to write"
+    )
+    parser.add_argument(
+        "--stored", action="store_true", help="store files uncompressed for faster reads"
+    )
+    args = parser.parse_args(argv)
+
+    compression = zipfile.ZIP_STORED if args.stored else zipfile.ZIP_DEFLATED
+    num_files = build_cache_archive(args.archive, compression=compression)
+    print(f"packed {num_files} files into '{args.archive}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
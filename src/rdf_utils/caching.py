@@ -1,30 +1,719 @@
 # SPDX-License-Identifier: MPL-2.0
 """Utilites for caching file contents"""
 
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
 import urllib.request
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from os.path import join
 from socket import _GLOBAL_DEFAULT_TIMEOUT
+from typing import Any, AnyStr, Generic, TypeVar
 
-__FILE_LOADER_CACHE = {}
-__URL_CONTENT_CACHE = {}
+import platformdirs
+from rdflib import Graph
+from rdflib.graph import ModificationException
 
+from rdf_utils import __version__
+from rdf_utils.metrics import EVENT_DOWNLOAD, EVENT_HIT, EVENT_MISS, get_metrics, get_url_origin
 
-def read_file_and_cache(filepath: str) -> str:
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PKG_CACHE_ROOT = join(platformdirs.user_cache_dir(), "rdf-utils")
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_GRAPH_CACHE_MAX_ENTRIES = 64
+
+T = TypeVar("T")
+
+
+def _content_size(content: str | bytes) -> int:
+    """Size of bytes or a string's UTF-8 encoding, without encoding pure ASCII strings."""
+    if isinstance(content, bytes) or content.isascii():
+        return len(content)
+    return len(content.encode("utf-8"))
+
+
+@contextmanager
+def file_lock(lock_path: str) -> Iterator[None]:
+    """Hold an exclusive advisory lock on a file, blocking until other processes release it.
+
+    The lock file is created if needed and left in place afterwards, since removing it could
+    let two processes lock different files for the same path.
+
+    Parameters:
+        lock_path: path of the lock file
+    """
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    # LK_LOCK only retries for about 10 seconds before raising
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _Flight:
+    """A call in progress in [`SingleFlight`](rdf_utils.caching.SingleFlight)."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls for the same key.
+
+    The first thread to call [`do`](rdf_utils.caching.SingleFlight.do) for a key runs the
+    function, other threads calling with the same key meanwhile wait for it to finish and
+    receive the same result or exception. Once the call finishes, the next call for the key
+    runs the function again, so results should be cached by the function itself.
+    """
+
+    _lock: threading.Lock
+    _flights: dict[Hashable, _Flight]
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Run `func` unless a call for `key` is already in progress, then wait for that one.
+
+        Parameters:
+            key: identifies calls that produce the same result, e.g. a URL
+            func: function to produce the result
+
+        Returns:
+            return value of `func` from this or the concurrent call
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class ContentCache(Generic[AnyStr]):
+    """Size-bounded cache of string or bytes contents with least-recently-used (LRU) eviction.
+
+    Contents larger than `max_bytes` are returned to the caller but never stored.
+    Entries may carry a validation token, e.g. a file's modification time, so that
+    outdated entries are dropped on lookup instead of clearing the whole cache.
+    All operations are thread-safe.
+
+    Attributes:
+        hits: number of lookups that found an entry
+        misses: number of lookups that did not find a valid entry
+        evictions: number of entries removed to stay within the limits
+        invalidations: number of entries dropped because their token did not match
+        current_bytes: total size of the stored contents, strings are counted in UTF-8
+
+    Parameters:
+        max_bytes: limit on the total size of stored contents, `None` for no limit
+        max_entries: limit on the number of stored contents, `None` for no limit
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    current_bytes: int
+    _entries: OrderedDict[str, tuple[AnyStr, int, Hashable | None]]
+    _max_bytes: int | None
+    _max_entries: int | None
+    _lock: threading.RLock
+
+    def __init__(self, max_bytes: int | None = None, max_entries: int | None = None) -> None:
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._max_bytes = max_bytes
+        self._max_entries = max_entries
+
+    @property
+    def max_bytes(self) -> int | None:
+        """Limit on the total size of stored contents, `None` for no limit."""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int | None) -> None:
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    @property
+    def max_entries(self) -> int | None:
+        """Limit on the number of stored contents, `None` for no limit."""
+        return self._max_entries
+
+    @max_entries.setter
+    def max_entries(self, value: int | None) -> None:
+        with self._lock:
+            self._max_entries = value
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, token: Hashable | None = None) -> AnyStr | None:
+        """Look up a stored content and mark it as most recently used.
+
+        Parameters:
+            key: key of the entry
+            token: if not `None`, entries stored with a different token are discarded
+
+        Returns:
+            the stored content or `None` if `key` is not in the cache or is outdated
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if token is not None and entry[2] != token:
+                self.discard(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key: str) -> AnyStr | None:
+        """Look up a stored content without updating the counters or the LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def put(self, key: str, content: AnyStr, token: Hashable | None = None) -> None:
+        """Store a content, evicting least recently used entries if a limit is exceeded.
+
+        Parameters:
+            key: key of the entry
+            content: content to store
+            token: validation token to compare against in [`get`](rdf_utils.caching.ContentCache.get)
+        """
+        size = _content_size(content)
+        with self._lock:
+            self.discard(key)
+            if self._max_bytes is not None and size > self._max_bytes:
+                return
+
+            self._entries[key] = (content, size, token)
+            self.current_bytes += size
+            self._evict()
+
+    def discard(self, key: str) -> bool:
+        """Remove an entry if it exists.
+
+        Returns:
+            `True` if an entry was removed
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+
+            self.current_bytes -= entry[1]
+            return True
+
+    def clear(self) -> None:
+        """Remove all entries. Does not reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Snapshot of the cache counters.
+
+        Returns:
+            mapping with keys "hits", "misses", "evictions", "invalidations", "entries" and "bytes"
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+            }
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self._max_entries is not None and len(self._entries) > self._max_entries)
+            or (self._max_bytes is not None and self.current_bytes > self._max_bytes)
+        ):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write to a temporary file in the same directory, then rename it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class UrlDiskCache:
+    """Persistent cache of URL responses, revalidated with HTTP conditional requests.
+
+    Each URL is stored as two files named after the SHA-256 hash of the URL: the response body
+    and a JSON file with the URL, the `ETag` and `Last-Modified` response headers and the time
+    the response was last confirmed by the server. Expired entries are revalidated with
+    `If-None-Match`/`If-Modified-Since` requests, so an unchanged resource costs a single
+    "304 Not Modified" response instead of a full download.
+
+    Attributes:
+        root: directory containing the cache files
+        ttl: duration in seconds in which a stored response is trusted without contacting
+             the server. `0` always revalidates, `None` trusts stored responses forever.
+
+    Parameters:
+        root: directory for the cache files. Default: `http/` under `PKG_CACHE_ROOT`,
+              e.g. `$HOME/.cache/rdf-utils/http/` on Linux
+        ttl: see attribute
+    """
+
+    root: str
+    ttl: float | None
+
+    def __init__(self, root: str | None = None, ttl: float | None = 0.0) -> None:
+        self.root = root if root is not None else join(PKG_CACHE_ROOT, "http")
+        self.ttl = ttl
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return join(self.root, f"{url_hash}.body"), join(self.root, f"{url_hash}.json")
+
+    def load(self, url: str) -> tuple[bytes, dict[str, Any]] | None:
+        """Load a stored response.
+
+        Returns:
+            the response body and its metadata, or `None` if the URL is not stored
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            with open(body_path, "rb") as body_file:
+                body = body_file.read()
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("url") != url:
+            return None
+        return body, meta
+
+    def store(self, url: str, body: bytes, etag: str | None, last_modified: str | None) -> None:
+        """Store a response body with its validators, replacing any previous entry."""
+        os.makedirs(self.root, exist_ok=True)
+        body_path, _ = self._paths(url)
+        _write_atomic(body_path, body)
+        self._store_meta(
+            url, {"url": url, "etag": etag, "last_modified": last_modified, "fetched": time.time()}
+        )
+
+    def _store_meta(self, url: str, meta: dict[str, Any]) -> None:
+        _, meta_path = self._paths(url)
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def fetch(self, url: str, timeout: float = _GLOBAL_DEFAULT_TIMEOUT) -> bytes:
+        """Return the response body for a URL, downloading or revalidating it if needed.
+
+        Parameters:
+            url: URL to be opened with urllib
+            timeout: duration in seconds to wait for response
+
+        Raises:
+            urllib.error.URLError: when the request fails
+        """
+        entry = self.load(url)
+        url_req = urllib.request.Request(url)
+        url_req.add_header("User-Agent", f"rdf-utils/{__version__}")
+        if entry is not None:
+            body, meta = entry
+            if self.ttl is None or time.time() - meta.get("fetched", 0.0) < self.ttl:
+                return body
+
+            if meta.get("etag"):
+                url_req.add_header("If-None-Match", meta["etag"])
+            if meta.get("last_modified"):
+                url_req.add_header("If-Modified-Since", meta["last_modified"])
+
+        metrics = get_metrics()
+        start = time.perf_counter() if metrics.enabled else 0.0
+        try:
+            with urllib.request.urlopen(url_req, timeout=timeout) as f:
+                body = f.read()
+                headers = f.headers
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or entry is None:
+                raise
+            e.close()
+
+            # not modified, stored response is confirmed until the TTL expires again
+            body, meta = entry
+            meta["fetched"] = time.time()
+            self._store_meta(url, meta)
+            return body
+
+        if metrics.enabled:
+            metrics.record(
+                "url_cache",
+                get_url_origin(url),
+                EVENT_DOWNLOAD,
+                time.perf_counter() - start,
+                len(body),
+            )
+
+        etag = headers.get("ETag") if headers is not None else None
+        last_modified = headers.get("Last-Modified") if headers is not None else None
+        self.store(url, body, etag=etag, last_modified=last_modified)
+        return body
+
+
+class ReadOnlyGraph(Graph):
+    """Graph sharing the store of another graph that rejects all modifications.
+
+    Raises:
+        rdflib.graph.ModificationException: on any attempt to add, remove or parse triples,
+            or to bind namespaces
+
+    Parameters:
+        graph: graph to expose
+    """
+
+    def __init__(self, graph: Graph) -> None:
+        super().__init__(
+            store=graph.store,
+            identifier=graph.identifier,
+            namespace_manager=graph.namespace_manager,
+        )
+
+    def add(self, *args: Any, **kwargs: Any) -> Any:
+        raise ModificationException()
+
+    def addN(self, *args: Any, **kwargs: Any) -> Any:
+        raise ModificationException()
+
+    def remove(self, *args: Any, **kwargs: Any) -> Any:
+        raise ModificationException()
+
+    def set(self, *args: Any, **kwargs: Any) -> Any:
+        raise ModificationException()
+
+    def parse(self, *args: Any, **kwargs: Any) -> Any:
+        raise ModificationException()
+
+    def update(self, *args: Any, **kwargs: Any) -> Any:
+        raise ModificationException()
+
+    def bind(self, *args: Any, **kwargs: Any) -> Any:
+        raise ModificationException()
+
+    def __iadd__(self, other: Any) -> Any:
+        raise ModificationException()
+
+    def __isub__(self, other: Any) -> Any:
+        raise ModificationException()
+
+
+def copy_graph(graph: Graph) -> Graph:
+    """Copy the triples and namespace bindings of a graph into a new in-memory graph."""
+    new_graph = Graph(identifier=graph.identifier)
+    for prefix, namespace in graph.namespaces():
+        new_graph.bind(prefix, namespace, override=True, replace=True)
+    new_graph += graph
+    return new_graph
+
+
+def _parse_graph(source: str, fmt: str) -> Graph:
+    graph = Graph()
+    graph.parse(source, format=fmt)
+    return graph
+
+
+class GraphCache:
+    """Least-recently-used cache of parsed RDF graphs keyed by source and format.
+
+    Cached graphs are shared between callers, so they are only handed out as
+    [`ReadOnlyGraph`](rdf_utils.caching.ReadOnlyGraph) views or as copies.
+    Concurrent requests for the same uncached source share a single parse.
+    Passing [`parse_with_snapshot`](rdf_utils.snapshot.parse_with_snapshot) as `parse_func`
+    additionally keeps binary snapshots of the parsed graphs on disk.
+
+    Attributes:
+        max_entries: limit on the number of cached graphs, `None` for no limit
+        max_triples: limit on the total number of cached triples, `None` for no limit
+        hits: number of lookups that found a parsed graph
+        misses: number of lookups that parsed the source
+        evictions: number of graphs removed to stay within the limits
+
+    Parameters:
+        max_entries: see attribute
+        max_triples: see attribute
+        parse_func: function to parse a source in a format into a new graph.
+                    Default: `Graph.parse`
+    """
+
+    max_entries: int | None
+    max_triples: int | None
+    hits: int
+    misses: int
+    evictions: int
+    _graphs: OrderedDict[tuple[str, str], tuple[Graph, int]]
+    _num_triples: int
+    _lock: threading.RLock
+    _flights: SingleFlight
+    _parse_func: Callable[[str, str], Graph]
+
+    def __init__(
+        self,
+        max_entries: int | None = DEFAULT_GRAPH_CACHE_MAX_ENTRIES,
+        max_triples: int | None = None,
+        parse_func: Callable[[str, str], Graph] | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_triples = max_triples
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._graphs = OrderedDict()
+        self._num_triples = 0
+        self._lock = threading.RLock()
+        self._flights = SingleFlight()
+        self._parse_func = parse_func if parse_func is not None else _parse_graph
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._graphs
+
+    def get(self, source: str, fmt: str, copy: bool = False) -> Graph:
+        """Return the graph parsed from a source, parsing it on the first request.
+
+        Parameters:
+            source: path or URL of the RDF document, passed to `Graph.parse`
+            fmt: format of the RDF document, e.g. "turtle" or "json-ld"
+            copy: if true, return a modifiable copy instead of a read-only view
+
+        Returns:
+            [`ReadOnlyGraph`](rdf_utils.caching.ReadOnlyGraph) view or copy of the parsed graph
+        """
+        key = (source, fmt)
+        with self._lock:
+            entry = self._graphs.get(key)
+            if entry is not None:
+                self._graphs.move_to_end(key)
+                self.hits += 1
+
+        if entry is None:
+            graph = self._flights.do(key, partial(self._parse, source, fmt))
+        else:
+            graph = entry[0]
+
+        if copy:
+            return copy_graph(graph)
+        return ReadOnlyGraph(graph)
+
+    def _parse(self, source: str, fmt: str) -> Graph:
+        key = (source, fmt)
+        with self._lock:
+            entry = self._graphs.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        graph = self._parse_func(source, fmt)
+        self.put(source, fmt, graph)
+        return graph
+
+    def put(self, source: str, fmt: str, graph: Graph) -> None:
+        """Store a parsed graph. The graph must not be modified afterwards."""
+        key = (source, fmt)
+        size = len(graph)
+        with self._lock:
+            self.discard(source, fmt)
+            self._graphs[key] = (graph, size)
+            self._num_triples += size
+            self._evict()
+
+    def discard(self, source: str, fmt: str) -> bool:
+        """Remove a graph if it exists.
+
+        Returns:
+            `True` if a graph was removed
+        """
+        with self._lock:
+            entry = self._graphs.pop((source, fmt), None)
+            if entry is None:
+                return False
+            self._num_triples -= entry[1]
+            return True
+
+    def clear(self) -> None:
+        """Remove all graphs. Does not reset the counters."""
+        with self._lock:
+            self._graphs.clear()
+            self._num_triples = 0
+
+    def stats(self) -> dict[str, int]:
+        """Snapshot of the cache counters.
+
+        Returns:
+            mapping with keys "hits", "misses", "evictions", "entries" and "triples"
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._graphs),
+                "triples": self._num_triples,
+            }
+
+    def _evict(self) -> None:
+        # keep the most recent graph even if it exceeds the triple limit on its own
+        while len(self._graphs) > 1 and (
+            (self.max_entries is not None and len(self._graphs) > self.max_entries)
+            or (self.max_triples is not None and self._num_triples > self.max_triples)
+        ):
+            _, (_, size) = self._graphs.popitem(last=False)
+            self._num_triples -= size
+            self.evictions += 1
+
+
+__FILE_LOADER_CACHE: ContentCache[str] = ContentCache(max_bytes=DEFAULT_CACHE_MAX_BYTES)
+__URL_CONTENT_CACHE: ContentCache[str] = ContentCache(max_bytes=DEFAULT_CACHE_MAX_BYTES)
+__URL_DISK_CACHE: UrlDiskCache | None = None
+__URL_FLIGHTS = SingleFlight()
+__GRAPH_CACHE = GraphCache()
+
+
+def get_file_cache() -> ContentCache[str]:
+    """Cache used by [`read_file_and_cache`](rdf_utils.caching.read_file_and_cache)"""
+    return __FILE_LOADER_CACHE
+
+
+def get_url_cache() -> ContentCache[str]:
+    """Cache used by [`read_url_and_cache`](rdf_utils.caching.read_url_and_cache)"""
+    return __URL_CONTENT_CACHE
+
+
+def get_graph_cache() -> GraphCache:
+    """Cache used by [`parse_graph_and_cache`](rdf_utils.caching.parse_graph_and_cache)"""
+    return __GRAPH_CACHE
+
+
+def get_url_disk_cache() -> UrlDiskCache | None:
+    """Persistent cache used by [`read_url_and_cache`](rdf_utils.caching.read_url_and_cache)"""
+    return __URL_DISK_CACHE
+
+
+def set_url_disk_cache(disk_cache: UrlDiskCache | None) -> None:
+    """Set the persistent cache used by [`read_url_and_cache`](rdf_utils.caching.read_url_and_cache)
+
+    Parameters:
+        disk_cache: persistent cache, e.g. `UrlDiskCache(ttl=3600)`, or `None` to disable it
+    """
+    global __URL_DISK_CACHE
+    __URL_DISK_CACHE = disk_cache
+
+
+def _stat_token(stat: os.stat_result) -> tuple[int, int, int]:
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def read_file_and_cache(filepath: str, check_stat: bool = True) -> str:
     """Read and cache string contents of files for quick access and reducing IO operations.
 
+    Parameters:
+        filepath: path of the file to read
+        check_stat: if true, compare the file's modification time, size and inode against
+                    the cached entry with a single `os.stat` call and re-read the file if it
+                    changed. Set to false in hot loops where files are known not to change.
+
     Note:
-        May need "forgetting" mechanism if too many large files are stored. Should be fine
-        for loading JSON metamodels and SHACL constraints in Turtle format.
+        Contents are stored in the [`ContentCache`](rdf_utils.caching.ContentCache) returned by
+        [`get_file_cache`](rdf_utils.caching.get_file_cache), which by default holds up to
+        `DEFAULT_CACHE_MAX_BYTES` and forgets the least recently used files beyond that.
     """
-    if filepath in __FILE_LOADER_CACHE:
-        return __FILE_LOADER_CACHE[filepath]
+    token = _stat_token(os.stat(filepath)) if check_stat else None
+    file_content = __FILE_LOADER_CACHE.get(filepath, token=token)
+    if file_content is not None:
+        return file_content
 
     with open(filepath) as infile:
+        # stat the opened file so that the token describes the content actually read
+        token = _stat_token(os.fstat(infile.fileno()))
         file_content = infile.read()
 
     if isinstance(file_content, bytes):
         file_content = file_content.decode("utf-8")
 
-    __FILE_LOADER_CACHE[filepath] = file_content
+    __FILE_LOADER_CACHE.put(filepath, file_content, token=token)
     return file_content
 
 
@@ -36,15 +725,120 @@ def read_url_and_cache(url: str, timeout: float = _GLOBAL_DEFAULT_TIMEOUT) -> st
         timeout: duration in seconds to wait for response. Only works for HTTP, HTTPS & FTP.
                  Default: `socket._GLOBAL_DEFAULT_TIMEOUT` will be used,
                  which usually means no timeout.
+
+    Note:
+        Responses are stored in the [`ContentCache`](rdf_utils.caching.ContentCache) returned by
+        [`get_url_cache`](rdf_utils.caching.get_url_cache). If a persistent cache is set with
+        [`set_url_disk_cache`](rdf_utils.caching.set_url_disk_cache), responses missing in memory
+        are loaded from or revalidated against the disk before being downloaded.
+        Concurrent calls for the same uncached URL share a single download.
+        Hits, misses and downloads are recorded in the [`Metrics`](rdf_utils.metrics.Metrics)
+        returned by [`get_metrics`](rdf_utils.metrics.get_metrics) if they are enabled.
     """
-    if url in __URL_CONTENT_CACHE:
-        return __URL_CONTENT_CACHE[url]
+    metrics = get_metrics()
+    start = time.perf_counter() if metrics.enabled else 0.0
+    url_content = __URL_CONTENT_CACHE.get(url)
+    if url_content is None:
+        url_content = __URL_FLIGHTS.do(url, lambda: _fetch_url_and_cache(url, timeout))
+        event = EVENT_MISS
+    else:
+        event = EVENT_HIT
 
-    with urllib.request.urlopen(url, timeout=timeout) as f:
-        url_content = f.read()
+    if metrics.enabled:
+        metrics.record("url_cache", get_url_origin(url), event, time.perf_counter() - start)
+    return url_content
+
+
+def _fetch_url_and_cache(url: str, timeout: float) -> str:
+    # another thread may have filled the cache between the lookup and joining the flight
+    url_content = __URL_CONTENT_CACHE.peek(url)
+    if url_content is not None:
+        return url_content
+
+    if __URL_DISK_CACHE is not None:
+        url_content = __URL_DISK_CACHE.fetch(url, timeout=timeout)
+    else:
+        metrics = get_metrics()
+        start = time.perf_counter() if metrics.enabled else 0.0
+        with urllib.request.urlopen(url, timeout=timeout) as f:
+            url_content = f.read()
+        if metrics.enabled:
+            metrics.record(
+                "url_cache",
+                get_url_origin(url),
+                EVENT_DOWNLOAD,
+                time.perf_counter() - start,
+                len(url_content),
+            )
 
     if isinstance(url_content, bytes):
         url_content = url_content.decode("utf-8")
 
-    __URL_CONTENT_CACHE[url] = url_content
+    __URL_CONTENT_CACHE.put(url, url_content)
     return url_content
+
+
+def parse_graph_and_cache(source: str, fmt: str, copy: bool = False) -> Graph:
+    """Parse and cache RDF graphs, e.g. metamodels and SHACL constraints loaded repeatedly.
+
+    Parameters:
+        source: path or URL of the RDF document, passed to `Graph.parse`
+        fmt: format of the RDF document, e.g. "turtle" or "json-ld"
+        copy: if true, return a modifiable copy instead of a read-only view
+
+    Returns:
+        [`ReadOnlyGraph`](rdf_utils.caching.ReadOnlyGraph) view or copy of the parsed graph,
+        stored in the [`GraphCache`](rdf_utils.caching.GraphCache) returned by
+        [`get_graph_cache`](rdf_utils.caching.get_graph_cache)
+    """
+    return __GRAPH_CACHE.get(source, fmt, copy=copy)
+
+
+async def read_url_and_cache_async(url: str, timeout: float = _GLOBAL_DEFAULT_TIMEOUT) -> str:
+    """Asynchronous counterpart of [`read_url_and_cache`](rdf_utils.caching.read_url_and_cache)
+
+    Cache hits return immediately, downloads run in a worker thread and fill the same caches
+    as the synchronous API.
+
+    Parameters:
+        url: URL to be opened with urllib
+        timeout: duration in seconds to wait for response
+    """
+    metrics = get_metrics()
+    start = time.perf_counter() if metrics.enabled else 0.0
+    url_content = __URL_CONTENT_CACHE.get(url)
+    if url_content is None:
+        url_content = await asyncio.to_thread(
+            __URL_FLIGHTS.do, url, partial(_fetch_url_and_cache, url, timeout)
+        )
+        event = EVENT_MISS
+    else:
+        event = EVENT_HIT
+
+    if metrics.enabled:
+        metrics.record("url_cache", get_url_origin(url), event, time.perf_counter() - start)
+    return url_content
+
+
+async def read_urls_and_cache_async(
+    urls: Iterable[str],
+    timeout: float = _GLOBAL_DEFAULT_TIMEOUT,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[str]:
+    """Read and cache text responses from multiple URLs concurrently.
+
+    Parameters:
+        urls: URLs to be opened with urllib
+        timeout: duration in seconds to wait for each response
+        max_concurrency: maximum number of downloads in progress at the same time
+
+    Returns:
+        responses in the same order as `urls`
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _read(url: str) -> str:
+        async with semaphore:
+            return await read_url_and_cache_async(url, timeout=timeout)
+
+    return list(await asyncio.gather(*(_read(url) for url in urls)))
@@ -1,75 +1,219 @@
 # SPDX-License-Identifier:  MPL-2.0
-from typing import Any
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
 
-from rdflib import BNode, Graph, IdentifiedNode, Literal, Node, URIRef
+from rdflib import RDF, BNode, Graph, IdentifiedNode, Literal, Node, URIRef
 from rdflib.collection import Collection
 
 from rdf_utils.uri import try_expand_curie
 
+if TYPE_CHECKING:
+    import numpy as np
 
-def _load_list_re(
-    graph: Graph, first_node: BNode, node_set: set[IdentifiedNode], parse_uri: bool, quiet: bool
+_ListCells = dict[Node, tuple[Node | None, Node | None]]
+
+
+def get_list_cells(graph: Graph) -> _ListCells:
+    """Map every RDF list cell of a graph to its `rdf:first` and `rdf:rest` values.
+
+    Loading many lists from the same graph with this map avoids two store lookups per cell.
+    The map does not follow later changes of the graph.
+
+    Parameters:
+        graph: Graph object to index the list cells of
+
+    Returns:
+        mapping from list node to its first element and rest, `None` if missing
+    """
+    cells: _ListCells = {}
+    for cell, item in graph.subject_objects(RDF.first):
+        cells[cell] = (item, None)
+    for cell, rest in graph.subject_objects(RDF.rest):
+        cells[cell] = (cells.get(cell, (None, None))[0], rest)
+    return cells
+
+
+def _iter_list(graph: Graph, first_node: Node, cells: _ListCells | None) -> Iterator[Node]:
+    """Iterate over the elements of an RDF list like `Graph.items`, optionally using a map
+    of list cells."""
+    chain = {first_node}
+    cell: Node | None = first_node
+    while cell:
+        if cells is None:
+            item = graph.value(subject=cell, predicate=RDF.first)
+            rest = graph.value(subject=cell, predicate=RDF.rest)
+        else:
+            item, rest = cells.get(cell, (None, None))
+        if item is not None:
+            yield item
+        cell = rest
+        if cell in chain:
+            raise ValueError("List contains a recursive rdf:rest reference")
+        chain.add(cell)
+
+
+def _load_list(
+    graph: Graph, first_node: BNode, parse_uri: bool, quiet: bool, cells: _ListCells | None
 ) -> list[Any]:
-    """Recursive internal function to extract list of lists from RDF list containers."""
-    list_data = []
-    for node in graph.items(list=first_node):
-        if isinstance(node, URIRef):
-            list_data.append(node)
-            continue
-
-        if isinstance(node, Literal):
-            node_val = node.toPython()
-            if not isinstance(node_val, str):
-                list_data.append(node_val)
+    """Extract list of lists from RDF list containers, with an explicit stack of the nested
+    lists being loaded."""
+    node_set: set[IdentifiedNode] = set()
+    root: list[Any] = []
+    stack = [(root, _iter_list(graph, first_node, cells))]
+    while stack:
+        list_data, items = stack[-1]
+        for node in items:
+            if isinstance(node, URIRef):
+                list_data.append(node)
                 continue
 
-            if not parse_uri:
-                list_data.append(node_val)
-                continue
+            if isinstance(node, Literal):
+                node_val = node.toPython()
+                if not isinstance(node_val, str):
+                    list_data.append(node_val)
+                    continue
 
-            # try to expand short-form URIs,
-            # if doesn't work then just return URIRef of the string
-            uri = try_expand_curie(
-                ns_manager=graph.namespace_manager, curie_str=node_val, quiet=quiet
-            )
-            if uri is None:
-                uri = URIRef(node_val)
+                if not parse_uri:
+                    list_data.append(node_val)
+                    continue
+
+                # try to expand short-form URIs,
+                # if doesn't work then just return URIRef of the string
+                uri = try_expand_curie(
+                    ns_manager=graph.namespace_manager, curie_str=node_val, quiet=quiet
+                )
+                if uri is None:
+                    uri = URIRef(node_val)
 
-            list_data.append(uri)
-            continue
+                list_data.append(uri)
+                continue
 
-        assert isinstance(node, BNode), (
-            f"load_collections: node '{node}' not a Literal or BNode, type: {type(node)}"
-        )
+            assert isinstance(node, BNode), (
+                f"load_collections: node '{node}' not a Literal or BNode, type: {type(node)}"
+            )
 
-        if node in node_set:
-            raise RuntimeError(f"Loop detected in collection at node: {node}")
-        node_set.add(node)
+            if node in node_set:
+                raise RuntimeError(f"Loop detected in collection at node: {node}")
+            node_set.add(node)
 
-        # recursive call
-        list_data.append(_load_list_re(graph, node, node_set, parse_uri, quiet))
+            # continue with the nested list, then with the rest of this one
+            nested: list[Any] = []
+            list_data.append(nested)
+            stack.append((nested, _iter_list(graph, node, cells)))
+            break
+        else:
+            stack.pop()
 
-    return list_data
+    return root
 
 
 def load_list_re(
-    graph: Graph, first_node: BNode, parse_uri: bool = True, quiet: bool = True
+    graph: Graph,
+    first_node: BNode,
+    parse_uri: bool = True,
+    quiet: bool = True,
+    cells: _ListCells | None = None,
 ) -> list[Any]:
-    """Recursively iterate over RDF list containers for extracting lists of lists.
+    """Iterate over nested RDF list containers for extracting lists of lists.
+
+    Nested lists are loaded without recursion, so their depth is not limited by
+    the interpreter's recursion limit.
 
     Parameters:
         graph: Graph object to extract the list(s) from
         first_node: First element in the list
         parse_uri: if True will try converting literals into URIRef
         quiet: if True will not throw exceptions other than loop detection
+        cells: list cells of `graph` from [`get_list_cells`](rdf_utils.collection.get_list_cells),
+               to look up elements without querying the graph
 
     Raises:
         RuntimeError: When a loop is detected
         ValueError: When `quiet` is `False` and short URI cannot be expanded
     """
-    node_set = set()
+    return _load_list(graph, first_node, parse_uri, quiet, cells)
+
+
+def load_list_as_array(
+    graph: Graph,
+    first_node: Node,
+    dtype: Any = float,
+    cells: _ListCells | None = None,
+) -> "np.ndarray":
+    """Load nested RDF lists of literals directly into a NumPy array.
+
+    The shape is inferred from the lengths of the first nested list at each level, then the
+    array is allocated and filled with the literal values without building Python lists.
+
+    Parameters:
+        graph: Graph object to extract the list(s) from
+        first_node: First element in the list
+        dtype: data type of the array, to which the literal values are converted
+        cells: list cells of `graph` from [`get_list_cells`](rdf_utils.collection.get_list_cells),
+               to look up elements without querying the graph
+
+    Returns:
+        array with one dimension per level of nesting
+
+    Raises:
+        RuntimeError: When a loop is detected or NumPy is not installed
+        ValueError: When the lists are ragged, or a literal is not convertible to `dtype`
+        TypeError: When an element of the innermost lists is not a literal
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("to load lists as arrays, 'numpy' must be installed")
+
+    # infer the shape along the first element of each nested list
+    shape = []
+    node_set: set[Node] = set()
+    node = first_node
+    while True:
+        items = list(_iter_list(graph, node, cells))
+        shape.append(len(items))
+        if len(items) == 0 or not isinstance(items[0], BNode):
+            break
+        node = items[0]
+        if node in node_set:
+            raise RuntimeError(f"Loop detected in collection at node: {node}")
+        node_set.add(node)
+
+    array = np.empty(shape, dtype=dtype)
+    flat = array.reshape(-1)
+    num_values = 0
+    node_set.clear()
+    # iterators over the nested lists being loaded and their numbers of elements so far
+    stack: list[list[Any]] = [[_iter_list(graph, first_node, cells), 0]]
+    while stack:
+        depth = len(stack) - 1
+        frame = stack[-1]
+        for node in frame[0]:
+            frame[1] += 1
+            if frame[1] > shape[depth]:
+                raise ValueError(f"Ragged list at level {depth}: more than {shape[depth]} elements")
+
+            if depth < len(shape) - 1:
+                if not isinstance(node, BNode):
+                    raise ValueError(f"Ragged list at level {depth}: '{node}' is not a list")
+                if node in node_set:
+                    raise RuntimeError(f"Loop detected in collection at node: {node}")
+                node_set.add(node)
+                stack.append([_iter_list(graph, node, cells), 0])
+                break
+
+            if not isinstance(node, Literal):
+                raise TypeError(f"Element '{node}' at level {depth} is not a literal")
+            flat[num_values] = node.toPython()
+            num_values += 1
+        else:
+            if frame[1] != shape[depth]:
+                raise ValueError(
+                    f"Ragged list at level {depth}: {frame[1]} instead of {shape[depth]} elements"
+                )
+            stack.pop()
 
-    return _load_list_re(graph, first_node, node_set, parse_uri, quiet)
+    return array
 
 
 def add_node_list_pred(
@@ -1,6 +1,69 @@
 # SPDX-License-Identifier:  MPL-2.0
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
 import pyshacl
-from rdflib import Dataset, Graph
+from pyshacl import ShapesGraph, Validator
+from rdflib import RDF, RDFS, SH, BNode, Graph, Literal, URIRef
+from rdflib.term import Node
+
+from rdf_utils.caching import SingleFlight, get_graph_cache, parse_graph_and_cache
+from rdf_utils.inference import RdfsClosure, clear_rdfs_closures, get_rdfs_closure
+from rdf_utils.shape_compiler import GraphIndex, ShapePredicate, compile_shape
+
+if TYPE_CHECKING:
+    from pyshacl.graph_abstraction import DataGraph
+
+DEFAULT_VALIDATOR_CACHE_SIZE = 16
+
+# shapes graph predicates whose constraints or targets may depend on any part of the data graph
+_NON_LOCAL_SHAPE_PREDICATES = (SH.sparql, SH.target, SH.rule, SH.js)
+# data graph predicates whose changes may affect targets or inferred triples of any node
+_SCHEMA_PREDICATES = (RDFS.subClassOf, RDFS.subPropertyOf, RDFS.domain, RDFS.range)
+_PATH_MODIFIERS = (SH.zeroOrMorePath, SH.oneOrMorePath, SH.zeroOrOnePath)
+_PROPERTY_PAIR_PREDICATES = (SH.equals, SH.disjoint, SH.lessThan, SH.lessThanOrEquals)
+
+_Triple = tuple[Node, Node, Node]
+# SHACL sources, ontology sources and whether shapes are compiled
+_ValidatorKey = tuple[tuple[tuple[str, str], ...], tuple[tuple[str, str], ...] | None, bool]
+# pyshacl's validation result: description text, result node and result triples, where data and
+# shapes graph nodes are wrapped as (graph, node) to be copied into the report graph.
+# Results read from a report graph have no description text
+_RawResult = tuple[str | None, Node, list[tuple[Node, Node, Any]]]
+# results are validated in batches of focus nodes if the number of violations is limited
+_FAIL_FAST_BATCH_SIZE = 32
+# pyshacl releases tested with the validation paths using pyshacl's internals
+_PYSHACL_INTERNALS_VERSIONS = ((0, 40),)
+
+
+def _has_pyshacl_internals() -> bool:
+    """Whether the installed pyshacl release is tested with the validation paths that use its
+    internals, i.e. validating only some focus nodes, keeping the raw results and rendering
+    reports later. Otherwise all validations fall back to `pyshacl.validate`."""
+    version = tuple(int(part) for part in re.findall(r"\d+", pyshacl.__version__)[:2])
+    if version not in _PYSHACL_INTERNALS_VERSIONS:
+        return False
+    try:
+        from pyshacl.graph_abstraction import DataGraph  # noqa: F401
+    except ImportError:
+        return False
+    return all(
+        hasattr(Validator, name)
+        for name in ("_run_pre_inference", "make_executor", "create_validation_report")
+    )
+
+
+_PYSHACL_INTERNALS = _has_pyshacl_internals()
+
+
+class _LiteralFocusError(Exception):
+    """A shape has a literal focus node, whose value nodes may be in other shards."""
 
 
 class ConstraintViolation(Exception):
@@ -18,31 +81,1026 @@ class ConstraintViolation(Exception):
 
 
 class SHACLViolation(ConstraintViolation):
-    """Specialized exception for SHACL violations"""
+    """Specialized exception for SHACL violations
+
+    Attributes:
+        report: structured results of the validation, if raised by a
+                [`ShaclValidator`](rdf_utils.constraints.ShaclValidator)
+    """
+
+    report: "ShaclReport | None"
+    _violation_str: str | None
+
+    def __init__(self, violation_str: str | None = None, report: "ShaclReport | None" = None):
+        self.report = report
+        self._violation_str = violation_str
+        if violation_str is not None or report is None:
+            super().__init__("SHACL", "" if violation_str is None else violation_str)
+            return
+
+        # the report text is only rendered when the exception is printed
+        Exception.__init__(self, report)
+        self.domain = "SHACL"
+
+    def __str__(self) -> str:
+        if self._violation_str is None and self.report is not None:
+            return f"{self.domain} constraint violated: {self.report.report_text}"
+        return super().__str__()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (type(self), (self._violation_str, self.report))
+
+
+class ShaclResult:
+    """A single result of a SHACL validation, with its fields read on access.
+
+    Attributes:
+        focus_node: the node that was validated
+        path: the property path of the result, `None` for node shapes
+        shape: the shape that was violated
+        severity: e.g. `sh:Violation` or `sh:Warning`
+        messages: the result messages
+        value: the value node violating the constraint, if any
+        constraint_component: the violated constraint component,
+                              e.g. `sh:MinCountConstraintComponent`
+        text: the result's description in the report text, `None` if the result was read from
+              the report graph of `pyshacl.validate`, whose text is not split by result
+    """
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, raw: _RawResult) -> None:
+        self._raw = raw
+
+    def _values(self, pred: Node) -> list[Node]:
+        _, result_node, result_triples = self._raw
+        return [
+            # data and shapes graph nodes are wrapped with their graph
+            o[1] if isinstance(o, tuple) else o
+            for s, p, o in result_triples
+            if s == result_node and p == pred
+        ]
+
+    def _value(self, pred: Node) -> Node | None:
+        values = self._values(pred)
+        return values[0] if len(values) > 0 else None
+
+    @property
+    def focus_node(self) -> Node | None:
+        return self._value(SH.focusNode)
+
+    @property
+    def path(self) -> Node | None:
+        return self._value(SH.resultPath)
+
+    @property
+    def shape(self) -> Node | None:
+        return self._value(SH.sourceShape)
+
+    @property
+    def severity(self) -> Node | None:
+        return self._value(SH.resultSeverity)
+
+    @property
+    def messages(self) -> list[str]:
+        return [str(msg) for msg in self._values(SH.resultMessage)]
+
+    @property
+    def value(self) -> Node | None:
+        return self._value(SH.value)
+
+    @property
+    def constraint_component(self) -> Node | None:
+        return self._value(SH.sourceConstraintComponent)
+
+    @property
+    def text(self) -> str | None:
+        return self._raw[0]
+
+    def __repr__(self) -> str:
+        return (
+            f"ShaclResult(focus_node={self.focus_node!r}, path={self.path!r},"
+            f" shape={self.shape!r}, severity={self.severity!r}, messages={self.messages!r})"
+        )
+
+
+class ShaclReport:
+    """Results of a validation.
+
+    Reports of the validation paths using pyshacl's internals keep pyshacl's results, and the
+    report graph and text are only created when accessed. Reports of `pyshacl.validate` read
+    their results from its report graph.
+
+    Attributes:
+        complete: false if the validation stopped after a maximum number of violations
+
+    Parameters:
+        shapes_graph: shapes of the validation, `None` if the report graph is already rendered
+        results: pyshacl's validation results
+        complete: whether all focus nodes were validated
+    """
+
+    complete: bool
+    _raw_results: list[_RawResult]
+    _shapes_graph: ShapesGraph | None
+    _rendered: tuple[Graph, str] | None
+
+    def __init__(
+        self, shapes_graph: ShapesGraph | None, results: list[_RawResult], complete: bool = True
+    ) -> None:
+        self._shapes_graph = shapes_graph
+        self._raw_results = results
+        self.complete = complete
+        self._rendered = None
+
+    @property
+    def results(self) -> list[ShaclResult]:
+        """Structured results, e.g. to handle violations by focus node or shape."""
+        return [ShaclResult(raw) for raw in self._raw_results]
+
+    @property
+    def conforms(self) -> bool:
+        return len(self._raw_results) == 0
+
+    @property
+    def report_graph(self) -> Graph:
+        return self._render()[0]
+
+    @property
+    def report_text(self) -> str:
+        return self._render()[1]
+
+    def _render(self) -> tuple[Graph, str]:
+        if self._rendered is None:
+            assert self._shapes_graph is not None
+            self._rendered = Validator.create_validation_report(
+                self._shapes_graph, self.conforms, self._raw_results
+            )
+        return self._rendered
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        if self._shapes_graph is None:
+            return (_read_report, (*self._render(), self.complete))
+
+        # pyshacl's shapes are prepared again from the shapes graph when unpickled
+        return (
+            _load_report,
+            (
+                self._shapes_graph.graph,
+                _detach_results(self._shapes_graph, self._raw_results),
+                self.complete,
+            ),
+        )
+
+
+def _load_report(shacl_graph: Graph, results: list[_RawResult], complete: bool) -> ShaclReport:
+    shapes_graph = ShapesGraph(shacl_graph)
+    return ShaclReport(shapes_graph, _attach_results(shapes_graph, results), complete)
+
+
+def _read_report(report_graph: Graph, report_text: str, complete: bool = True) -> ShaclReport:
+    """Report of `pyshacl.validate`, with the results read from its report graph."""
+    results: list[_RawResult] = [
+        (None, node, _bnode_triples(report_graph, node))  # type: ignore[arg-type]
+        for node in report_graph.objects(None, SH.result)
+    ]
+    report = ShaclReport(None, results, complete)
+    report._rendered = (report_graph, report_text)
+    return report
+
+
+def _conforming_report() -> ShaclReport:
+    """Report of a validation without results, like the one of `pyshacl.validate`."""
+    report_graph = Graph()
+    report_node = BNode()
+    report_graph.add((report_node, RDF.type, SH.ValidationReport))
+    report_graph.add((report_node, SH.conforms, Literal(True)))
+    return _read_report(report_graph, "Validation Report\nConforms: True\n")
+
+
+def _collect_path_predicates(
+    shapes_graph: Graph, path: Node, inverse: bool, forward: set[Node], backward: set[Node]
+) -> None:
+    """Add the predicates of a SHACL property path, depending on their direction."""
+    if isinstance(path, URIRef):
+        (backward if inverse else forward).add(path)
+        return
+
+    inverse_path = shapes_graph.value(path, SH.inversePath)
+    if inverse_path is not None:
+        _collect_path_predicates(shapes_graph, inverse_path, not inverse, forward, backward)
+        return
+
+    for modifier in _PATH_MODIFIERS:
+        sub_path = shapes_graph.value(path, modifier)
+        if sub_path is not None:
+            _collect_path_predicates(shapes_graph, sub_path, inverse, forward, backward)
+            return
+
+    # alternative paths and sequence paths are RDF lists of paths
+    alternatives = shapes_graph.value(path, SH.alternativePath)
+    for sub_path in shapes_graph.items(path if alternatives is None else alternatives):
+        _collect_path_predicates(shapes_graph, sub_path, inverse, forward, backward)
+
+
+class ShaclValidator:
+    """Validates many graphs against SHACL shapes that are parsed once.
+
+    The shapes graphs are merged on construction, and
+    [`validate`](rdf_utils.constraints.ShaclValidator.validate) and
+    [`check`](rdf_utils.constraints.ShaclValidator.check) pass the merged graph to
+    `pyshacl.validate`.
+
+    The structured results of
+    [`validate_report`](rdf_utils.constraints.ShaclValidator.validate_report), limiting the
+    number of violations, incremental validation and compiled shapes use pyshacl's internals,
+    so that pyshacl's shapes, i.e. targets, paths and constraint parameters, are only collected
+    once and can be validated for some focus nodes. These paths are only taken with the tested
+    pyshacl releases, otherwise they fall back to `pyshacl.validate` with its `focus_nodes` and
+    `abort_on_first` options.
+
+    With an [`RdfsClosure`](rdf_utils.inference.RdfsClosure) as `inference`, the RDFS closure
+    of an ontology is only computed once. Each data graph is then copied and expanded with the
+    entailments of its own triples against that closure, and validated without further inference.
+
+    After a change of a few triples,
+    [`validate_delta`](rdf_utils.constraints.ShaclValidator.validate_delta) only validates the
+    focus nodes from which a changed node can be reached along the predicates of the shapes'
+    property paths.
+
+    With `compile_shapes`, shapes supported by
+    [`compile_shape`](rdf_utils.shape_compiler.compile_shape) are first checked by their compiled
+    predicates, and pyshacl only validates the focus nodes that do not conform. Shapes are not
+    compiled with untested pyshacl releases.
+
+    Attributes:
+        shacl_dict: mapping from SHACL path to graph format, e.g. URL -> "turtle"
+        shacl_graph: merged graph of all shapes
+        inference: inference performed on a copy of the data graph before validation
+
+    Parameters:
+        shacl_dict: mapping from SHACL path to graph format, e.g. URL -> "turtle"
+        inference: "rdfs", "owlrl", "both" or "none", see `pyshacl.validate`,
+                   or a precomputed RDFS closure
+        compile_shapes: whether to check focus nodes with compiled shapes before pyshacl
+    """
+
+    shacl_dict: dict[str, str]
+    shacl_graph: Graph
+    inference: str | RdfsClosure
+    _prepared_shapes: ShapesGraph | None
+    _forward_predicates: set[Node]
+    _backward_predicates: set[Node]
+    _is_local: bool
+    _compiled_shapes: dict[Node, ShapePredicate]
+
+    def __init__(
+        self,
+        shacl_dict: dict[str, str],
+        inference: str | RdfsClosure = "rdfs",
+        compile_shapes: bool = False,
+    ) -> None:
+        self.shacl_dict = dict(shacl_dict)
+        self.inference = inference
+
+        self.shacl_graph = Graph()
+        for mm_url, fmt in self.shacl_dict.items():
+            mm_graph = parse_graph_and_cache(mm_url, fmt)
+            for prefix, namespace in mm_graph.namespaces():
+                self.shacl_graph.bind(prefix, namespace)
+            self.shacl_graph += mm_graph
+
+        self._prepared_shapes = None
+
+        # focus nodes are affected by changes of nodes reachable along these predicates
+        self._forward_predicates = set()
+        self._backward_predicates = set()
+        for path in self.shacl_graph.objects(None, SH.path):
+            _collect_path_predicates(
+                self.shacl_graph, path, False, self._forward_predicates, self._backward_predicates
+            )
+        for pair_predicate in _PROPERTY_PAIR_PREDICATES:
+            self._forward_predicates.update(self.shacl_graph.objects(None, pair_predicate))
+        # whether results for a focus node only depend on nodes reachable from it along paths
+        self._is_local = self.inference not in ("owlrl", "both") and not any(
+            (None, pred, None) in self.shacl_graph for pred in _NON_LOCAL_SHAPE_PREDICATES
+        )
+
+        self._compiled_shapes = {}
+        if compile_shapes and _PYSHACL_INTERNALS:
+            for shape in self._shapes_graph.shapes:
+                predicate = compile_shape(shape)
+                if predicate is not None:
+                    self._compiled_shapes[shape.node] = predicate
+
+    @property
+    def _shapes_graph(self) -> ShapesGraph:
+        """pyshacl's shapes, collected on first use by a validation using pyshacl's internals."""
+        if self._prepared_shapes is None:
+            shapes_graph = ShapesGraph(self.shacl_graph)
+            _ = shapes_graph.shapes
+            self._prepared_shapes = shapes_graph
+        return self._prepared_shapes
+
+    def validate(self, graph: Graph) -> tuple[bool, Graph, str]:
+        """Validate a graph, which is not modified.
+
+        Returns:
+            whether the graph conforms, the validation report graph and its text,
+            like `pyshacl.validate`
+        """
+        report = self._validate_default(graph)
+        return report.conforms, report.report_graph, report.report_text
+
+    def validate_report(self, graph: Graph, max_violations: int | None = None) -> ShaclReport:
+        """Validate a graph, which is not modified.
+
+        Parameters:
+            graph: rdflib.Graph to be validated
+            max_violations: stop validating once this many results were found. With untested
+                            pyshacl releases, validation only stops early for 1, and the
+                            report may contain more results than the limit
+
+        Returns:
+            the validation results, e.g. as `previous` results of
+            [`validate_delta`](rdf_utils.constraints.ShaclValidator.validate_delta)
+        """
+        if not _PYSHACL_INTERNALS:
+            if max_violations == 1:
+                report = self._validate_public(graph, abort_on_first=True)
+                report.complete = report.conforms
+                return report
+            return self._validate_public(graph)
+
+        results, complete = self._validate_focus(
+            self._prepare(graph), None, max_violations=max_violations
+        )
+        return ShaclReport(self._shapes_graph, results, complete)
+
+    def _validate_default(self, graph: Graph) -> ShaclReport:
+        """Validation of `validate` and `check`, only using `pyshacl.validate` unless shapes
+        are compiled."""
+        if len(self._compiled_shapes) > 0:
+            return self.validate_report(graph)
+        return self._validate_public(graph)
+
+    def _validate_public(self, graph: Graph, **options: Any) -> ShaclReport:
+        """Validate a graph with `pyshacl.validate` and further options of it."""
+        if isinstance(self.inference, RdfsClosure):
+            graph, inference = self.inference.expand(graph), "none"
+        else:
+            inference = self.inference
+        _, report_graph, report_text = pyshacl.validate(
+            graph, shacl_graph=self.shacl_graph, inference=inference, **options
+        )
+        return _read_report(report_graph, report_text)  # type: ignore[arg-type]
 
-    def __init__(self, violation_str: str):
-        super().__init__("SHACL", violation_str)
+    def _validate_public_each(self, graphs: list[Graph]) -> list[ShaclReport]:
+        """Validate graphs with `pyshacl.validate_each`, if available in the installed release."""
+        if len(graphs) == 0 or not hasattr(pyshacl, "validate_each"):
+            return [self._validate_public(graph) for graph in graphs]
 
+        if isinstance(self.inference, RdfsClosure):
+            graphs, inference = [self.inference.expand(graph) for graph in graphs], "none"
+        else:
+            inference = self.inference
+        reports = pyshacl.validate_each(graphs, shacl_graph=self.shacl_graph, inference=inference)
+        return [
+            _read_report(report_graph, report_text)  # type: ignore[arg-type]
+            for _, report_graph, report_text in (reports[i] for i in range(len(graphs)))
+        ]
 
-def check_shacl_constraints(graph: Graph, shacl_dict: dict[str, str], quiet: bool = False) -> bool:
+    def validate_delta(
+        self,
+        graph: Graph,
+        added: Iterable[_Triple],
+        removed: Iterable[_Triple],
+        previous: ShaclReport | None = None,
+    ) -> ShaclReport:
+        """Validate only the focus nodes that may be affected by a change of a graph.
+
+        A focus node is affected if a node of an added or removed triple can be reached from it
+        along the predicates of the shapes' property paths. All focus nodes are validated if
+        the change contains RDFS schema triples, or if the shapes use SPARQL-based constraints
+        or targets, or with OWL RL inference, or if `previous` was created by
+        `pyshacl.validate`, whose results cannot be merged.
+
+        With untested pyshacl releases, the affected focus nodes are validated with the
+        `focus_nodes` option of `pyshacl.validate`, which only selects IRIs. All focus nodes
+        are validated instead if blank nodes are affected, with `previous`, or if
+        `inference` is neither "none" nor an [`RdfsClosure`](rdf_utils.inference.RdfsClosure).
+
+        Parameters:
+            graph: the graph after the change, which is not modified
+            added: triples added to the graph
+            removed: triples removed from the graph
+            previous: results of validating the graph before the change with this validator,
+                      e.g. from [`validate_report`](rdf_utils.constraints.ShaclValidator.validate_report)
+
+        Returns:
+            with `previous`, its results for unaffected focus nodes merged with the results for
+            the affected ones, i.e. the results of validating the whole graph.
+            Otherwise only the results for the affected focus nodes
+        """
+        changed: set[Node] = set()
+        full = not self._is_local
+        for s, p, o in (*added, *removed):
+            if p in _SCHEMA_PREDICATES or (p == RDF.type and o == RDFS.Class):
+                full = True
+                break
+            changed.update((s, o))
+            if self.inference != "none":
+                # inference types the predicate as rdf:Property
+                changed.add(p)
+
+        if not _PYSHACL_INTERNALS:
+            return self._validate_delta_public(graph, changed, full or previous is not None)
+
+        target = self._prepare(graph)
+        if full or (previous is not None and previous._shapes_graph is None):
+            return ShaclReport(self._shapes_graph, self._validate_focus(target, None)[0])
+
+        affected = self._affected_focus_nodes(target, changed)
+        results, _ = self._validate_focus(target, affected)
+        if previous is None:
+            return ShaclReport(self._shapes_graph, results)
+
+        results.extend(
+            raw for raw in previous._raw_results if ShaclResult(raw).focus_node not in affected
+        )
+        return ShaclReport(self._shapes_graph, results, previous.complete)
+
+    def _validate_delta_public(self, graph: Graph, changed: set[Node], full: bool) -> ShaclReport:
+        """Validate the affected focus nodes of a change with `pyshacl.validate`."""
+        # paths may follow triples inferred by pyshacl, which are not available here
+        if full or (self.inference != "none" and not isinstance(self.inference, RdfsClosure)):
+            return self._validate_public(graph)
+
+        target = graph
+        if isinstance(self.inference, RdfsClosure):
+            target = self.inference.expand(graph)
+        affected = self._affected_focus_nodes(target, changed)
+        literal_targets = (None, SH.targetObjectsOf, None) in self.shacl_graph or any(
+            isinstance(node, Literal) for node in self.shacl_graph.objects(None, SH.targetNode)
+        )
+        if any(
+            isinstance(node, BNode) or (literal_targets and isinstance(node, Literal))
+            for node in affected
+        ):
+            return self._validate_public(graph)
+
+        focus_nodes = [node for node in affected if isinstance(node, URIRef)]
+        if len(focus_nodes) == 0:
+            # without focus nodes, pyshacl validates all of them
+            return _conforming_report()
+        return self._validate_public(graph, focus_nodes=focus_nodes)
+
+    def _prepare(self, graph: Graph) -> "DataGraph":
+        """Data graph with the inferred triples, copied if inference adds triples."""
+        from pyshacl.graph_abstraction import DataGraph
+
+        if isinstance(self.inference, RdfsClosure):
+            return DataGraph.from_rdflib(self.inference.expand(graph))
+
+        target = DataGraph.from_rdflib(graph)
+        if self.inference != "none":
+            target = target.clone()
+            Validator._run_pre_inference(target, self.inference, URIRef("urn:pyshacl:inference"))
+        if target.is_multigraph():
+            target.default_union = True
+        return target
+
+    def _affected_focus_nodes(self, target: Graph, changed: set[Node]) -> set[Node]:
+        """Changed nodes and all nodes from which they are reachable along path predicates."""
+        affected = set(changed)
+        queue = deque(changed)
+        while queue:
+            node = queue.popleft()
+            for pred in self._forward_predicates:
+                for subj in target.subjects(pred, node):  # type: ignore[arg-type]
+                    if subj not in affected:
+                        affected.add(subj)
+                        queue.append(subj)
+            for pred in self._backward_predicates:
+                for obj in target.objects(node, pred):  # type: ignore[arg-type]
+                    if obj not in affected:
+                        affected.add(obj)
+                        queue.append(obj)
+        return affected
+
+    def _validate_focus(
+        self,
+        target: "DataGraph",
+        focus: set[Node] | None,
+        literal_focus: bool = True,
+        max_violations: int | None = None,
+    ) -> tuple[list[_RawResult], bool]:
+        """Validate a prepared graph like `Validator.run`, optionally only some focus nodes.
+
+        Returns:
+            the results and whether all focus nodes were validated, i.e. false if the
+            validation stopped after `max_violations` results
+
+        Raises:
+            _LiteralFocusError: if `literal_focus` is false and a shape has a literal focus node
+        """
+        validator = Validator(
+            target, shacl_graph=self.shacl_graph, options={"inference": "none", "inplace": True}
+        )
+        validator.shacl_graph = self._shapes_graph
+        executor = validator.make_executor()
+
+        results: list[_RawResult] = []
+        index: GraphIndex | None = None
+        for shape in self._shapes_graph.shapes:
+            predicate = self._compiled_shapes.get(shape.node)
+            if predicate is None and focus is None and literal_focus and max_violations is None:
+                _, shape_results = shape.validate(executor, target)
+                results.extend(shape_results)
+                continue
+
+            shape_focus = shape.focus_nodes(target)
+            if not literal_focus and any(isinstance(node, Literal) for node in shape_focus):
+                raise _LiteralFocusError(shape.node)
+            if focus is not None:
+                shape_focus = [node for node in shape_focus if node in focus]
+            if predicate is not None:
+                # only focus nodes failing the compiled shape have validation results
+                if index is None:
+                    index = GraphIndex(target)
+                shape_focus = [node for node in shape_focus if not predicate(index, node)]
+            if len(shape_focus) == 0:
+                continue
+            if max_violations is None:
+                _, shape_results = shape.validate(executor, target, focus=list(shape_focus))
+                results.extend(shape_results)
+                continue
+
+            # validate in batches to stop soon after reaching the limit
+            shape_focus = list(shape_focus)
+            for i in range(0, len(shape_focus), _FAIL_FAST_BATCH_SIZE):
+                if len(results) >= max_violations:
+                    return results[:max_violations], False
+                batch = shape_focus[i : i + _FAIL_FAST_BATCH_SIZE]
+                _, shape_results = shape.validate(executor, target, focus=batch)
+                results.extend(shape_results)
+        if max_violations is not None and len(results) > max_violations:
+            return results[:max_violations], False
+        return results, True
+
+    def check(self, graph: Graph, quiet: bool = False, max_violations: int | None = None) -> bool:
+        """Check a graph against the shapes.
+
+        Parameters:
+            graph: rdflib.Graph to be checked
+            quiet: if true will not throw an exception
+            max_violations: stop checking once this many results were found
+
+        Raises:
+            SHACLViolation: if the graph does not conform and `quiet` is false, with the
+                            structured results as `report` and the report text only
+                            rendered when the exception is printed
+        """
+        if max_violations is None:
+            report = self._validate_default(graph)
+        else:
+            report = self.validate_report(graph, max_violations=max_violations)
+        if not report.conforms and not quiet:
+            raise SHACLViolation(report=report)
+
+        return report.conforms
+
+
+__VALIDATOR_CACHE: OrderedDict[_ValidatorKey, ShaclValidator] = OrderedDict()
+# SHACL sources parsed for validators, whose parsed graphs are discarded on clearing
+__VALIDATOR_SOURCES: set[tuple[str, str]] = set()
+# incremented on clearing, so that validators created meanwhile are not cached
+__VALIDATOR_GENERATION = 0
+__VALIDATOR_CACHE_LOCK = threading.Lock()
+__VALIDATOR_FLIGHTS = SingleFlight()
+
+
+def get_shacl_validator(
+    shacl_dict: dict[str, str], ont_dict: dict[str, str] | None = None, compile_shapes: bool = False
+) -> ShaclValidator:
+    """Get a cached [`ShaclValidator`](rdf_utils.constraints.ShaclValidator) for a collection
+    of SHACL constraints, creating it if needed.
+
+    The `DEFAULT_VALIDATOR_CACHE_SIZE` most recently used validators are kept. Validators are
+    created outside of the cache's lock, so that a slow creation, e.g. fetching SHACL files,
+    does not block other threads. Concurrent calls for the same constraints wait for a single
+    creation.
+
+    Parameters:
+        shacl_dict: mapping from SHACL path to graph format, e.g. URL -> "turtle"
+        ont_dict: optional mapping from ontology path to graph format. If given, the validator
+                  infers against the RDFS closure of these graphs returned by
+                  [`get_rdfs_closure`](rdf_utils.inference.get_rdfs_closure)
+        compile_shapes: whether the validator checks focus nodes with compiled shapes first
+    """
+    key = (
+        tuple(sorted(shacl_dict.items())),
+        None if ont_dict is None else tuple(sorted(ont_dict.items())),
+        compile_shapes,
+    )
+    with __VALIDATOR_CACHE_LOCK:
+        validator = __VALIDATOR_CACHE.get(key)
+        if validator is not None:
+            __VALIDATOR_CACHE.move_to_end(key)
+            return validator
+
+    return __VALIDATOR_FLIGHTS.do(
+        key, partial(_create_shacl_validator, key, shacl_dict, ont_dict, compile_shapes)
+    )
+
+
+def _create_shacl_validator(
+    key: _ValidatorKey,
+    shacl_dict: dict[str, str],
+    ont_dict: dict[str, str] | None,
+    compile_shapes: bool,
+) -> ShaclValidator:
+    with __VALIDATOR_CACHE_LOCK:
+        # created by a concurrent call that finished after the lookup
+        validator = __VALIDATOR_CACHE.get(key)
+        if validator is not None:
+            return validator
+        __VALIDATOR_SOURCES.update(shacl_dict.items())
+        generation = __VALIDATOR_GENERATION
+
+    inference = "rdfs" if ont_dict is None else get_rdfs_closure(ont_dict)
+    validator = ShaclValidator(shacl_dict, inference=inference, compile_shapes=compile_shapes)
+
+    with __VALIDATOR_CACHE_LOCK:
+        __VALIDATOR_SOURCES.update(shacl_dict.items())
+        if generation == __VALIDATOR_GENERATION:
+            __VALIDATOR_CACHE[key] = validator
+            while len(__VALIDATOR_CACHE) > DEFAULT_VALIDATOR_CACHE_SIZE:
+                __VALIDATOR_CACHE.popitem(last=False)
+    return validator
+
+
+def clear_shacl_validators() -> None:
+    """Remove all validators cached by [`get_shacl_validator`](rdf_utils.constraints.get_shacl_validator),
+    e.g. after SHACL or ontology files changed.
+
+    The parsed SHACL graphs of the validators are also discarded from the
+    [`GraphCache`](rdf_utils.caching.GraphCache), and the RDFS closures are cleared with
+    [`clear_rdfs_closures`](rdf_utils.inference.clear_rdfs_closures), so that new validators
+    parse the current files.
+    """
+    global __VALIDATOR_GENERATION
+    graph_cache = get_graph_cache()
+    with __VALIDATOR_CACHE_LOCK:
+        __VALIDATOR_CACHE.clear()
+        __VALIDATOR_GENERATION += 1
+        for source, fmt in __VALIDATOR_SOURCES:
+            graph_cache.discard(source, fmt)
+        __VALIDATOR_SOURCES.clear()
+    clear_rdfs_closures()
+
+
+def check_shacl_constraints(
+    graph: Graph,
+    shacl_dict: dict[str, str],
+    quiet: bool = False,
+    ont_dict: dict[str, str] | None = None,
+    max_violations: int | None = None,
+    compile_shapes: bool = False,
+) -> bool:
     """Check a graph against a collection of SHACL constraints
 
     Parameters:
         graph: rdflib.Graph to be checked
         shacl_dict: mapping from SHACL path to graph format, e.g. URL -> "turtle"
         quiet: if true will not throw an exception
+        ont_dict: optional mapping from ontology or metamodel path to graph format, whose
+                  RDFS closure is computed once and used for the inference on `graph`
+        max_violations: stop checking once this many results were found, e.g. 1 to only
+                        find out whether the graph conforms
+        compile_shapes: whether to check focus nodes with shapes compiled by
+                        [`compile_shape`](rdf_utils.shape_compiler.compile_shape) first, and
+                        only validate the failing ones with pyshacl
+
+    Note:
+        Uses the [`ShaclValidator`](rdf_utils.constraints.ShaclValidator) returned by
+        [`get_shacl_validator`](rdf_utils.constraints.get_shacl_validator), so that shapes are
+        only parsed and prepared on the first check against a collection of constraints.
     """
-    shacl_g = Dataset()
-    for mm_url, fmt in shacl_dict.items():
-        shacl_g.parse(mm_url, format=fmt)
+    return get_shacl_validator(shacl_dict, ont_dict, compile_shapes).check(
+        graph, quiet=quiet, max_violations=max_violations
+    )
+
+
+def _init_validation_worker(shacl_dict: dict[str, str], ont_dict: dict[str, str] | None) -> None:
+    # parse and prepare the shapes once per worker, later tasks hit the validator cache
+    get_shacl_validator(shacl_dict, ont_dict)
+
+
+def _load_graph(fmt: str | None, graph_or_path: Graph | str) -> Graph:
+    if isinstance(graph_or_path, Graph):
+        return graph_or_path
+    return Graph().parse(graph_or_path, format=fmt)
+
+
+def _validate_one(
+    shacl_dict: dict[str, str],
+    ont_dict: dict[str, str] | None,
+    fmt: str | None,
+    graph_or_path: Graph | str,
+) -> ShaclReport:
+    graph = _load_graph(fmt, graph_or_path)
+    return get_shacl_validator(shacl_dict, ont_dict).validate_report(graph)
+
+
+def _validate_one_detached(
+    shacl_dict: dict[str, str],
+    ont_dict: dict[str, str] | None,
+    fmt: str | None,
+    graph_or_path: Graph | str,
+) -> list[_RawResult] | ShaclReport:
+    # only pyshacl's results are sent back, the reports are rendered on access in the calling
+    # process. Reports of pyshacl.validate are already rendered and sent as they are
+    report = _validate_one(shacl_dict, ont_dict, fmt, graph_or_path)
+    if report._shapes_graph is None:
+        return report
+    return _detach_results(report._shapes_graph, report._raw_results)
+
+
+def validate_many(
+    graphs_or_paths: Iterable[Graph | str],
+    shacl_dict: dict[str, str],
+    workers: int | None = None,
+    fmt: str | None = None,
+    ont_dict: dict[str, str] | None = None,
+) -> list[ShaclReport]:
+    """Validate many graphs in parallel worker processes.
+
+    Each worker parses and prepares the shapes once, then validates its share of the graphs.
+    Paths are parsed in the workers, while graphs are pickled to be sent to them. Only the
+    results are sent back, report graphs and texts are created when accessed. With untested
+    pyshacl releases, graphs validated in the calling process are passed to
+    `pyshacl.validate_each`, and the workers send back the reports of `pyshacl.validate`.
+
+    Parameters:
+        graphs_or_paths: graphs or paths of RDF files to validate
+        shacl_dict: mapping from SHACL path to graph format, e.g. URL -> "turtle"
+        workers: number of worker processes, validates in the calling process if 1.
+                 Default: the number of CPUs
+        fmt: format of the RDF files, guessed from the file extension if not given
+        ont_dict: optional mapping from ontology path to graph format, see
+                  [`get_shacl_validator`](rdf_utils.constraints.get_shacl_validator)
+
+    Returns:
+        reports in the same order as `graphs_or_paths`
+    """
+    items = list(graphs_or_paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(items))
+    validator = get_shacl_validator(shacl_dict, ont_dict)
+    if workers <= 1:
+        if not _PYSHACL_INTERNALS:
+            return validator._validate_public_each([_load_graph(fmt, item) for item in items])
+        return [_validate_one(shacl_dict, ont_dict, fmt, item) for item in items]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_validation_worker,
+        initargs=(shacl_dict, ont_dict),
+    ) as executor:
+        validate = partial(_validate_one_detached, shacl_dict, ont_dict, fmt)
+        return [
+            results
+            if isinstance(results, ShaclReport)
+            else ShaclReport(
+                validator._shapes_graph, _attach_results(validator._shapes_graph, results)
+            )
+            for results in executor.map(validate, items)
+        ]
+
+
+def _partition_graph(
+    graph: Graph, union_literals: bool
+) -> tuple[list[_Triple], list[list[_Triple]]]:
+    """Split a graph into schema triples and the triples of independent components.
+
+    Nodes are connected by the triples between them, except for `rdf:type` triples, so that
+    instances of the same class stay independent. Components containing classes, properties
+    or RDFS schema statements are schema components, needed by every other component.
+
+    Returns:
+        triples of the schema components and triples of each other component
+    """
+    parents: dict[Node, Node] = {}
+
+    def find(node: Node) -> Node:
+        root = parents.setdefault(node, node)
+        while root != parents[root]:
+            parents[root] = parents[parents[root]]
+            root = parents[root]
+        return root
 
-    conforms, _, report_text = pyshacl.validate(graph, shacl_graph=shacl_g, inference="rdfs")
+    schema_nodes: set[Node] = set()
+    for s, p, o in graph.triples((None, None, None)):
+        schema_nodes.add(p)
+        if p == RDF.type:
+            schema_nodes.add(o)
+            find(s)
+            continue
+        if p in _SCHEMA_PREDICATES:
+            schema_nodes.update((s, o))
+        if isinstance(o, Literal) and not union_literals:
+            find(s)
+            continue
+        root_s, root_o = find(s), find(o)
+        if root_s != root_o:
+            parents[root_o] = root_s
 
-    assert isinstance(conforms, bool), (
-        f"unexpected 'conforms' type from pyshacl.validate: {conforms}"
+    schema_roots = {find(node) for node in schema_nodes if node in parents}
+    schema_triples: list[_Triple] = []
+    components: dict[Node, list[_Triple]] = {}
+    for triple in graph.triples((None, None, None)):
+        root = find(triple[0])
+        if root in schema_roots:
+            schema_triples.append(triple)  # type: ignore[arg-type]
+        else:
+            components.setdefault(root, []).append(triple)  # type: ignore[arg-type]
+    return schema_triples, list(components.values())
+
+
+def _detach_results(shapes_graph: ShapesGraph, results: list[_RawResult]) -> list[_RawResult]:
+    """Copy data graph nodes referenced by results, so that results can be sent to another
+    process. References to the shapes graph are kept as `(None, node)` and resolved by
+    `_attach_results`."""
+    detached = []
+    for desc, result_node, result_triples in results:
+        triples = []
+        for s, p, o in result_triples:
+            if isinstance(o, tuple):
+                source, node = o
+                if source is shapes_graph.graph:
+                    o = (None, node)
+                else:
+                    o = node
+                    if isinstance(node, BNode):
+                        triples.extend(_bnode_triples(source, node))
+            triples.append((s, p, o))
+        detached.append((desc, result_node, triples))
+    return detached
+
+
+def _bnode_triples(graph: Graph, bnode: BNode) -> list[_Triple]:
+    """Triples describing a blank node and the blank nodes it refers to."""
+    triples = []
+    stack = [bnode]
+    seen = {bnode}
+    while stack:
+        node = stack.pop()
+        for s, p, o in graph.triples((node, None, None)):
+            triples.append((s, p, o))
+            if isinstance(o, BNode) and o not in seen:
+                seen.add(o)
+                stack.append(o)
+    return triples  # type: ignore[return-value]
+
+
+def _attach_results(shapes_graph: ShapesGraph, results: list[_RawResult]) -> list[_RawResult]:
+    """Resolve the shapes graph references of detached results with this process' shapes."""
+    return [
+        (
+            desc,
+            result_node,
+            [
+                (s, p, (shapes_graph.graph, o[1]) if isinstance(o, tuple) else o)
+                for s, p, o in result_triples
+            ],
+        )
+        for desc, result_node, result_triples in results
+    ]
+
+
+def _shard_nodes(triples: list[_Triple]) -> set[Node]:
+    """Nodes whose focus node validation belongs to the shard of these triples."""
+    nodes = {s for s, _, _ in triples}
+    nodes.update(o for _, p, o in triples if p != RDF.type and not isinstance(o, Literal))
+    return nodes
+
+
+def _validate_shard(
+    shacl_dict: dict[str, str],
+    ont_dict: dict[str, str] | None,
+    namespaces: list[tuple[str, str]],
+    schema_triples: list[_Triple],
+    owns_schema: bool,
+    foreign_targets: set[Node],
+    triples: list[_Triple],
+) -> list[_RawResult] | None:
+    validator = get_shacl_validator(shacl_dict, ont_dict)
+    graph = Graph()
+    for prefix, namespace in namespaces:
+        graph.bind(prefix, namespace)
+    graph.store.addN((s, p, o, graph) for s, p, o in schema_triples)
+    graph.store.addN((s, p, o, graph) for s, p, o in triples)
+
+    owned: set[Node] | None = None
+    if not owns_schema:
+        # replicated schema nodes are only validated by the first shard
+        owned = _shard_nodes(triples)
+    elif len(foreign_targets) > 0:
+        # explicit target nodes whose triples are in other shards are validated there
+        owned = set(graph.all_nodes())
+        owned.update(validator.shacl_graph.objects(None, SH.targetNode))
+        owned -= foreign_targets
+    try:
+        results, _ = validator._validate_focus(
+            validator._prepare(graph), owned, literal_focus=False
+        )
+    except _LiteralFocusError:
+        return None
+    return _detach_results(validator._shapes_graph, results)
+
+
+def validate_sharded(
+    graph: Graph,
+    shacl_dict: dict[str, str],
+    workers: int | None = None,
+    ont_dict: dict[str, str] | None = None,
+) -> ShaclReport:
+    """Validate a large graph by splitting it into independent shards validated in parallel.
+
+    The graph is split into its connected components, not counting `rdf:type` triples as
+    connections. Components with classes, properties or RDFS schema statements are copied
+    into every shard. The components are distributed over one shard per worker, and each focus
+    node is validated in exactly one shard, so the merged results are those of validating
+    the whole graph.
+
+    The whole graph is validated in the calling process if results may depend on other
+    components, i.e. for shapes with SPARQL-based constraints or targets, paths along inverse
+    `rdf:type`, objects of `rdf:type` or literals as focus nodes, or OWL RL inference. The
+    shards need pyshacl's internals, so the whole graph is also validated with untested pyshacl
+    releases.
+
+    Parameters:
+        graph: graph to validate, which is not modified
+        shacl_dict: mapping from SHACL path to graph format, e.g. URL -> "turtle"
+        workers: number of worker processes. Default: the number of CPUs
+        ont_dict: optional mapping from ontology path to graph format, see
+                  [`get_shacl_validator`](rdf_utils.constraints.get_shacl_validator)
+
+    Returns:
+        the results of all shards
+    """
+    validator = get_shacl_validator(shacl_dict, ont_dict)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if (
+        workers <= 1
+        or not _PYSHACL_INTERNALS
+        or not validator._is_local
+        or RDF.type in validator._backward_predicates
+        or (None, SH.targetObjectsOf, RDF.type) in validator.shacl_graph
+    ):
+        return validator.validate_report(graph)
+
+    # with inverse paths, validation may traverse back from literal value nodes
+    schema_triples, components = _partition_graph(
+        graph, union_literals=len(validator._backward_predicates) > 0
     )
+    if len(components) <= 1:
+        return validator.validate_report(graph)
+
+    # largest components first, each into the shard with the fewest triples
+    shards: list[list[_Triple]] = [[] for _ in range(min(workers, len(components)))]
+    for component in sorted(components, key=len, reverse=True):
+        min(shards, key=len).extend(component)
+
+    # the first shard validates all other focus nodes, including explicit targets without triples
+    targets = set(validator.shacl_graph.objects(None, SH.targetNode))
+    foreign_targets: set[Node] = set()
+    if len(targets) > 0:
+        for shard in shards[1:]:
+            foreign_targets.update(targets.intersection(_shard_nodes(shard)))
 
-    if not conforms and not quiet:
-        raise SHACLViolation(report_text)
+    namespaces = [(prefix, str(namespace)) for prefix, namespace in graph.namespaces()]
+    validate = partial(_validate_shard, shacl_dict, ont_dict, namespaces, schema_triples)
+    with ProcessPoolExecutor(
+        max_workers=len(shards),
+        initializer=_init_validation_worker,
+        initargs=(shacl_dict, ont_dict),
+    ) as executor:
+        shard_results = list(
+            executor.map(
+                validate,
+                [i == 0 for i in range(len(shards))],
+                [foreign_targets if i == 0 else set() for i in range(len(shards))],
+                shards,
+            )
+        )
 
-    return conforms
+    results = []
+    for res in shard_results:
+        if res is None:
+            return validator.validate_report(graph)
+        results.extend(_attach_results(validator._shapes_graph, res))
+    return ShaclReport(validator._shapes_graph, results)
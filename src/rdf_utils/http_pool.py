@@ -0,0 +1,256 @@
+# SPDX-License-Identifier: MPL-2.0
+"""urllib handlers keeping HTTP connections alive to reuse them for later requests.
+
+The handlers of `urllib.request` close the connection after every response, so that each
+request pays for a new TCP and possibly TLS handshake. The handlers here return a connection to a
+[`ConnectionPool`](rdf_utils.http_pool.ConnectionPool) once its response has been read completely
+and the server has not asked to close it.
+"""
+
+import http.client
+import os
+import socket
+import threading
+import urllib.error
+import urllib.request
+import weakref
+from collections.abc import Callable, Hashable
+from functools import partial
+
+DEFAULT_MAX_IDLE_PER_HOST = 4
+
+
+class _PooledHTTPResponse(http.client.HTTPResponse):
+    """Calls `release` with whether the connection can be reused once the response is closed."""
+
+    release: Callable[[bool], None] | None = None
+
+    def _close_conn(self) -> None:
+        # called by http.client once the body has been read completely
+        super()._close_conn()
+        release = self.release
+        self.release = None
+        if release is not None:
+            release(not self.will_close)
+
+    def close(self) -> None:
+        # the connection is left in an undefined state if the body was not read completely
+        release = self.release
+        self.release = None
+        super().close()
+        if release is not None:
+            release(False)
+
+
+class ConnectionPool:
+    """Thread-safe pool of idle HTTP connections, keyed by scheme, host and port.
+
+    A process forked from the owner of a pool, e.g. by a `ProcessPoolExecutor`, starts with an
+    empty pool, so that parent and child never send requests over the same connection.
+
+    Attributes:
+        created: number of connections opened
+        reused: number of requests sent over a connection from the pool
+
+    Parameters:
+        max_idle_per_host: limit on the idle connections kept per host, further
+                           connections are closed when released
+    """
+
+    created: int
+    reused: int
+    _idle: dict[Hashable, list[http.client.HTTPConnection]]
+    _lock: threading.Lock
+
+    def __init__(self, max_idle_per_host: int = DEFAULT_MAX_IDLE_PER_HOST) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self.created = 0
+        self.reused = 0
+        self._idle = {}
+        self._lock = threading.Lock()
+        _POOLS.add(self)
+
+    def _forget_idle(self) -> None:
+        # the inherited sockets are still used by the parent process, so they are not closed
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self, key: Hashable, create: Callable[[], http.client.HTTPConnection]
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        """Take the most recently used idle connection for a key or create a new one.
+
+        Parameters:
+            key: key of the connection, e.g. scheme, host and port
+            create: creates a new connection if there is no idle one
+
+        Returns:
+            the connection and whether it was taken from the pool
+        """
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                self.reused += 1
+                return connections.pop(), True
+            self.created += 1
+        return create(), False
+
+    def release(self, key: Hashable, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        """Return a connection to the pool, or close it if it cannot be reused."""
+        if reusable:
+            with self._lock:
+                connections = self._idle.setdefault(key, [])
+                if len(connections) < self.max_idle_per_host:
+                    connections.append(conn)
+                    return
+        conn.close()
+
+    def clear(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    def stats(self) -> dict[str, int]:
+        """Snapshot of the pool counters.
+
+        Returns:
+            mapping with keys "created", "reused" and "idle"
+        """
+        with self._lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "idle": sum(len(connections) for connections in self._idle.values()),
+            }
+
+
+_POOLS: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+
+
+def _forget_idle_after_fork() -> None:
+    for pool in list(_POOLS):
+        pool._forget_idle()
+
+
+if hasattr(os, "register_at_fork"):  # not on Windows
+    os.register_at_fork(after_in_child=_forget_idle_after_fork)
+
+
+def _open_pooled(
+    handler: urllib.request.AbstractHTTPHandler,
+    pool: ConnectionPool,
+    http_class: type[http.client.HTTPConnection],
+    req: urllib.request.Request,
+    **http_conn_args,
+) -> http.client.HTTPResponse:
+    """Like `AbstractHTTPHandler.do_open`, but with a connection from the pool."""
+    host = req.host
+    if not host:
+        raise urllib.error.URLError("no host given")
+    if req._tunnel_host:  # type: ignore[attr-defined]
+        # connections tunneled through a proxy are not pooled
+        return handler.do_open(http_class, req, **http_conn_args)
+
+    headers = dict(req.unredirected_hdrs)
+    headers.update({k: v for k, v in req.headers.items() if k not in headers})
+    headers = {name.title(): val for name, val in headers.items()}
+
+    def create_conn() -> http.client.HTTPConnection:
+        conn = http_class(host, timeout=req.timeout, **http_conn_args)
+        conn.response_class = _PooledHTTPResponse
+        return conn
+
+    key = (http_class.__name__, host)
+    while True:
+        conn, is_reused = pool.acquire(key, create_conn)
+        if is_reused:
+            conn.timeout = req.timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(
+                    socket.getdefaulttimeout()
+                    if req.timeout is socket._GLOBAL_DEFAULT_TIMEOUT  # type: ignore[attr-defined]
+                    else req.timeout
+                )
+        if handler._debuglevel:  # type: ignore[attr-defined]
+            conn.set_debuglevel(handler._debuglevel)  # type: ignore[attr-defined]
+
+        try:
+            conn.request(
+                req.get_method(),
+                req.selector,
+                req.data,
+                headers,
+                encode_chunked=req.has_header("Transfer-encoding"),
+            )
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as err:
+            conn.close()
+            if is_reused:
+                # the server closed the idle connection, retry with a new one
+                continue
+            raise urllib.error.URLError(err)
+        except OSError as err:
+            conn.close()
+            raise urllib.error.URLError(err)
+        break
+
+    assert isinstance(response, _PooledHTTPResponse)
+    response.release = partial(pool.release, key, conn)
+    response.url = req.get_full_url()
+    response.msg = response.reason  # type: ignore[assignment]
+    return response
+
+
+class KeepAliveHTTPHandler(urllib.request.HTTPHandler):
+    """`HTTPHandler` reusing connections from a [`ConnectionPool`](rdf_utils.http_pool.ConnectionPool).
+
+    Parameters:
+        pool: pool of idle connections, can be shared between handlers. Default: a new pool
+    """
+
+    def __init__(self, pool: ConnectionPool | None = None, debuglevel: int = 0) -> None:
+        super().__init__(debuglevel=debuglevel)
+        self.pool = ConnectionPool() if pool is None else pool
+
+    def http_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        return _open_pooled(self, self.pool, http.client.HTTPConnection, req)
+
+
+class KeepAliveHTTPSHandler(urllib.request.HTTPSHandler):
+    """`HTTPSHandler` reusing connections from a [`ConnectionPool`](rdf_utils.http_pool.ConnectionPool).
+
+    Parameters:
+        pool: pool of idle connections, can be shared between handlers. Default: a new pool
+        context: SSL context of the connections. Default: the default context of `http.client`
+    """
+
+    def __init__(
+        self, pool: ConnectionPool | None = None, context=None, debuglevel: int = 0
+    ) -> None:
+        super().__init__(debuglevel=debuglevel, context=context)
+        self.pool = ConnectionPool() if pool is None else pool
+        self._ssl_context = context
+
+    def https_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        return _open_pooled(
+            self, self.pool, http.client.HTTPSConnection, req, context=self._ssl_context
+        )
+
+
+def build_pooled_opener(
+    pool: ConnectionPool | None = None, *handlers: urllib.request.BaseHandler
+) -> urllib.request.OpenerDirector:
+    """Like `urllib.request.build_opener`, but with keep-alive HTTP and HTTPS handlers.
+
+    Parameters:
+        pool: pool shared by the HTTP and HTTPS handlers. Default: a new pool
+        handlers: additional handlers passed to `build_opener`
+    """
+    if pool is None:
+        pool = ConnectionPool()
+    return urllib.request.build_opener(
+        KeepAliveHTTPHandler(pool), KeepAliveHTTPSHandler(pool), *handlers
+    )
@@ -0,0 +1,238 @@
+# SPDX-License-Identifier: MPL-2.0
+"""RDFS inference against a precomputed closure of an ontology.
+
+The entailment rules are the ones applied by pyshacl's "rdfs" pre-inference, i.e. rdf1 and
+rdfs2 to rdfs13 of the RDF semantics without axiomatic triples, where like in `owlrl` every
+subject and object of the input triples is typed as `rdfs:Resource` (rdfs4).
+The closure of an ontology is computed once, after which inferring the entailments of a data
+graph only processes the data graph's triples and the triples derived from them.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from functools import partial
+
+from rdflib import RDF, RDFS, Graph, Literal
+from rdflib.term import Node
+
+from rdf_utils.caching import SingleFlight, get_graph_cache, parse_graph_and_cache
+
+DEFAULT_CLOSURE_CACHE_SIZE = 16
+
+_Triple = tuple[Node, Node, Node]
+_Pattern = tuple[Node | None, Node | None, Node | None]
+
+
+class RdfsClosure:
+    """RDFS closure of an ontology, extended incrementally with data graphs.
+
+    Attributes:
+        graph: the ontology and all triples entailed by it, must not be modified
+
+    Parameters:
+        ontology: ontology or metamodel graph providing class and property hierarchies,
+                  domains and ranges. Default: an empty ontology
+    """
+
+    graph: Graph
+
+    def __init__(self, ontology: Graph | None = None) -> None:
+        self.graph = Graph()
+        if ontology is None:
+            return
+
+        for prefix, namespace in ontology.namespaces():
+            self.graph.bind(prefix, namespace)
+        self.graph += ontology
+        derived = _infer(None, ontology)
+        self.graph.store.addN((s, p, o, self.graph) for s, p, o in derived)
+
+    def infer(self, data: Graph) -> Graph:
+        """Triples entailed by a data graph together with the ontology.
+
+        Returns:
+            new graph of the entailed triples that are neither in `data` nor in `graph`
+        """
+        return _infer(self.graph, data)
+
+    def expand(self, data: Graph) -> Graph:
+        """Copy a data graph and add the entailed triples to the copy.
+
+        Statements of the ontology about nodes of the data graph are also copied, while the rest
+        of the ontology is not.
+
+        Returns:
+            new graph of the data, the entailed triples and the ontology statements
+        """
+        expanded = Graph()
+        for prefix, namespace in data.namespaces():
+            expanded.bind(prefix, namespace)
+        expanded += data
+        derived = self.infer(data)
+        expanded.store.addN((s, p, o, expanded) for s, p, o in derived)
+
+        if len(self.graph) > 0:
+            subjects = set(expanded.subjects(unique=True))
+            expanded.store.addN(
+                (s, p, o, expanded)
+                for subject in subjects
+                for s, p, o in self.graph.triples((subject, None, None))
+            )
+        return expanded
+
+
+def _infer(base: Graph | None, data: Graph) -> Graph:
+    """Semi-naive forward chaining of the RDFS rules over a closed base graph and new data.
+
+    Each rule is applied in both directions, i.e. with the processed triple in the place of
+    either premise, so that every combination of premises is found when the later of the two
+    triples is processed. Triples of `base` are assumed to be closed already.
+    """
+    derived = Graph()
+    sources = (data, derived) if base is None else (base, data, derived)
+    queue: deque[_Triple] = deque()
+    pending: list[_Triple] = []
+
+    def triples(pattern: _Pattern) -> Iterator[_Triple]:
+        for graph in sources:
+            yield from graph.triples(pattern)  # type: ignore[misc]
+
+    def flush() -> None:
+        for triple in pending:
+            if isinstance(triple[1], Literal):
+                continue
+            if any(triple in graph for graph in sources):
+                continue
+            derived.add(triple)
+            queue.append(triple)
+        pending.clear()
+
+    def apply_rules(triple: _Triple) -> None:
+        s, p, o = triple
+        pending.append((p, RDF.type, RDF.Property))  # rdf1
+
+        # the triple as instance of its property
+        for _, _, c in triples((p, RDFS.domain, None)):
+            pending.append((s, RDF.type, c))  # rdfs2
+        for _, _, c in triples((p, RDFS.range, None)):
+            pending.append((o, RDF.type, c))  # rdfs3
+        for _, _, q in triples((p, RDFS.subPropertyOf, None)):
+            pending.append((s, q, o))  # rdfs7
+
+        # the triple as schema statement
+        if p == RDFS.domain:
+            for u, _, _ in triples((None, s, None)):
+                pending.append((u, RDF.type, o))  # rdfs2
+        elif p == RDFS.range:
+            for _, _, v in triples((None, s, None)):
+                pending.append((v, RDF.type, o))  # rdfs3
+        elif p == RDFS.subPropertyOf:
+            for _, _, x in triples((o, RDFS.subPropertyOf, None)):
+                pending.append((s, RDFS.subPropertyOf, x))  # rdfs5
+            for x, _, _ in triples((None, RDFS.subPropertyOf, s)):
+                pending.append((x, RDFS.subPropertyOf, o))  # rdfs5
+            for u, _, v in triples((None, s, None)):
+                pending.append((u, o, v))  # rdfs7
+        elif p == RDFS.subClassOf:
+            for v, _, _ in triples((None, RDF.type, s)):
+                pending.append((v, RDF.type, o))  # rdfs9
+            for _, _, x in triples((o, RDFS.subClassOf, None)):
+                pending.append((s, RDFS.subClassOf, x))  # rdfs11
+            for x, _, _ in triples((None, RDFS.subClassOf, s)):
+                pending.append((x, RDFS.subClassOf, o))  # rdfs11
+        elif p == RDF.type:
+            for _, _, c in triples((o, RDFS.subClassOf, None)):
+                pending.append((s, RDF.type, c))  # rdfs9
+            if o == RDF.Property:
+                pending.append((s, RDFS.subPropertyOf, s))  # rdfs6
+            elif o == RDFS.Class:
+                pending.append((s, RDFS.subClassOf, RDFS.Resource))  # rdfs8
+                pending.append((s, RDFS.subClassOf, s))  # rdfs10
+            elif o == RDFS.ContainerMembershipProperty:
+                pending.append((s, RDFS.subPropertyOf, RDFS.member))  # rdfs12
+            elif o == RDFS.Datatype:
+                pending.append((s, RDFS.subClassOf, RDFS.Literal))  # rdfs13
+
+    for triple in data.triples((None, None, None)):
+        s, _, o = triple
+        # rdfs4 is only applied to the input triples, like in owlrl
+        pending.append((s, RDF.type, RDFS.Resource))
+        pending.append((o, RDF.type, RDFS.Resource))
+        apply_rules(triple)  # type: ignore[arg-type]
+        flush()
+
+    while queue:
+        apply_rules(queue.popleft())
+        flush()
+
+    return derived
+
+
+__RDFS_CLOSURES: OrderedDict[tuple[tuple[str, str], ...], RdfsClosure] = OrderedDict()
+# ontology sources parsed for closures, whose parsed graphs are discarded on clearing
+__RDFS_CLOSURE_SOURCES: set[tuple[str, str]] = set()
+# incremented on clearing, so that closures computed meanwhile are not cached
+__RDFS_CLOSURES_GENERATION = 0
+__RDFS_CLOSURES_LOCK = threading.Lock()
+__RDFS_CLOSURE_FLIGHTS = SingleFlight()
+
+
+def get_rdfs_closure(ont_dict: dict[str, str]) -> RdfsClosure:
+    """Get the cached [`RdfsClosure`](rdf_utils.inference.RdfsClosure) of a collection of
+    ontology graphs, computing it on the first call.
+
+    The `DEFAULT_CLOSURE_CACHE_SIZE` most recently used closures are kept. Closures are computed
+    outside of the cache's lock, and concurrent calls for the same ontologies wait for a single
+    computation.
+
+    Parameters:
+        ont_dict: mapping from ontology path to graph format, e.g. URL -> "turtle"
+    """
+    key = tuple(sorted(ont_dict.items()))
+    with __RDFS_CLOSURES_LOCK:
+        closure = __RDFS_CLOSURES.get(key)
+        if closure is not None:
+            __RDFS_CLOSURES.move_to_end(key)
+            return closure
+
+    return __RDFS_CLOSURE_FLIGHTS.do(key, partial(_compute_rdfs_closure, key))
+
+
+def _compute_rdfs_closure(key: tuple[tuple[str, str], ...]) -> RdfsClosure:
+    with __RDFS_CLOSURES_LOCK:
+        # computed by a concurrent call that finished after the lookup
+        closure = __RDFS_CLOSURES.get(key)
+        if closure is not None:
+            return closure
+        __RDFS_CLOSURE_SOURCES.update(key)
+        generation = __RDFS_CLOSURES_GENERATION
+
+    ontology = Graph()
+    for ont_url, fmt in key:
+        ont_graph = parse_graph_and_cache(ont_url, fmt)
+        for prefix, namespace in ont_graph.namespaces():
+            ontology.bind(prefix, namespace)
+        ontology += ont_graph
+    closure = RdfsClosure(ontology)
+
+    with __RDFS_CLOSURES_LOCK:
+        __RDFS_CLOSURE_SOURCES.update(key)
+        if generation == __RDFS_CLOSURES_GENERATION:
+            __RDFS_CLOSURES[key] = closure
+            while len(__RDFS_CLOSURES) > DEFAULT_CLOSURE_CACHE_SIZE:
+                __RDFS_CLOSURES.popitem(last=False)
+    return closure
+
+
+def clear_rdfs_closures() -> None:
+    """Remove all closures cached by [`get_rdfs_closure`](rdf_utils.inference.get_rdfs_closure)
+    and the parsed ontology graphs they were computed from, e.g. after ontology files changed."""
+    global __RDFS_CLOSURES_GENERATION
+    graph_cache = get_graph_cache()
+    with __RDFS_CLOSURES_LOCK:
+        __RDFS_CLOSURES.clear()
+        __RDFS_CLOSURES_GENERATION += 1
+        for source, fmt in __RDFS_CLOSURE_SOURCES:
+            graph_cache.discard(source, fmt)
+        __RDFS_CLOSURE_SOURCES.clear()
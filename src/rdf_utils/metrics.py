@@ -0,0 +1,241 @@
+# SPDX-License-Identifier: MPL-2.0
+"""Counters and latency histograms of the URL caches and resolvers, disabled by default.
+
+Enable recording with `get_metrics().enabled = True`. While disabled, instrumented code
+only checks the `enabled` flag and skips all timing and bookkeeping.
+
+Events are recorded per source, e.g. "resolver" for
+[`IriToFileResolver`](rdf_utils.resolver.IriToFileResolver) and "url_cache" for
+[`read_url_and_cache`](rdf_utils.caching.read_url_and_cache), and per URL prefix, i.e. the
+matching prefix of the resolver's URL map or the scheme and host of the URL.
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from typing import Any
+from urllib.parse import urlsplit
+
+EVENT_HIT = "hit"
+EVENT_MISS = "miss"
+EVENT_DOWNLOAD = "download"
+EVENT_FALLTHROUGH = "fallthrough"
+EVENTS = (EVENT_HIT, EVENT_MISS, EVENT_DOWNLOAD, EVENT_FALLTHROUGH)
+
+# upper bounds in seconds of the histogram buckets, from a memory hit to a slow download
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+
+
+def get_url_origin(url: str) -> str:
+    """Scheme and host of a URL, used as prefix of URLs not matching a URL map.
+
+    Examples:
+        >>> get_url_origin("https://example.org/models/robot.json")
+        'https://example.org'
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class MetricEvent:
+    """A recorded event, passed to the hooks of [`Metrics`](rdf_utils.metrics.Metrics).
+
+    Attributes:
+        source: component recording the event, e.g. "resolver"
+        prefix: URL prefix of the request
+        event: one of `EVENTS`
+        latency: duration in seconds, if measured
+        size: number of bytes transferred, for downloads
+    """
+
+    __slots__ = ("event", "latency", "prefix", "size", "source")
+
+    def __init__(
+        self, source: str, prefix: str, event: str, latency: float | None, size: int
+    ) -> None:
+        self.source = source
+        self.prefix = prefix
+        self.event = event
+        self.latency = latency
+        self.size = size
+
+    def __repr__(self) -> str:
+        return (
+            f"MetricEvent(source={self.source!r}, prefix={self.prefix!r}, event={self.event!r},"
+            f" latency={self.latency!r}, size={self.size!r})"
+        )
+
+
+class LatencyHistogram:
+    """Histogram of durations with fixed bucket bounds.
+
+    Attributes:
+        bounds: upper bounds of the buckets in seconds, a last bucket holds longer durations
+        counts: number of durations per bucket
+        count: total number of durations
+        total: sum of the durations in seconds
+        max: longest duration in seconds
+    """
+
+    bounds: tuple[float, ...]
+    counts: list[int]
+    count: int
+    total: float
+    max: float
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.bounds = tuple(sorted(bounds))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Histogram as a dictionary, with buckets keyed by their upper bounds."""
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {"count": self.count, "total": self.total, "max": self.max, "buckets": buckets}
+
+
+class _PrefixCounters:
+    __slots__ = ("bytes", "counts", "latencies")
+
+    def __init__(self) -> None:
+        self.counts = dict.fromkeys(EVENTS, 0)
+        self.bytes = 0
+        self.latencies: dict[str, LatencyHistogram] = {}
+
+
+class Metrics:
+    """Thread-safe registry of per-prefix counters and latency histograms.
+
+    Attributes:
+        enabled: whether events are recorded, checked by the instrumented code
+
+    Parameters:
+        enabled: initial value of `enabled`
+        latency_buckets: upper bounds in seconds of the latency histogram buckets
+    """
+
+    enabled: bool
+    _counters: dict[tuple[str, str], _PrefixCounters]
+    _hooks: tuple[Callable[[MetricEvent], None], ...]
+    _lock: threading.Lock
+
+    def __init__(
+        self, enabled: bool = False, latency_buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        self.enabled = enabled
+        self._latency_buckets = tuple(latency_buckets)
+        self._counters = {}
+        self._hooks = ()
+        self._lock = threading.Lock()
+
+    def record(
+        self, source: str, prefix: str, event: str, latency: float | None = None, size: int = 0
+    ) -> None:
+        """Count an event and pass it to the hooks.
+
+        Parameters:
+            source: component recording the event, e.g. "resolver"
+            prefix: URL prefix of the request
+            event: one of `EVENTS`
+            latency: duration in seconds, added to the histogram of the prefix and event
+            size: number of bytes transferred
+        """
+        with self._lock:
+            counters = self._counters.get((source, prefix))
+            if counters is None:
+                counters = self._counters[(source, prefix)] = _PrefixCounters()
+            counters.counts[event] += 1
+            counters.bytes += size
+            if latency is not None:
+                histogram = counters.latencies.get(event)
+                if histogram is None:
+                    histogram = counters.latencies[event] = LatencyHistogram(self._latency_buckets)
+                histogram.observe(latency)
+            hooks = self._hooks
+
+        if hooks:
+            metric_event = MetricEvent(source, prefix, event, latency, size)
+            for hook in hooks:
+                hook(metric_event)
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Copy of the recorded counters.
+
+        Returns:
+            mapping from source to URL prefix to a dictionary with a count per event,
+            the number of "bytes" and the "latency" histograms per event, e.g.
+            `{"resolver": {"https://example.org": {"hit": 3, ..., "bytes": 0, "latency": {...}}}}`
+        """
+        result: dict[str, dict[str, dict[str, Any]]] = {}
+        with self._lock:
+            for (source, prefix), counters in self._counters.items():
+                entry: dict[str, Any] = dict(counters.counts)
+                entry["bytes"] = counters.bytes
+                entry["latency"] = {
+                    event: histogram.to_dict() for event, histogram in counters.latencies.items()
+                }
+                result.setdefault(source, {})[prefix] = entry
+        return result
+
+    def reset(self) -> None:
+        """Remove all counters. Hooks and `enabled` are unchanged."""
+        with self._lock:
+            self._counters = {}
+
+    def add_hook(self, hook: Callable[[MetricEvent], None]) -> None:
+        """Call a function with a [`MetricEvent`](rdf_utils.metrics.MetricEvent) for every
+        recorded event, e.g. one created by [`logging_hook`](rdf_utils.metrics.logging_hook).
+        Hooks are called in the thread recording the event and should return quickly."""
+        with self._lock:
+            self._hooks = (*self._hooks, hook)
+
+    def remove_hook(self, hook: Callable[[MetricEvent], None]) -> None:
+        with self._lock:
+            self._hooks = tuple(h for h in self._hooks if h is not hook)
+
+
+def logging_hook(
+    logger: logging.Logger | None = None, level: int = logging.DEBUG
+) -> Callable[[MetricEvent], None]:
+    """Create a hook logging every event.
+
+    Parameters:
+        logger: logger to use. Default: the "rdf_utils.metrics" logger
+        level: level of the log records
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    def _log(event: MetricEvent) -> None:
+        if event.latency is None:
+            logger.log(level, "%s %s %s", event.source, event.event, event.prefix)
+        else:
+            logger.log(
+                level,
+                "%s %s %s in %.6fs (%d bytes)",
+                event.source,
+                event.event,
+                event.prefix,
+                event.latency,
+                event.size,
+            )
+
+    return _log
+
+
+__METRICS = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Metrics recorded by the caches and resolvers of this package."""
+    return __METRICS
@@ -4,7 +4,7 @@ from typing import Any
 import numpy as np
 from rdflib import BNode, Graph, Literal, URIRef
 
-from rdf_utils.collection import load_list_re
+from rdf_utils.collection import load_list_as_array, load_list_re
 from rdf_utils.models.common import ModelBase
 from rdf_utils.models.vocab import (
     URI_DISTRIB_PRED_COV,
@@ -159,12 +159,11 @@ class DistributionModel(ModelBase):
             assert isinstance(cov_node, BNode), (
                 f"Normal distrib '{self.id}': 'covariance' property not a container, type={type(cov_node)}"
             )
-            cov_vals = load_list_re(graph=graph, first_node=cov_node, parse_uri=False, quiet=False)
             try:
-                cov_mat = np.array(cov_vals, dtype=float)
-            except ValueError as e:
+                cov_mat = load_list_as_array(graph=graph, first_node=cov_node, dtype=float)
+            except (TypeError, ValueError) as e:
                 raise ValueError(
-                    f"Normal distrib '{self.id}', can't convert covariance to float numpy array: {e}\n{cov_vals}"
+                    f"Normal distrib '{self.id}', can't convert covariance to float numpy array: {e}"
                 )
             assert cov_mat.shape == (
                 dim,
@@ -13,7 +13,7 @@ import numpy as np
 from rdflib import BNode, Graph, Literal, URIRef
 from scipy.spatial.transform import RigidTransform, Rotation
 
-from rdf_utils.collection import add_literal_list_pred, load_list_re
+from rdf_utils.collection import add_literal_list_pred, load_list_as_array
 from rdf_utils.constraints import ConstraintViolation
 from rdf_utils.models.common import ModelBase
 from rdf_utils.models.distribution import distrib_from_sampled_quantity, sample_from_distrib
@@ -870,7 +870,7 @@ def get_direction_cosine_matrix(
                 f"Coordinate {coord_model.id} must have one RDF list for {pred}",
             )
         try:
-            row = np.asarray(load_list_re(graph, row_nodes[0], parse_uri=False), dtype=float)
+            row = load_list_as_array(graph, row_nodes[0], dtype=float)
         except (TypeError, ValueError, RuntimeError) as error:
             raise ConstraintViolation(
                 "geometry", f"Coordinate {coord_model.id} has invalid values for {pred}"
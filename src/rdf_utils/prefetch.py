@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: MPL-2.0
+"""Download all known metamodels and SHACL constraints ahead of time, e.g. in container builds."""
+
+import argparse
+import sys
+import time
+import urllib.request
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from socket import _GLOBAL_DEFAULT_TIMEOUT
+
+from rdf_utils import namespace
+from rdf_utils.caching import DEFAULT_MAX_CONCURRENCY
+from rdf_utils.resolver import IriToFileResolver, get_default_url_map
+
+
+class PrefetchResult:
+    """Outcome of fetching a single URL.
+
+    Attributes:
+        url: the fetched URL
+        duration: time in seconds spent opening and reading the URL
+        size: number of bytes read
+        error: exception raised while fetching, `None` on success
+    """
+
+    url: str
+    duration: float
+    size: int
+    error: Exception | None
+
+    def __init__(self, url: str, duration: float, size: int, error: Exception | None) -> None:
+        self.url = url
+        self.duration = duration
+        self.size = size
+        self.error = error
+
+
+def get_metamodel_urls() -> list[str]:
+    """All `URL_MM_*` metamodel and SHACL URLs defined in
+    [`rdf_utils.namespace`](rdf_utils.namespace)."""
+    return sorted(
+        {
+            value
+            for name, value in vars(namespace).items()
+            if name.startswith("URL_MM_") and isinstance(value, str)
+        }
+    )
+
+
+def _fetch(opener: urllib.request.OpenerDirector, url: str, timeout: float) -> PrefetchResult:
+    start = time.perf_counter()
+    try:
+        with opener.open(url, timeout=timeout) as url_data:
+            size = len(url_data.read())
+    except Exception as e:  # noqa: BLE001 - reported per URL instead of aborting the prefetch
+        return PrefetchResult(url, time.perf_counter() - start, 0, e)
+    return PrefetchResult(url, time.perf_counter() - start, size, None)
+
+
+def prefetch(
+    urls: Iterable[str] | None = None,
+    resolver: urllib.request.OpenerDirector | None = None,
+    max_workers: int = DEFAULT_MAX_CONCURRENCY,
+    timeout: float = _GLOBAL_DEFAULT_TIMEOUT,
+) -> list[PrefetchResult]:
+    """Resolve URLs in parallel so that later loads are served from the local cache.
+
+    Parameters:
+        urls: URLs to fetch. Default: all URLs from
+              [`get_metamodel_urls`](rdf_utils.prefetch.get_metamodel_urls)
+        resolver: opener to fetch the URLs with. Default: an
+                  [`IriToFileResolver`](rdf_utils.resolver.IriToFileResolver) with the same
+                  mapping that [`install_resolver`](rdf_utils.resolver.install_resolver) uses
+        max_workers: maximum number of URLs fetched at the same time
+        timeout: duration in seconds to wait for each response
+
+    Returns:
+        results in the same order as `urls`
+    """
+    if urls is None:
+        urls = get_metamodel_urls()
+    if resolver is None:
+        resolver = IriToFileResolver(url_map=get_default_url_map(), download=True, quiet=True)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda url: _fetch(resolver, url, timeout), urls))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point, returns a non-zero exit code if any URL failed."""
+    parser = argparse.ArgumentParser(
+        prog="rdf-utils-prefetch",
+        description="Download metamodels and SHACL constraints into the rdf-utils cache",
+    )
+    parser.add_argument("urls", nargs="*", help="URLs to fetch, default: all known metamodels")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=DEFAULT_MAX_CONCURRENCY, help="parallel downloads"
+    )
+    parser.add_argument("-t", "--timeout", type=float, default=30.0, help="timeout in seconds")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only report failures")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = prefetch(urls=args.urls or None, max_workers=args.workers, timeout=args.timeout)
+    total = time.perf_counter() - start
+
+    num_failed = 0
+    for res in results:
+        if res.error is not None:
+            num_failed += 1
+            print(f"FAILED {res.duration:7.3f}s {res.url}: {res.error}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"ok     {res.duration:7.3f}s {res.size / 1024:8.1f} KiB {res.url}")
+
+    if not args.quiet or num_failed > 0:
+        print(f"fetched {len(results) - num_failed}/{len(results)} URLs in {total:.3f}s")
+    return 1 if num_failed > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,124 @@
 # SPDX-License-Identifier: MPL-2.0
 # Inspired by https://github.com/comp-rob2b/kindyngen/ (kindyngen.utility.resolver)
+import asyncio
+import gzip
+import io
+import lzma
+import os
 import pathlib
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
 import urllib.request
 import urllib.response
+from collections.abc import Iterable
+from contextlib import nullcontext
 from email.message import EmailMessage
+from email.utils import formatdate
+from functools import partial
 from os.path import join
 from socket import _GLOBAL_DEFAULT_TIMEOUT
-
-import platformdirs
+from typing import Generic, TypeVar
 
 from rdf_utils import __version__
+from rdf_utils.caching import (
+    DEFAULT_MAX_CONCURRENCY,
+    PKG_CACHE_ROOT,
+    ContentCache,
+    SingleFlight,
+    file_lock,
+)
+from rdf_utils.http_pool import ConnectionPool, build_pooled_opener
+from rdf_utils.metrics import (
+    EVENT_DOWNLOAD,
+    EVENT_FALLTHROUGH,
+    EVENT_HIT,
+    EVENT_MISS,
+    get_metrics,
+    get_url_origin,
+)
 from rdf_utils.namespace import URL_COMP_ROB2B, URL_SECORO
 
-PKG_CACHE_ROOT = join(platformdirs.user_cache_dir(), "rdf-utils")
+# shared by all resolvers, since different resolvers may map URLs to the same files
+_DOWNLOAD_FLIGHTS = SingleFlight()
+_CONNECTION_POOL = ConnectionPool()
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# suffixes appended to the names of compressed cache files, and functions to open them
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "lzma": ".xz"}
+_COMPRESSION_OPENERS = {"gzip": gzip.open, "lzma": lzma.open}
+
+V = TypeVar("V")
+
+
+def split_url_segments(url: str) -> list[str]:
+    """Split a URL into non-empty path segments, matching how `pathlib.Path` splits a URL.
+
+    Examples:
+        >>> split_url_segments("https://example.org//models/./robot.json")
+        ['https:', 'example.org', 'models', 'robot.json']
+    """
+    return [seg for seg in url.split("/") if seg and seg != "."]
+
+
+class _PrefixTrieNode(Generic[V]):
+    __slots__ = ("children", "has_value", "prefix", "value")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _PrefixTrieNode[V]] = {}
+        self.has_value = False
+        self.prefix = ""
+        self.value: V | None = None
+
+
+class UrlPrefixMap(Generic[V]):
+    """Longest-prefix lookup of URLs in a mapping from URL prefixes to values.
+
+    Prefixes are compiled into a trie over URL path segments, so a lookup costs one dictionary
+    access per segment of the requested URL regardless of the number of prefixes. Prefixes
+    match whole segments only, i.e. `http://example.org/foo` does not match
+    `http://example.org/foobar`, and the longest matching prefix wins when prefixes overlap.
+
+    Parameters:
+        url_map: mapping from URL prefixes to values
+    """
+
+    _root: _PrefixTrieNode[V]
+
+    def __init__(self, url_map: dict[str, V]) -> None:
+        self._root = _PrefixTrieNode()
+        for prefix, value in url_map.items():
+            node = self._root
+            for seg in split_url_segments(prefix):
+                node = node.children.setdefault(seg, _PrefixTrieNode())
+            node.has_value = True
+            node.prefix = prefix
+            node.value = value
+
+    def match(self, url: str) -> tuple[str, V, list[str]] | None:
+        """Find the longest prefix of a URL in the map.
+
+        Returns:
+            the matching prefix, its value and the remaining segments of the URL,
+            or `None` if no prefix matches
+        """
+        segments = split_url_segments(url)
+        node = self._root
+        best = self._root if self._root.has_value else None
+        best_depth = 0
+        for depth, seg in enumerate(segments, start=1):
+            child = node.children.get(seg)
+            if child is None:
+                break
+            node = child
+            if node.has_value:
+                best = node
+                best_depth = depth
+
+        if best is None:
+            return None
+        return best.prefix, best.value, segments[best_depth:]  # type: ignore[return-value]
 
 
 class IriToFileResolver(urllib.request.OpenerDirector):
@@ -28,16 +134,94 @@ class IriToFileResolver(urllib.request.OpenerDirector):
                   to the mapped location.
         quiet: If `False` and `download` is `True` will print where the file will be
                downloaded to.
+        memory_cache: If specified, contents of mapped files are kept in this
+                      [`ContentCache`](rdf_utils.caching.ContentCache), e.g.
+                      `ContentCache(max_bytes=32 * 1024 * 1024)`, and served from memory
+                      without opening the files again. Can be shared between resolvers.
+        retry_backoff: If positive, a failed download is not retried for this many seconds,
+                       doubling with each consecutive failure up to `max_retry_backoff`.
+                       Requests in the meantime fail immediately with a `URLError`.
+        max_retry_backoff: Limit in seconds on the delay between retries of a failed download.
+        revalidate_after: Mapping from URL prefixes to the age in seconds after which
+                          downloaded files are revalidated with the server. Files of URLs
+                          not matching any prefix are trusted forever.
+        compression: If "gzip" or "lzma", downloaded files are stored compressed, with the
+                     suffix ".gz" or ".xz" appended to their names, and decompressed while
+                     reading. Compressed and uncompressed files are read regardless of this
+                     option, so existing cache directories remain usable.
+
+    Note:
+        URLs are matched against the longest prefix in `url_map` using a
+        [`UrlPrefixMap`](rdf_utils.resolver.UrlPrefixMap), which is rebuilt when `url_map` is
+        assigned but not when the assigned dictionary is modified in place.
+        Concurrent requests for the same missing file within a process share a single download.
+        Downloads are streamed to a temporary file, synced and then renamed into place, so a
+        cached file is never seen half-written. An advisory lock on a hidden `.<name>.lock` file
+        next to the cached file makes other processes wait for a download in progress.
+        Downloads and requests for unmapped URLs reuse HTTP connections through a
+        [`ConnectionPool`](rdf_utils.http_pool.ConnectionPool) shared by all resolvers.
+
+        The age of a file is taken from its modification time, which is also sent in the
+        `If-Modified-Since` header of the revalidation request. A file confirmed by the server
+        is touched, a changed file is downloaded again. If revalidation fails, the outdated
+        file is served. Files of URLs without a revalidation age are not checked for changes
+        once they are in `memory_cache`.
     """
 
-    def __init__(self, url_map: dict, download: bool = True, quiet: bool = False):
+    _url_map: dict
+    _prefix_map: UrlPrefixMap
+    _revalidate_map: UrlPrefixMap[float] | None
+    _failures: dict[str, tuple[int, float, OSError]]
+    _file_variants: list[tuple[str, str | None]]
+    memory_cache: ContentCache[bytes] | None
+
+    def __init__(
+        self,
+        url_map: dict,
+        download: bool = True,
+        quiet: bool = False,
+        memory_cache: ContentCache[bytes] | None = None,
+        retry_backoff: float = 0.0,
+        max_retry_backoff: float = 600.0,
+        revalidate_after: dict[str, float] | None = None,
+        compression: str | None = None,
+    ):
         super().__init__()
-        self.default_opener = urllib.request.build_opener()
+        self.default_opener = build_pooled_opener(_CONNECTION_POOL)
         self.url_map = url_map
+        self.memory_cache = memory_cache
         self._download = download
         self._quiet = quiet
         self._empty_header = EmailMessage()  # header expected by addinfourl
 
+        self._retry_backoff = retry_backoff
+        self._max_retry_backoff = max_retry_backoff
+        self._failures = {}
+        self._failures_lock = threading.Lock()
+        self._revalidate_map = None if revalidate_after is None else UrlPrefixMap(revalidate_after)
+
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(
+                f"unsupported compression '{compression}',"
+                f" expected one of {list(COMPRESSION_SUFFIXES)}"
+            )
+        self._compression = compression
+        # suffixes and compressions of the files to look for, the configured one first
+        self._file_variants = [("", None)] + [
+            (suffix, name) for name, suffix in COMPRESSION_SUFFIXES.items()
+        ]
+        self._file_variants.sort(key=lambda variant: variant[1] != compression)
+
+    @property
+    def url_map(self) -> dict:
+        """Mapping from URL prefixes to local directories."""
+        return self._url_map
+
+    @url_map.setter
+    def url_map(self, url_map: dict) -> None:
+        self._url_map = url_map
+        self._prefix_map = UrlPrefixMap(url_map)
+
     def open(self, fullurl, data=None, timeout=_GLOBAL_DEFAULT_TIMEOUT):
         if isinstance(fullurl, str):
             url_req = urllib.request.Request(fullurl)
@@ -49,48 +233,274 @@ class IriToFileResolver(urllib.request.OpenerDirector):
                 f"expected URL of type 'str' or 'urllib.request.Request', got type '{type(fullurl)}'"
             )
 
-        url = pathlib.Path(url_req.full_url)
+        metrics = get_metrics()
+        if not metrics.enabled:
+            return self._open(url_req, data, timeout)[0]
+
+        start = time.perf_counter()
+        resp, prefix, event = self._open(url_req, data, timeout)
+        metrics.record("resolver", prefix, event, time.perf_counter() - start)
+        return resp
 
+    def _open(
+        self, url_req: urllib.request.Request, data, timeout
+    ) -> tuple[urllib.response.addinfourl, str, str]:
+        """Open a request.
+
+        Returns:
+            the response, the matching URL prefix and the metrics event of the request
+        """
         # If the requested URL starts with any key in the url_map, fetch the file from a
         # local file that is derived from the URL and the value in the map
-        for prefix, directory in self.url_map.items():
-            if not url.is_relative_to(prefix):
-                continue
+        match = self._prefix_map.match(url_req.full_url)
+        if match is not None:
+            prefix, directory, rel_segments = match
 
             # Wrap the directory in a pathlib.Path to get access to convenience functions
-            path = pathlib.Path(directory).joinpath(url.relative_to(prefix))
+            path = pathlib.Path(directory).joinpath(*rel_segments)
+
+            max_age = None
+            if self._revalidate_map is not None:
+                age_match = self._revalidate_map.match(url_req.full_url)
+                if age_match is not None:
+                    max_age = age_match[1]
+
+            if max_age is None and self.memory_cache is not None:
+                content = self.memory_cache.get(str(path))
+                if content is not None:
+                    return self._wrap_content(content, url_req.full_url), prefix, EVENT_HIT
 
             # Download file if not exist in system and `download` is specified.
-            # If `download` not specified, break from loop to open URL using default opener.
-            if not path.exists():
-                if not self._download:
-                    break
-
-                parent_path = path.parent
-                if not parent_path.exists():
-                    parent_path.mkdir(parents=True)
-                assert parent_path.is_dir(), f"not a directory: {parent_path}"
-
-                if not self._quiet:
-                    print(f"Dowloading '{url}' & caching to '{parent_path}'")
-
-                with (
-                    self.default_opener.open(url_req, data=data, timeout=timeout) as url_data,
-                    path.open("wb") as cache_file,
-                ):
-                    cache_file.write(url_data.read())
-                assert path.exists(), f"File '{path}' not cached for URL '{url_req.full_url}'"
-
-            # Open the file and wrap it in an urllib response
-            fp = path.open("rb")
-            resp = urllib.response.addinfourl(
-                fp, headers=self._empty_header, url=url_req.full_url, code=200
-            )
-            return resp
+            # If `download` not specified, open URL using default opener.
+            cached = self._find_cached_file(path)
+            event = EVENT_HIT if cached is not None else EVENT_MISS
+            if cached is None and self._download:
+                self._fetch_file(url_req, path, data, timeout, None)
+                cached = self._find_cached_file(path)
+            elif cached is not None and self._download and _is_outdated(cached[2], max_age):
+                try:
+                    self._fetch_file(url_req, path, data, timeout, max_age)
+                    cached = self._find_cached_file(path)
+                except OSError as e:
+                    if not self._quiet:
+                        print(f"Revalidating '{url_req.full_url}' failed, using cached file: {e}")
+
+            if cached is not None and self.memory_cache is not None:
+                file_path, compression, file_stat = cached
+                token = (str(file_path), file_stat.st_mtime_ns, file_stat.st_size)
+                content = None if max_age is None else self.memory_cache.get(str(path), token)
+                if content is None:
+                    with _open_cached_file(file_path, compression) as fp:
+                        content = fp.read()
+                    self.memory_cache.put(str(path), content, token)
+                return self._wrap_content(content, url_req.full_url), prefix, event
+
+            if cached is not None:
+                # Open the file and wrap it in an urllib response
+                fp = _open_cached_file(cached[0], cached[1])
+                resp = urllib.response.addinfourl(
+                    fp, headers=self._empty_header, url=url_req.full_url, code=200
+                )
+                return resp, prefix, event
+        else:
+            prefix = get_url_origin(url_req.full_url)
 
         # If we did not find any match above just continue with the default opener
         # which has the behaviour as initially expected by rdflib.
-        return self.default_opener.open(url_req, data=data, timeout=timeout)
+        resp = self.default_opener.open(url_req, data=data, timeout=timeout)
+        return resp, prefix, EVENT_FALLTHROUGH
+
+    def _find_cached_file(
+        self, path: pathlib.Path
+    ) -> tuple[pathlib.Path, str | None, os.stat_result] | None:
+        """Find the cached file of a path, compressed or not.
+
+        Returns:
+            path of the cached file, its compression and its stat, or `None` if not cached
+        """
+        for suffix, compression in self._file_variants:
+            file_path = path.with_name(path.name + suffix) if suffix else path
+            file_stat = _stat_or_none(file_path)
+            if file_stat is not None:
+                return file_path, compression, file_stat
+        return None
+
+    def _wrap_content(self, content: bytes, url: str) -> urllib.response.addinfourl:
+        # BytesIO shares the buffer of a bytes object until it is written to
+        return urllib.response.addinfourl(
+            io.BytesIO(content), headers=self._empty_header, url=url, code=200
+        )
+
+    def _fetch_file(
+        self,
+        url_req: urllib.request.Request,
+        path: pathlib.Path,
+        data,
+        timeout,
+        max_age: float | None,
+    ) -> None:
+        with self._failures_lock:
+            failure = self._failures.get(str(path))
+        if failure is not None:
+            num_failures, retry_time, error = failure
+            if time.monotonic() < retry_time:
+                raise urllib.error.URLError(
+                    f"download of '{url_req.full_url}' failed {num_failures} time(s), "
+                    f"next attempt in {retry_time - time.monotonic():.1f}s: {error}"
+                )
+
+        _DOWNLOAD_FLIGHTS.do(
+            str(path), partial(self._download_file, url_req, path, data, timeout, max_age)
+        )
+
+    def _download_file(
+        self,
+        url_req: urllib.request.Request,
+        path: pathlib.Path,
+        data,
+        timeout,
+        max_age: float | None,
+    ) -> None:
+        # only the thread running the flight updates the failures and metrics,
+        # not the ones waiting on it
+        metrics = get_metrics()
+        start = time.perf_counter() if metrics.enabled else 0.0
+        try:
+            size = self._stream_to_file(url_req, path, data, timeout, max_age)
+        except OSError as e:
+            if self._retry_backoff > 0:
+                with self._failures_lock:
+                    num_failures = self._failures.get(str(path), (0, 0.0, e))[0] + 1
+                    delay = min(
+                        self._retry_backoff * 2 ** (num_failures - 1), self._max_retry_backoff
+                    )
+                    self._failures[str(path)] = (num_failures, time.monotonic() + delay, e)
+            raise
+
+        with self._failures_lock:
+            self._failures.pop(str(path), None)
+
+        if metrics.enabled and size is not None:
+            match = self._prefix_map.match(url_req.full_url)
+            prefix = match[0] if match is not None else get_url_origin(url_req.full_url)
+            metrics.record("resolver", prefix, EVENT_DOWNLOAD, time.perf_counter() - start, size)
+
+    def _stream_to_file(
+        self,
+        url_req: urllib.request.Request,
+        path: pathlib.Path,
+        data,
+        timeout,
+        max_age: float | None,
+    ) -> int | None:
+        """Download a file into the cache, or revalidate an outdated one.
+
+        Returns:
+            number of bytes downloaded or `None` if the cached file was up to date
+        """
+        # another thread may have finished the download before this flight started
+        cached = self._find_cached_file(path)
+        if cached is not None and not _is_outdated(cached[2], max_age):
+            return None
+
+        parent_path = path.parent
+        parent_path.mkdir(parents=True, exist_ok=True)
+        assert parent_path.is_dir(), f"not a directory: {parent_path}"
+
+        with file_lock(str(parent_path.joinpath(f".{path.name}.lock"))):
+            # another process may have finished the download while this one waited for the lock
+            cached = self._find_cached_file(path)
+            if cached is not None and not _is_outdated(cached[2], max_age):
+                return None
+
+            if cached is None:
+                compression = self._compression
+                file_path = path
+                if compression is not None:
+                    file_path = path.with_name(path.name + COMPRESSION_SUFFIXES[compression])
+            else:
+                # an outdated file is replaced in its current format
+                file_path, compression, file_stat = cached
+                # copy to not leak the conditional header to the caller's request
+                url_req = urllib.request.Request(
+                    url_req.full_url, headers=dict(url_req.header_items())
+                )
+                url_req.add_header("If-Modified-Since", formatdate(file_stat.st_mtime, usegmt=True))
+            try:
+                url_data = self.default_opener.open(url_req, data=data, timeout=timeout)
+            except urllib.error.HTTPError as e:
+                if e.code != 304 or cached is None:
+                    raise
+                e.close()
+                # not modified, restart the age of the cached file
+                os.utime(file_path)
+                return None
+
+            if not self._quiet:
+                print(f"Dowloading '{url_req.full_url}' & caching to '{parent_path}'")
+
+            fd, tmp_path = tempfile.mkstemp(
+                dir=parent_path, prefix=f".{path.name}.", suffix=".part"
+            )
+            try:
+                with os.fdopen(fd, "wb") as raw_file, url_data:
+                    with _open_cache_writer(raw_file, compression) as cache_file:
+                        shutil.copyfileobj(url_data, cache_file, DOWNLOAD_CHUNK_SIZE)
+                        # number of uncompressed bytes written
+                        size = cache_file.tell()
+                    raw_file.flush()
+                    os.fsync(raw_file.fileno())
+
+                    # http.client does not raise if the server closes the connection early
+                    expected_size = url_data.headers.get("Content-Length")
+                    if expected_size is not None and size < int(expected_size):
+                        raise urllib.error.ContentTooShortError(
+                            f"download of '{url_req.full_url}' incomplete: "
+                            f"got {size} of {expected_size} bytes",
+                            (None, None),
+                        )
+                os.replace(tmp_path, file_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            return size
+
+
+def _open_cached_file(path: pathlib.Path, compression: str | None):
+    if compression is None:
+        return path.open("rb")
+    return _COMPRESSION_OPENERS[compression](path, "rb")
+
+
+def _open_cache_writer(raw_file, compression: str | None):
+    if compression is None:
+        return nullcontext(raw_file)
+    return _COMPRESSION_OPENERS[compression](raw_file, "wb")
+
+
+def _stat_or_none(path: pathlib.Path) -> os.stat_result | None:
+    try:
+        return path.stat()
+    except FileNotFoundError:
+        return None
+
+
+def _is_outdated(path_stat: os.stat_result, max_age: float | None) -> bool:
+    return max_age is not None and time.time() - path_stat.st_mtime > max_age
+
+
+def get_connection_pool() -> ConnectionPool:
+    """The [`ConnectionPool`](rdf_utils.http_pool.ConnectionPool) shared by the default openers
+    of all resolvers."""
+    return _CONNECTION_POOL
+
+
+def get_default_url_map() -> dict[str, str]:
+    """URL map caching the SECORO and comp-rob2b websites under `PKG_CACHE_ROOT`."""
+    return {
+        URL_SECORO: join(PKG_CACHE_ROOT, "secoro"),
+        URL_COMP_ROB2B: join(PKG_CACHE_ROOT, "comp-rob2b"),
+    }
 
 
 def install_resolver(
@@ -119,10 +529,40 @@ def install_resolver(
     """
     if resolver is None:
         if url_map is None:
-            url_map = {
-                URL_SECORO: join(PKG_CACHE_ROOT, "secoro"),
-                URL_COMP_ROB2B: join(PKG_CACHE_ROOT, "comp-rob2b"),
-            }
+            url_map = get_default_url_map()
         resolver = IriToFileResolver(url_map=url_map, download=download, quiet=quiet)
 
     urllib.request.install_opener(resolver)
+
+
+def _read_url(opener: urllib.request.OpenerDirector | None, url: str, timeout) -> bytes:
+    open_func = urllib.request.urlopen if opener is None else opener.open
+    with open_func(url, timeout=timeout) as url_data:
+        return url_data.read()
+
+
+async def open_urls_async(
+    urls: Iterable[str],
+    resolver: urllib.request.OpenerDirector | None = None,
+    timeout: float = _GLOBAL_DEFAULT_TIMEOUT,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[bytes]:
+    """Open and read multiple URLs concurrently, e.g. to fill a resolver's cache directories.
+
+    Parameters:
+        urls: URLs to open
+        resolver: opener to use, e.g. an [`IriToFileResolver`](rdf_utils.resolver.IriToFileResolver).
+                  If none specified, use the globally installed opener like `urlopen`.
+        timeout: duration in seconds to wait for each response
+        max_concurrency: maximum number of requests in progress at the same time
+
+    Returns:
+        response contents in the same order as `urls`
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _read(url: str) -> bytes:
+        async with semaphore:
+            return await asyncio.to_thread(_read_url, resolver, url, timeout)
+
+    return list(await asyncio.gather(*(_read(url) for url in urls)))
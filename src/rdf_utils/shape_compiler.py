@@ -0,0 +1,243 @@
+# SPDX-License-Identifier: MPL-2.0
+"""Compile a subset of SHACL Core shapes into Python predicates over indexes of a data graph.
+
+A compiled shape only decides whether a focus node conforms to it. Focus nodes that do not
+conform are validated again by pyshacl to produce the validation results, so that reports are
+the same as without compilation. Supported are node and property shapes with IRI or inverse IRI
+paths and the constraints `sh:class`, `sh:datatype`, `sh:nodeKind`, `sh:in`, `sh:hasValue`,
+`sh:minCount`, `sh:maxCount` and `sh:property`. Shapes using anything else are not compiled.
+"""
+
+from collections.abc import Callable
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from pyshacl import Shape, ShapesGraph
+from rdflib import RDF, RDFS, SH, XSD, BNode, Literal, URIRef
+from rdflib.term import Node
+
+if TYPE_CHECKING:
+    from pyshacl.pytypes import GraphLike
+
+# predicates of a shape that do not constrain its value nodes
+_NON_CONSTRAINT_PREDICATES = frozenset(
+    (
+        RDF.type,
+        RDFS.label,
+        RDFS.comment,
+        SH.path,
+        SH.targetClass,
+        SH.targetNode,
+        SH.targetSubjectsOf,
+        SH.targetObjectsOf,
+        SH.severity,
+        SH.message,
+        SH.name,
+        SH.description,
+        SH.order,
+        SH.group,
+        SH.defaultValue,
+        SH.deactivated,
+    )
+)
+_COUNT_PREDICATES = frozenset((SH.minCount, SH.maxCount))
+# node kinds matched by IRIs, blank nodes and literals
+_IRI_KINDS = frozenset((SH.IRI, SH.IRIOrLiteral, SH.BlankNodeOrIRI))
+_BNODE_KINDS = frozenset((SH.BlankNode, SH.BlankNodeOrLiteral, SH.BlankNodeOrIRI))
+_LITERAL_KINDS = frozenset((SH.Literal, SH.BlankNodeOrLiteral, SH.IRIOrLiteral))
+# Python types of literal values checked by pyshacl's sh:datatype, other datatypes always match
+_DATATYPE_VALUE_TYPES: dict[Node, type | tuple[type, ...]] = {
+    XSD.string: (str, bytes),
+    RDF.langString: (str, bytes),
+    XSD.integer: int,
+    XSD.float: float,
+    XSD.decimal: Decimal,
+    XSD.boolean: bool,
+    XSD.date: date,
+    XSD.time: time,
+    XSD.dateTime: datetime,
+}
+
+_Values = Callable[["GraphIndex", Node], set[Node]]
+_Check = Callable[["GraphIndex", set[Node]], bool]
+ShapePredicate = Callable[["GraphIndex", Node], bool]
+
+
+class GraphIndex:
+    """Lookup tables of a data graph, built on first use of a predicate.
+
+    Attributes:
+        graph: the indexed graph, must not be modified while the index is used
+    """
+
+    graph: "GraphLike"
+    _objects: dict[Node, dict[Node, set[Node]]]
+    _subjects: dict[Node, dict[Node, set[Node]]]
+    _subclasses: dict[Node, frozenset[Node]]
+
+    def __init__(self, graph: "GraphLike") -> None:
+        self.graph = graph
+        self._objects = {}
+        self._subjects = {}
+        self._subclasses = {}
+
+    def objects(self, pred: Node) -> dict[Node, set[Node]]:
+        """Mapping from subject to the objects of its triples with predicate `pred`."""
+        table = self._objects.get(pred)
+        if table is None:
+            table = self._objects[pred] = {}
+            for subj, obj in self.graph.subject_objects(pred):  # type: ignore[arg-type]
+                table.setdefault(subj, set()).add(obj)
+        return table
+
+    def subjects(self, pred: Node) -> dict[Node, set[Node]]:
+        """Mapping from object to the subjects of its triples with predicate `pred`."""
+        table = self._subjects.get(pred)
+        if table is None:
+            table = self._subjects[pred] = {}
+            for subj, obj in self.graph.subject_objects(pred):  # type: ignore[arg-type]
+                table.setdefault(obj, set()).add(subj)
+        return table
+
+    def subclasses(self, cls: Node) -> frozenset[Node]:
+        """The class and all its direct and indirect subclasses."""
+        classes = self._subclasses.get(cls)
+        if classes is None:
+            classes = self._subclasses[cls] = frozenset(
+                self.graph.transitive_subjects(RDFS.subClassOf, cls)  # type: ignore[arg-type]
+            )
+        return classes
+
+
+def _datatype_matches(value: Node, datatype: Node) -> bool:
+    """Whether a value node matches a datatype like in pyshacl's sh:datatype constraint."""
+    if not isinstance(value, Literal):
+        return False
+    if value.datatype == datatype:
+        if getattr(value, "ill_typed", None) is True:
+            return False
+    elif datatype == RDFS.Literal:
+        return True
+    elif datatype == RDFS.Datatype:
+        return value.datatype is not None
+    elif not (
+        (value.datatype is None and value.language is None and datatype == XSD.string)
+        or (datatype == RDF.langString and value.language)
+    ):
+        return False
+
+    value_types = _DATATYPE_VALUE_TYPES.get(datatype)
+    return value_types is None or isinstance(value.value, value_types)
+
+
+def _node_kinds(value: Node) -> frozenset[Node]:
+    if isinstance(value, BNode):
+        return _BNODE_KINDS
+    if isinstance(value, Literal):
+        return _LITERAL_KINDS
+    return _IRI_KINDS
+
+
+def _compile_path(shapes_graph: ShapesGraph, path: Node) -> _Values | None:
+    """Function of the value nodes of a focus node, for an IRI or inverse IRI path."""
+    if isinstance(path, URIRef):
+        return lambda index, focus: index.objects(path).get(focus, set())
+
+    path_triples = list(shapes_graph.graph.predicate_objects(path))
+    if len(path_triples) != 1 or path_triples[0][0] != SH.inversePath:
+        return None
+    inverse = path_triples[0][1]
+    if not isinstance(inverse, URIRef):
+        return None
+    return lambda index, focus: index.subjects(inverse).get(focus, set())
+
+
+def _compile_checks(shape: Shape, stack: tuple[Node, ...]) -> list[_Check] | None:
+    """Checks of the value node set of a focus node for each constraint of a shape."""
+    graph = shape.sg.graph
+    checks: list[_Check] = []
+    for pred, param in graph.predicate_objects(shape.node):
+        if pred in _NON_CONSTRAINT_PREDICATES:
+            continue
+        if pred in _COUNT_PREDICATES:
+            if not shape.is_property_shape or not isinstance(param, Literal):
+                return None
+            count = int(param.toPython())
+            if pred == SH.minCount:
+                if count > 0:
+                    checks.append(lambda index, values, count=count: len(values) >= count)
+            else:
+                checks.append(lambda index, values, count=count: len(values) <= count)
+        elif pred == SH["class"]:
+            checks.append(
+                lambda index, values, cls=param: all(
+                    not isinstance(v, Literal)
+                    and not index.subclasses(cls).isdisjoint(index.objects(RDF.type).get(v, ()))
+                    for v in values
+                )
+            )
+        elif pred == SH.datatype:
+            checks.append(
+                lambda index, values, dt=param: all(_datatype_matches(v, dt) for v in values)
+            )
+        elif pred == SH.nodeKind:
+            checks.append(
+                lambda index, values, kind=param: all(kind in _node_kinds(v) for v in values)
+            )
+        elif pred == SH["in"]:
+            members = frozenset(graph.items(param))
+            checks.append(lambda index, values, members=members: values <= members)
+        elif pred == SH.hasValue:
+            checks.append(lambda index, values, value=param: value in values)
+        elif pred == SH.property:
+            if param in stack:
+                return None
+            prop_shape = shape.get_other_shape(param)
+            if prop_shape is None or not prop_shape.is_property_shape:
+                return None
+            prop_predicate = _compile(prop_shape, stack)
+            if prop_predicate is None:
+                return None
+            checks.append(
+                lambda index, values, prop=prop_predicate: all(prop(index, v) for v in values)
+            )
+        elif pred.startswith(SH):
+            return None
+    return checks
+
+
+def _compile(shape: Shape, stack: tuple[Node, ...]) -> ShapePredicate | None:
+    if shape.deactivated:
+        return lambda index, focus: True
+
+    checks = _compile_checks(shape, (*stack, shape.node))
+    if checks is None:
+        return None
+
+    if not shape.is_property_shape:
+        return lambda index, focus: all(check(index, {focus}) for check in checks)
+
+    values = _compile_path(shape.sg, shape.path())
+    if values is None:
+        return None
+
+    def predicate(index: GraphIndex, focus: Node) -> bool:
+        value_nodes = values(index, focus)
+        return all(check(index, value_nodes) for check in checks)
+
+    return predicate
+
+
+def compile_shape(shape: Shape) -> ShapePredicate | None:
+    """Compile a shape into a function of a [`GraphIndex`](rdf_utils.shape_compiler.GraphIndex)
+    and a focus node, which is true if the focus node conforms to the shape.
+
+    Returns:
+        the predicate, or `None` if the shape uses a feature that is not supported, in which
+        case the shape needs to be validated by pyshacl
+    """
+    if (None, RDF.type, SH.ConstraintComponent) in shape.sg.graph:
+        # parameters of custom constraint components may appear on any shape
+        return None
+    return _compile(shape, ())
@@ -0,0 +1,287 @@
+# SPDX-License-Identifier: MPL-2.0
+"""Binary snapshots of parsed RDF graphs for loading graphs without the RDF parsers.
+
+A snapshot stores a table of the graph's distinct terms and the triples as indices into that
+table, together with the graph's namespace bindings. Snapshots are only meant for local caching,
+the format may change between versions of this package.
+
+Snapshots are keyed by the content of the parsed document and of the remote JSON-LD `@context`s
+it loads while parsing, so that a changed context also gets a new snapshot.
+"""
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import tempfile
+import urllib.request
+from array import array
+from collections.abc import Iterable
+from os.path import join
+from pathlib import Path
+from typing import Any
+from urllib.parse import urljoin, urlsplit
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.term import Node
+
+from rdf_utils.caching import PKG_CACHE_ROOT
+
+SNAPSHOT_ROOT = join(PKG_CACHE_ROOT, "snapshots")
+SNAPSHOT_SUFFIX = ".rdfsnap"
+
+_SNAPSHOT_MAGIC = b"RDFSNAP\x01"
+_URI, _BNODE, _LITERAL = 0, 1, 2
+_URL_SCHEMES = {"http", "https", "ftp", "file"}
+# formats whose documents may load remote JSON-LD contexts, which are part of the hash
+_JSON_LD_FORMATS = {"json-ld", "application/ld+json"}
+# JSON-LD keywords whose values may reference remote contexts
+_JSON_LD_CONTEXT_KEYS = ("@context", "@import")
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Only allows builtin containers and strings, snapshots never reference classes."""
+
+    def find_class(self, module: str, name: str):
+        raise pickle.UnpicklingError(f"snapshot references forbidden global '{module}.{name}'")
+
+
+def dump_graph_snapshot(graph: Graph) -> bytes:
+    """Serialize a graph and its namespace bindings into a binary snapshot.
+
+    Parameters:
+        graph: graph to serialize
+
+    Returns:
+        snapshot bytes, to be loaded with
+        [`loads_graph_snapshot`](rdf_utils.snapshot.loads_graph_snapshot)
+    """
+    term_ids: dict[Node, int] = {}
+    kinds = bytearray()
+    values: list[str] = []
+    datatypes: list[str | None] = []
+    langs: list[str | None] = []
+    triple_ids = array("I")
+
+    for triple in graph.triples((None, None, None)):
+        for term in triple:
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = len(values)
+                term_ids[term] = term_id
+                if isinstance(term, Literal):
+                    kinds.append(_LITERAL)
+                    datatypes.append(None if term.datatype is None else str(term.datatype))
+                    langs.append(term.language)
+                else:
+                    kinds.append(_BNODE if isinstance(term, BNode) else _URI)
+                    datatypes.append(None)
+                    langs.append(None)
+                values.append(str(term))
+            triple_ids.append(term_id)
+
+    payload = {
+        "namespaces": [(prefix, str(ns)) for prefix, ns in graph.namespaces()],
+        "kinds": bytes(kinds),
+        "values": values,
+        "datatypes": datatypes,
+        "langs": langs,
+        "triples": triple_ids.tobytes(),
+        "itemsize": triple_ids.itemsize,
+    }
+    return _SNAPSHOT_MAGIC + pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads_graph_snapshot(data: bytes, graph: Graph | None = None) -> Graph:
+    """Load a graph from snapshot bytes.
+
+    Parameters:
+        data: snapshot bytes created by
+              [`dump_graph_snapshot`](rdf_utils.snapshot.dump_graph_snapshot)
+        graph: graph to add the triples and namespace bindings to. Default: a new graph
+
+    Raises:
+        ValueError: if the data is not a snapshot of a supported version
+    """
+    if not data.startswith(_SNAPSHOT_MAGIC):
+        raise ValueError("data is not an rdf-utils graph snapshot of a supported version")
+    try:
+        payload = _SnapshotUnpickler(io.BytesIO(data[len(_SNAPSHOT_MAGIC) :])).load()
+    except (pickle.UnpicklingError, EOFError) as e:
+        raise ValueError(f"invalid graph snapshot: {e}")
+
+    if graph is None:
+        graph = Graph()
+    for prefix, namespace in payload["namespaces"]:
+        graph.bind(prefix, namespace, override=True, replace=True)
+
+    terms: list[Node] = []
+    for kind, value, datatype, lang in zip(
+        payload["kinds"], payload["values"], payload["datatypes"], payload["langs"]
+    ):
+        if kind == _URI:
+            terms.append(URIRef(value))
+        elif kind == _BNODE:
+            terms.append(BNode(value))
+        else:
+            terms.append(Literal(value, lang=lang, datatype=datatype))
+
+    triple_ids = array("I")
+    if triple_ids.itemsize != payload["itemsize"]:
+        raise ValueError("graph snapshot was created on a platform with a different int size")
+    triple_ids.frombytes(payload["triples"])
+    # terms are known to be valid, skip the per-triple checks of Graph.addN
+    graph.store.addN(
+        (terms[triple_ids[i]], terms[triple_ids[i + 1]], terms[triple_ids[i + 2]], graph)  # type: ignore[misc]
+        for i in range(0, len(triple_ids), 3)
+    )
+    return graph
+
+
+def save_graph_snapshot(graph: Graph, path: str) -> None:
+    """Write a binary snapshot of a graph to a file, replacing the file atomically."""
+    dir_path = os.path.dirname(path) or "."
+    os.makedirs(dir_path, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(dump_graph_snapshot(graph))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_graph_snapshot(path: str) -> Graph:
+    """Load a graph from a snapshot file written by
+    [`save_graph_snapshot`](rdf_utils.snapshot.save_graph_snapshot)."""
+    with open(path, "rb") as infile:
+        return loads_graph_snapshot(infile.read())
+
+
+def _read_source(source: str) -> tuple[bytes, str]:
+    """Read a document, also returning the base IRI `Graph.parse` would use for it."""
+    if urlsplit(source).scheme in _URL_SCHEMES:
+        with urllib.request.urlopen(source) as url_data:
+            return url_data.read(), source
+
+    with open(source, "rb") as infile:
+        return infile.read(), Path(source).absolute().as_uri()
+
+
+def _collect_context_urls(value: Any, base: str, urls: list[str]) -> None:
+    """Collect the URLs of remote contexts referenced anywhere in a JSON-LD value, including
+    embedded and scoped contexts."""
+    if isinstance(value, list):
+        for item in value:
+            _collect_context_urls(item, base, urls)
+        return
+    if not isinstance(value, dict):
+        return
+
+    for key, item in value.items():
+        if key not in _JSON_LD_CONTEXT_KEYS:
+            _collect_context_urls(item, base, urls)
+            continue
+        for ref in item if isinstance(item, list) else (item,):
+            if isinstance(ref, str):
+                urls.append(urljoin(base, ref))
+            else:
+                _collect_context_urls(ref, base, urls)
+
+
+def get_json_ld_contexts(data: bytes, public_id: str) -> list[tuple[str, bytes]]:
+    """Read the remote contexts a JSON-LD document loads, including contexts of contexts.
+
+    Parameters:
+        data: raw content of the JSON-LD document
+        public_id: base IRI for resolving relative context URLs in the document
+
+    Returns:
+        URL and raw content of each context, in the order they are found
+    """
+    contexts: list[tuple[str, bytes]] = []
+    seen: set[str] = set()
+    pending = [(data, public_id)]
+    while pending:
+        doc_data, doc_base = pending.pop()
+        try:
+            value = json.loads(doc_data)
+        except ValueError:
+            # not JSON, the parser reports the error
+            continue
+
+        urls: list[str] = []
+        _collect_context_urls(value, doc_base, urls)
+        for url in urls:
+            if url in seen:
+                continue
+            seen.add(url)
+            context_data, context_base = _read_source(url)
+            contexts.append((url, context_data))
+            pending.append((context_data, context_base))
+    return contexts
+
+
+def get_snapshot_path(
+    data: bytes,
+    fmt: str,
+    public_id: str,
+    snapshot_dir: str | None = None,
+    contexts: Iterable[tuple[str, bytes]] = (),
+) -> str:
+    """Path of the snapshot for a document's content, named after its SHA-256 hash.
+
+    Parameters:
+        data: raw content of the RDF document
+        fmt: format of the RDF document, part of the hash
+        public_id: base IRI for resolving relative IRIs in the document, part of the hash
+        snapshot_dir: directory of the snapshots. Default: `SNAPSHOT_ROOT`
+        contexts: URL and content of the remote JSON-LD contexts loaded by the document,
+                  part of the hash, see
+                  [`get_json_ld_contexts`](rdf_utils.snapshot.get_json_ld_contexts)
+    """
+    content_hash = hashlib.sha256(
+        b"\0".join((fmt.encode("utf-8"), public_id.encode("utf-8"), data))
+    )
+    for url, context_data in contexts:
+        content_hash.update(b"\0".join((b"", url.encode("utf-8"), context_data)))
+    if snapshot_dir is None:
+        snapshot_dir = SNAPSHOT_ROOT
+    return join(snapshot_dir, content_hash.hexdigest() + SNAPSHOT_SUFFIX)
+
+
+def parse_with_snapshot(source: str, fmt: str, snapshot_dir: str | None = None) -> Graph:
+    """Parse an RDF document, reusing a snapshot of a previous parse of the same content.
+
+    The document is still read on every call, but only parsed if no snapshot exists for the
+    hash of its content, format and base IRI, so a changed document gets a new snapshot.
+    The remote `@context`s of JSON-LD documents are also read on every call and hashed with the
+    document, so a changed context also gets a new snapshot.
+
+    Parameters:
+        source: path or URL of the RDF document. URLs are opened with `urlopen`, so an installed
+                [`IriToFileResolver`](rdf_utils.resolver.IriToFileResolver) is used.
+        fmt: format of the RDF document, e.g. "turtle" or "json-ld"
+        snapshot_dir: directory of the snapshots. Default: `SNAPSHOT_ROOT`,
+                      e.g. `$HOME/.cache/rdf-utils/snapshots/` on Linux
+
+    Returns:
+        the parsed graph
+    """
+    data, public_id = _read_source(source)
+    contexts = get_json_ld_contexts(data, public_id) if fmt in _JSON_LD_FORMATS else []
+    snapshot_path = get_snapshot_path(data, fmt, public_id, snapshot_dir, contexts)
+    try:
+        return load_graph_snapshot(snapshot_path)
+    except FileNotFoundError:
+        pass
+    except ValueError:
+        # outdated or corrupted snapshot, replaced below
+        pass
+
+    graph = Graph()
+    graph.parse(data=data, format=fmt, publicID=public_id)
+    save_graph_snapshot(graph, snapshot_path)
+    return graph
@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: MPL-2.0
+"""Local HTTP server standing in for remote model repositories in tests."""
+
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    server: "StandInServer"
+
+    def setup(self):
+        super().setup()
+        if self.server.keep_alive:
+            self.protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            if self.connection not in server.connections:
+                server.connections.append(self.connection)
+        time.sleep(server.delay)
+
+        if "missing" in self.path:
+            self._record(404)
+            self.send_error(404)
+            return
+        etag_matches = server.etag is not None and self.headers.get("If-None-Match") == server.etag
+        not_modified = (
+            server.check_modified
+            and self.headers.get("If-Modified-Since") is not None
+            and "changed" not in self.path
+        )
+        if etag_matches or not_modified:
+            self._record(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self._record(200)
+        self.send_response(200)
+        if server.etag is not None:
+            self.send_header("ETag", server.etag)
+        if "truncated" in self.path:
+            # announce more content than is sent
+            self.send_header("Content-Length", str(len(server.body) * 2))
+            self.end_headers()
+            self.wfile.write(server.body)
+            self.close_connection = True
+            return
+
+        self.send_header("Content-Length", str(len(server.body)))
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def _record(self, status: int) -> None:
+        with self.server.lock:
+            self.server.requests.append((self.path, status))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Serves the same body for any path on a free local port, from a daemon thread.
+
+    Paths containing "missing" are answered with 404, and paths containing "truncated" with
+    a body shorter than the announced length.
+
+    Attributes:
+        base_url: URL of the server, without trailing slash
+        requests: path and response status of each request
+        connections: the distinct client connections requests were received on
+
+    Parameters:
+        body: content of the responses
+        delay: seconds to wait before answering a request
+        etag: if given, sent with every response, and requests with a matching
+              `If-None-Match` are answered with 304
+        check_modified: if true, requests with `If-Modified-Since` are answered with 304,
+                        unless the path contains "changed"
+        keep_alive: if true, answer with HTTP/1.1 and keep connections open
+    """
+
+    base_url: str
+    requests: list[tuple[str, int]]
+    connections: list[socket.socket]
+
+    def __init__(
+        self,
+        body: bytes,
+        delay: float = 0.0,
+        etag: str | None = None,
+        check_modified: bool = False,
+        keep_alive: bool = False,
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.body = body
+        self.delay = delay
+        self.etag = etag
+        self.check_modified = check_modified
+        self.keep_alive = keep_alive
+        self.requests = []
+        self.connections = []
+        self.lock = threading.Lock()
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def paths(self) -> list[str]:
+        """Requested paths in order."""
+        with self.lock:
+            return [path for path, _ in self.requests]
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: MPL-2.0
+import gzip
+import os
+import tempfile
+import unittest
+import urllib.error
+import zipfile
+from os.path import join
+
+from stand_in_server import StandInServer
+
+from rdf_utils.archive import ArchiveResolver, build_cache_archive, get_archive_member_name
+from rdf_utils.resolver import get_connection_pool
+
+TEST_BODY = b"# remote\n"
+
+
+class ArchiveResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(TEST_BODY, keep_alive=True)
+        self.base_url = self.server.base_url
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        cache_dir = join(self.tmp_dir.name, "cache")
+        os.makedirs(join(cache_dir, "models"))
+        with open(join(cache_dir, "models", "cached.ttl"), "wb") as outfile:
+            outfile.write(b"# cached\n")
+        with gzip.open(join(cache_dir, "models", "compressed.ttl.gz"), "wb") as outfile:
+            outfile.write(b"# compressed\n")
+        # leftovers of downloads, must not be packed
+        for name in (".cached.ttl.lock", ".cached.ttl.abc.part"):
+            open(join(cache_dir, "models", name), "w").close()
+
+        self.archive_path = join(self.tmp_dir.name, "bundle.zip")
+        self.num_files = build_cache_archive(
+            self.archive_path, url_map={f"{self.base_url}/prefix": cache_dir}
+        )
+
+    def tearDown(self):
+        get_connection_pool().clear()
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def test_build_cache_archive(self):
+        self.assertEqual(self.num_files, 2)
+        with zipfile.ZipFile(self.archive_path) as archive:
+            self.assertEqual(
+                archive.namelist(),
+                [
+                    get_archive_member_name(f"{self.base_url}/prefix/models/cached.ttl"),
+                    get_archive_member_name(f"{self.base_url}/prefix/models/compressed.ttl.gz"),
+                ],
+            )
+
+    def test_open_from_archive(self):
+        resolver = ArchiveResolver(self.archive_path)
+        url = f"{self.base_url}/prefix/models/cached.ttl"
+        self.assertIn(url, resolver)
+        with resolver.open(url) as response:
+            self.assertEqual(response.read(), b"# cached\n")
+            self.assertEqual(response.status, 200)
+        with resolver.open(f"{self.base_url}/prefix/models/compressed.ttl") as response:
+            self.assertEqual(response.read(), b"# compressed\n")
+
+        # served from the archive without any request
+        self.assertEqual(self.server.requests, [])
+        resolver.close()
+
+    def test_fallback(self):
+        resolver = ArchiveResolver(self.archive_path)
+        for _ in range(2):
+            with resolver.open(f"{self.base_url}/other.ttl") as response:
+                self.assertEqual(response.read(), TEST_BODY)
+        resolver.close()
+        # the connection is reused from the pool shared with the other resolvers
+        self.assertEqual(len(self.server.connections), 1)
+
+        resolver = ArchiveResolver(self.archive_path, fallback=False)
+        with self.assertRaises(urllib.error.URLError):
+            resolver.open(f"{self.base_url}/other.ttl")
+        resolver.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,248 @@
+# SPDX-License-Identifier: MPL-2.0
+import asyncio
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from os.path import join
+
+from rdflib import Graph, URIRef
+from rdflib.graph import ModificationException
+from stand_in_server import StandInServer
+
+from rdf_utils.caching import (
+    ContentCache,
+    GraphCache,
+    SingleFlight,
+    UrlDiskCache,
+    get_file_cache,
+    get_url_cache,
+    read_file_and_cache,
+    read_url_and_cache,
+    read_urls_and_cache_async,
+    set_url_disk_cache,
+)
+
+TEST_BODY = b"@prefix ex: <http://example.org/> .\n"
+TEST_ETAG = '"v1"'
+TEST_TRIPLE = (
+    URIRef("http://example.org/a"),
+    URIRef("http://example.org/p"),
+    URIRef("http://example.org/b"),
+)
+
+
+class ContentCacheTest(unittest.TestCase):
+    def test_entry_limit_evicts_least_recently_used(self):
+        cache = ContentCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        self.assertEqual(cache.get("a"), "1")
+        cache.put("c", "3")
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_byte_limit(self):
+        cache = ContentCache(max_bytes=10)
+        cache.put("a", "12345")
+        cache.put("b", "äbc")  # 4 bytes in UTF-8
+        self.assertEqual(cache.current_bytes, 9)
+
+        cache.put("c", "123")
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.current_bytes, 7)
+
+        # too large to be stored at all, must not flush the other entries
+        cache.put("d", "x" * 11)
+        self.assertNotIn("d", cache)
+        self.assertEqual(len(cache), 2)
+
+        cache.max_bytes = 3
+        self.assertEqual(len(cache), 1)
+        self.assertIn("c", cache)
+
+    def test_stats(self):
+        cache = ContentCache()
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "abc")
+        cache.put("a", "abcd")
+        self.assertEqual(cache.get("a"), "abcd")
+        self.assertEqual(
+            cache.stats(),
+            {"hits": 1, "misses": 1, "evictions": 0, "invalidations": 0, "entries": 1, "bytes": 4},
+        )
+
+        self.assertTrue(cache.discard("a"))
+        self.assertFalse(cache.discard("a"))
+        self.assertEqual(cache.current_bytes, 0)
+
+    def test_token_invalidation(self):
+        cache = ContentCache()
+        cache.put("a", "old", token=1)
+        self.assertEqual(cache.get("a"), "old")
+        self.assertEqual(cache.get("a", token=1), "old")
+        self.assertIsNone(cache.get("a", token=2))
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.invalidations, 1)
+
+    def test_read_file_and_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = join(tmp_dir, "model.ttl")
+            with open(filepath, "w") as outfile:
+                outfile.write("@prefix ex: <http://example.org/> .\n")
+
+            hits = get_file_cache().hits
+            content = read_file_and_cache(filepath)
+            self.assertEqual(read_file_and_cache(filepath), content)
+            self.assertEqual(get_file_cache().hits, hits + 1)
+
+            # size differs, so the change is detected even with coarse mtime resolution
+            with open(filepath, "w") as outfile:
+                outfile.write("@prefix ex: <http://example.org/changed/> .\n")
+            self.assertEqual(read_file_and_cache(filepath, check_stat=False), content)
+            self.assertNotEqual(read_file_and_cache(filepath), content)
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_calls_share_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow_func():
+            calls.append(1)
+            time.sleep(0.2)
+            return len(calls)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: flight.do("key", slow_func), range(8)))
+        self.assertEqual(results, [1] * 8)
+
+        # finished calls are not remembered
+        self.assertEqual(flight.do("key", slow_func), 2)
+
+    def test_error_is_shared(self):
+        flight = SingleFlight()
+
+        def failing_func():
+            time.sleep(0.1)
+            raise ValueError("failed")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.do, "key", failing_func) for _ in range(4)]
+        for future in futures:
+            self.assertIsInstance(future.exception(), ValueError)
+
+
+class GraphCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.sources = []
+        for i in range(3):
+            source = join(self.tmp_dir.name, f"model{i}.ttl")
+            with open(source, "w") as outfile:
+                outfile.write("@prefix ex: <http://example.org/> .\nex:a ex:p ex:b .\n")
+            self.sources.append(source)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_parse_once(self):
+        cache = GraphCache()
+        graph = cache.get(self.sources[0], "turtle")
+        self.assertIn(TEST_TRIPLE, graph)
+        self.assertEqual(len(cache.get(self.sources[0], "turtle")), 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_shared_graph_not_modifiable(self):
+        cache = GraphCache()
+        view = cache.get(self.sources[0], "turtle")
+        with self.assertRaises(ModificationException):
+            view.add((TEST_TRIPLE[1], TEST_TRIPLE[1], TEST_TRIPLE[1]))
+        with self.assertRaises(ModificationException):
+            view.parse(self.sources[1], format="turtle")
+
+        graph_copy = cache.get(self.sources[0], "turtle", copy=True)
+        graph_copy.remove(TEST_TRIPLE)
+        self.assertIn(("ex", URIRef("http://example.org/")), set(graph_copy.namespaces()))
+        self.assertIn(TEST_TRIPLE, cache.get(self.sources[0], "turtle"))
+
+        merged = Graph()
+        merged += view
+        self.assertEqual(len(merged), 1)
+
+    def test_eviction(self):
+        cache = GraphCache(max_entries=2)
+        for source in self.sources:
+            cache.get(source, "turtle")
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn((self.sources[0], "turtle"), cache)
+
+        cache = GraphCache(max_triples=1)
+        cache.get(self.sources[0], "turtle")
+        cache.get(self.sources[1], "turtle")
+        self.assertEqual(cache.stats()["triples"], 1)
+        self.assertEqual(cache.evictions, 1)
+
+
+class UrlDiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(TEST_BODY, delay=0.2, etag=TEST_ETAG)
+        self.base_url = self.server.base_url
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        set_url_disk_cache(None)
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def test_conditional_revalidation(self):
+        disk_cache = UrlDiskCache(root=self.tmp_dir.name, ttl=0)
+        url = f"{self.base_url}/revalidate.ttl"
+        self.assertEqual(disk_cache.fetch(url), TEST_BODY)
+        self.assertEqual(disk_cache.load(url)[1]["etag"], TEST_ETAG)
+
+        # new "process" with a fresh cache object on the same directory
+        self.assertEqual(UrlDiskCache(root=self.tmp_dir.name, ttl=0).fetch(url), TEST_BODY)
+        self.assertEqual(self.server.requests, [("/revalidate.ttl", 200), ("/revalidate.ttl", 304)])
+
+    def test_ttl(self):
+        url = f"{self.base_url}/ttl.ttl"
+        UrlDiskCache(root=self.tmp_dir.name).fetch(url)
+        UrlDiskCache(root=self.tmp_dir.name, ttl=None).fetch(url)
+        UrlDiskCache(root=self.tmp_dir.name, ttl=3600).fetch(url)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_read_url_and_cache(self):
+        set_url_disk_cache(UrlDiskCache(root=self.tmp_dir.name, ttl=None))
+        url = f"{self.base_url}/read.ttl"
+        self.assertEqual(read_url_and_cache(url), TEST_BODY.decode("utf-8"))
+
+        get_url_cache().discard(url)
+        self.assertEqual(read_url_and_cache(url), TEST_BODY.decode("utf-8"))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_concurrent_read_url_and_cache(self):
+        url = f"{self.base_url}/slow-concurrent.ttl"
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            contents = set(executor.map(lambda _: read_url_and_cache(url), range(8)))
+        self.assertEqual(contents, {TEST_BODY.decode("utf-8")})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_read_urls_and_cache_async(self):
+        urls = [f"{self.base_url}/slow-async-{i}.ttl" for i in range(4)]
+        start = time.perf_counter()
+        contents = asyncio.run(read_urls_and_cache_async(urls + urls[:1], max_concurrency=4))
+        self.assertLess(time.perf_counter() - start, 0.6, "downloads did not run concurrently")
+
+        self.assertEqual(contents, [TEST_BODY.decode("utf-8")] * 5)
+        self.assertEqual(len(self.server.requests), 4)
+        for url in urls:
+            self.assertIn(url, get_url_cache())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,17 @@
 # SPDX-License-Identifier:  MPL-2.0
+import sys
 import unittest
 
-from rdflib import RDF, BNode, Graph, URIRef
+import numpy as np
+from rdflib import RDF, BNode, Graph, Literal, URIRef
 
-from rdf_utils.collection import add_literal_list_pred, add_node_list_pred, load_list_re
+from rdf_utils.collection import (
+    add_literal_list_pred,
+    add_node_list_pred,
+    get_list_cells,
+    load_list_as_array,
+    load_list_re,
+)
 from rdf_utils.namespace import URL_SECORO_M
 from rdf_utils.uri import try_expand_curie
 
@@ -64,6 +72,30 @@ class CollectionTest(unittest.TestCase):
             RuntimeError, msg="test load_list_re: graph with loop should raise exception"
         ):
             _ = load_list_re(graph=loop_g, first_node=b1)
+        with self.assertRaises(RuntimeError):
+            _ = load_list_re(graph=loop_g, first_node=b1, cells=get_list_cells(loop_g))
+
+    def test_deep_list(self):
+        graph = Graph()
+        pred = URIRef("urn:test:items")
+        depth = sys.getrecursionlimit() + 10
+
+        # innermost list of two values, nested in lists with one more value each
+        add_literal_list_pred(graph, URIRef("urn:test:list0"), pred, [0.5, 1.5])
+        for i in range(1, depth):
+            nested = graph.value(subject=URIRef(f"urn:test:list{i - 1}"), predicate=pred)
+            add_node_list_pred(graph, URIRef(f"urn:test:list{i}"), pred, [nested, Literal(i)])
+
+        first_node = graph.value(subject=URIRef(f"urn:test:list{depth - 1}"), predicate=pred)
+        assert isinstance(first_node, BNode)
+        for cells in (None, get_list_cells(graph)):
+            loaded = load_list_re(graph, first_node, parse_uri=False, cells=cells)
+            # compare level by level, comparing the nested lists at once would also recurse
+            for i in reversed(range(1, depth)):
+                self.assertEqual(len(loaded), 2)
+                self.assertEqual(loaded[1], i)
+                loaded = loaded[0]
+            self.assertEqual(loaded, [0.5, 1.5])
 
     def test_add_list_pred(self):
         graph = Graph()
@@ -85,6 +117,53 @@ class CollectionTest(unittest.TestCase):
         assert isinstance(literal_list, BNode)
         self.assertEqual(load_list_re(graph, literal_list, parse_uri=False), values)
 
+    def test_load_list_as_array(self):
+        graph = Graph()
+        pred = URIRef("urn:test:items")
+
+        def add_nested(subject: URIRef, values: list) -> BNode:
+            nodes = []
+            for i, val in enumerate(values):
+                if isinstance(val, list):
+                    nodes.append(add_nested(URIRef(f"{subject}/{i}"), val))
+                else:
+                    nodes.append(val if isinstance(val, URIRef) else Literal(val))
+            add_node_list_pred(graph, subject, pred, nodes)
+            list_node = graph.value(subject=subject, predicate=pred)
+            assert isinstance(list_node, BNode)
+            return list_node
+
+        matrix = [[1.0, 2.5, -3.0], [4.0, 5.0, 6.0]]
+        for values in ([0.5, 1.5], matrix, [matrix, matrix], [[1, 2], [3, 4]], []):
+            list_node = add_nested(URIRef(f"urn:test:{len(graph)}"), values)
+            expected = np.array(load_list_re(graph, list_node, parse_uri=False), dtype=float)
+            for cells in (None, get_list_cells(graph)):
+                array = load_list_as_array(graph, list_node, cells=cells)
+                self.assertEqual(array.shape, expected.shape)
+                self.assertEqual(array.dtype, np.float64)
+                np.testing.assert_array_equal(array, expected)
+
+        array = load_list_as_array(graph, add_nested(URIRef("urn:test:int"), matrix), dtype=int)
+        np.testing.assert_array_equal(array, np.array(matrix, dtype=int))
+
+        for values in ([[1.0, 2.0], [3.0]], [[1.0], [2.0, 3.0]], [[1.0], 2.0], [1.0, [2.0]]):
+            with self.assertRaises((ValueError, TypeError), msg=f"ragged list: {values}"):
+                load_list_as_array(graph, add_nested(URIRef(f"urn:test:{len(graph)}"), values))
+        with self.assertRaises(ValueError):
+            load_list_as_array(graph, add_nested(URIRef("urn:test:str"), [1.0, "a"]))
+        with self.assertRaises(TypeError):
+            load_list_as_array(graph, add_nested(URIRef("urn:test:uri"), [URIRef("urn:a")]))
+
+        loop_g = Graph()
+        b1 = BNode()
+        b2 = BNode()
+        loop_g.add((b1, RDF.first, b2))
+        loop_g.add((b1, RDF.rest, RDF.nil))
+        loop_g.add((b2, RDF.first, b1))
+        loop_g.add((b2, RDF.rest, RDF.nil))
+        with self.assertRaises(RuntimeError):
+            load_list_as_array(loop_g, b1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,404 @@
+# SPDX-License-Identifier: MPL-2.0
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+from os.path import join
+from unittest import mock
+
+import pyshacl
+from rdflib import SH, Graph, Literal, URIRef
+from stand_in_server import StandInServer
+
+from rdf_utils import constraints
+from rdf_utils.caching import get_graph_cache
+from rdf_utils.constraints import (
+    ShaclReport,
+    ShaclValidator,
+    SHACLViolation,
+    check_shacl_constraints,
+    clear_shacl_validators,
+    get_shacl_validator,
+    validate_many,
+    validate_sharded,
+)
+from rdf_utils.inference import RdfsClosure
+
+SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:AgentShape a sh:NodeShape ;
+    sh:targetClass ex:Agent ;
+    sh:property [
+        sh:path ex:name ;
+        sh:datatype xsd:string ;
+        sh:minCount 1 ;
+        sh:maxCount 1 ;
+    ] .
+"""
+
+VALID_TTL = """
+@prefix ex: <http://example.org/> .
+ex:r1 a ex:Agent ; ex:name "r1" .
+"""
+
+# ex:r2 only violates the shape if it is inferred to be an agent from the property domain
+INVALID_TTL = """
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.org/> .
+ex:name rdfs:domain ex:Agent .
+ex:r2 ex:name "r2", "robot-2" .
+ex:a1 a ex:Agent .
+"""
+
+# INVALID_TTL split into an ontology and data inferred against its closure
+ONTOLOGY_TTL = """
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.org/> .
+ex:name rdfs:domain ex:Agent .
+ex:Robot rdfs:subClassOf ex:Agent .
+"""
+
+DATA_TTL = """
+@prefix ex: <http://example.org/> .
+ex:r2 ex:name "r2", "robot-2" .
+ex:r3 a ex:Robot .
+ex:a1 a ex:Agent ; ex:name "a1" .
+"""
+
+# independent agents, with a class hierarchy and a property domain shared by all of them
+SHARDED_TTL = """
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.org/> .
+ex:Robot rdfs:subClassOf ex:Agent .
+ex:label rdfs:subPropertyOf ex:name .
+ex:r1 a ex:Robot ; ex:label "r1" ; ex:knows [ ex:name "b1" ] .
+ex:r2 a ex:Robot .
+ex:r3 ex:name "r3", "robot-3" ; ex:knows ex:r4 .
+ex:r4 a ex:Agent ; ex:name 4 .
+ex:r5 a ex:Agent ; ex:label "r5" .
+"""
+
+# literal focus nodes from sh:targetObjectsOf make sharded validation fall back
+LITERAL_SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+ex:NameShape a sh:NodeShape ;
+    sh:targetObjectsOf ex:name ;
+    sh:datatype xsd:string .
+"""
+
+# the triples of the explicit target ex:x are in another shard than the first one
+TARGET_NODE_SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix ex: <http://example.org/> .
+ex:S sh:targetNode ex:x ;
+    sh:property [ sh:path ex:p ; sh:minCount 1 ] .
+"""
+
+TARGET_NODE_TTL = """
+@prefix ex: <http://example.org/> .
+ex:x ex:p ex:y .
+ex:a ex:q ex:b, ex:c, ex:d .
+ex:e ex:q ex:f, ex:g .
+ex:h ex:q ex:i, ex:j .
+"""
+
+
+class ShaclValidatorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.shapes_path = join(self.tmp_dir.name, "shapes.ttl")
+        with open(self.shapes_path, "w") as outfile:
+            outfile.write(SHAPES_TTL)
+        self.shacl_dict = {self.shapes_path: "turtle"}
+        self.valid = Graph().parse(data=VALID_TTL, format="turtle")
+        self.invalid = Graph().parse(data=INVALID_TTL, format="turtle")
+
+    def tearDown(self):
+        clear_shacl_validators()
+        get_graph_cache().discard(self.shapes_path, "turtle")
+        self.tmp_dir.cleanup()
+
+    def test_validate_like_pyshacl(self):
+        validator = ShaclValidator(self.shacl_dict)
+        shacl_graph = Graph().parse(self.shapes_path, format="turtle")
+        for graph in (self.valid, self.invalid, self.valid):
+            num_triples = len(graph)
+            conforms, report_graph, report_text = validator.validate(graph)
+            expected = pyshacl.validate(graph, shacl_graph=shacl_graph, inference="rdfs")
+            self.assertEqual(conforms, expected[0])
+            self.assertEqual(report_text, expected[2])
+            self.assertEqual(len(report_graph), len(expected[1]))
+            # inference runs on a copy
+            self.assertEqual(len(graph), num_triples)
+
+        self.assertIn("Results (2)", validator.validate(self.invalid)[2])
+
+    def test_check(self):
+        validator = ShaclValidator(self.shacl_dict)
+        self.assertTrue(validator.check(self.valid))
+        self.assertFalse(validator.check(self.invalid, quiet=True))
+        with self.assertRaises(SHACLViolation) as raised:
+            validator.check(self.invalid)
+
+        # the report is kept when the exception is sent to another process
+        report = raised.exception.report
+        assert report is not None
+        self.assertEqual(raised.exception.args, (report,))
+        unpickled = pickle.loads(pickle.dumps(raised.exception))
+        self.assertIsNotNone(unpickled.report)
+        self.assertEqual(unpickled.report.report_text, report.report_text)
+        self.assertEqual(str(unpickled), str(raised.exception))
+        message = pickle.loads(pickle.dumps(SHACLViolation("no shapes")))
+        self.assertEqual(str(message), str(SHACLViolation("no shapes")))
+
+        # without inference, only the agent without name is reported
+        _, _, report_text = ShaclValidator(self.shacl_dict, inference="none").validate(self.invalid)
+        self.assertIn("Results (1)", report_text)
+
+    def test_rdfs_closure(self):
+        shacl_graph = Graph().parse(self.shapes_path, format="turtle")
+        ontology = Graph().parse(data=ONTOLOGY_TTL, format="turtle")
+        data = Graph().parse(data=DATA_TTL, format="turtle")
+        for ont_graph, graph in ((None, self.invalid), (ontology, data)):
+            validator = ShaclValidator(self.shacl_dict, inference=RdfsClosure(ont_graph))
+            num_triples = len(graph)
+            conforms, report_graph, report_text = validator.validate(graph)
+            expected = pyshacl.validate(
+                graph, shacl_graph=shacl_graph, ont_graph=ont_graph, inference="rdfs"
+            )
+            self.assertFalse(conforms)
+            self.assertEqual(conforms, expected[0])
+            self.assertEqual(report_text, expected[2])
+            self.assertEqual(len(report_graph), len(expected[1]))
+            self.assertIn("Results (2)", report_text)
+            self.assertEqual(len(graph), num_triples)
+
+    def test_structured_results(self):
+        validator = ShaclValidator(self.shacl_dict)
+        report = validator.validate_report(self.invalid)
+        self.assertFalse(report.conforms)
+        self.assertTrue(report.complete)
+        self.assertEqual(report.report_text, validator.validate(self.invalid)[2])
+
+        name = URIRef("http://example.org/name")
+        results = {res.focus_node: res for res in report.results}
+        self.assertEqual(
+            set(results), {URIRef("http://example.org/r2"), URIRef("http://example.org/a1")}
+        )
+        for res in results.values():
+            self.assertEqual(res.path, name)
+            self.assertEqual(res.severity, SH.Violation)
+            self.assertIsNotNone(res.shape)
+            self.assertGreater(len(res.messages), 0)
+            self.assertIn("Focus Node: ex:", res.text)
+        self.assertEqual(
+            results[URIRef("http://example.org/r2")].constraint_component,
+            SH.MaxCountConstraintComponent,
+        )
+
+        with self.assertRaises(SHACLViolation) as ctx:
+            validator.check(self.invalid)
+        self.assertIsNotNone(ctx.exception.report)
+        self.assertIn("Results (2)", str(ctx.exception))
+
+    def test_max_violations(self):
+        validator = ShaclValidator(self.shacl_dict)
+        report = validator.validate_report(self.invalid, max_violations=1)
+        self.assertFalse(report.conforms)
+        self.assertFalse(report.complete)
+        self.assertEqual(len(report.results), 1)
+        self.assertTrue(validator.validate_report(self.invalid, max_violations=2).complete)
+        self.assertTrue(validator.validate_report(self.valid, max_violations=1).conforms)
+
+        self.assertFalse(
+            check_shacl_constraints(self.invalid, self.shacl_dict, quiet=True, max_violations=1)
+        )
+        with self.assertRaises(SHACLViolation) as ctx:
+            check_shacl_constraints(self.invalid, self.shacl_dict, max_violations=1)
+        self.assertIn("Results (1)", str(ctx.exception))
+
+    def test_validate_delta(self):
+        validator = ShaclValidator(self.shacl_dict)
+        graph = Graph().parse(data=INVALID_TTL, format="turtle")
+        graph.parse(data=VALID_TTL, format="turtle")
+        previous = validator.validate_report(graph)
+        self.assertEqual(previous.report_text, validator.validate(graph)[2])
+
+        # a second name for ex:r1, a name for ex:a1
+        added = [
+            (URIRef("http://example.org/r1"), URIRef("http://example.org/name"), Literal("x")),
+            (URIRef("http://example.org/a1"), URIRef("http://example.org/name"), Literal("a1")),
+        ]
+        removed = [
+            (URIRef("http://example.org/r2"), URIRef("http://example.org/name"), Literal("r2"))
+        ]
+        for triple in added:
+            graph.add(triple)
+        for triple in removed:
+            graph.remove(triple)
+
+        report = validator.validate_delta(graph, added, removed, previous)
+        conforms, report_graph, report_text = validator.validate(graph)
+        self.assertFalse(report.conforms)
+        self.assertEqual(report.conforms, conforms)
+        self.assertEqual(report.report_text, report_text)
+        self.assertEqual(len(report.report_graph), len(report_graph))
+
+        # without previous results, only the focus nodes ex:r1, ex:a1 and ex:r2 are validated
+        self.assertIn("Results (1)", validator.validate_delta(graph, added, removed).report_text)
+        self.assertTrue(validator.validate_delta(graph, added[1:], []).conforms)
+
+    def test_validate_many(self):
+        invalid_path = join(self.tmp_dir.name, "invalid.ttl")
+        with open(invalid_path, "w") as outfile:
+            outfile.write(INVALID_TTL)
+        items = [self.valid, invalid_path, self.invalid, self.valid]
+        validator = ShaclValidator(self.shacl_dict)
+        expected = [validator.validate(self.valid), validator.validate(self.invalid)]
+        expected = [expected[0], expected[1], expected[1], expected[0]]
+
+        for workers in (1, 2):
+            results = validate_many(items, self.shacl_dict, workers=workers)
+            self.assertEqual(len(results), len(items))
+            for res, (conforms, report_graph, report_text) in zip(results, expected):
+                self.assertIsInstance(res, ShaclReport)
+                self.assertEqual(res.conforms, conforms)
+                self.assertEqual(res.report_text, report_text)
+                self.assertEqual(len(res.report_graph), len(report_graph))
+
+        self.assertEqual(validate_many([], self.shacl_dict), [])
+
+    def test_validate_sharded(self):
+        graph = Graph().parse(data=SHARDED_TTL, format="turtle")
+        graph.parse(data=INVALID_TTL, format="turtle")
+        literal_shapes_path = join(self.tmp_dir.name, "literal_shapes.ttl")
+        with open(literal_shapes_path, "w") as outfile:
+            outfile.write(LITERAL_SHAPES_TTL)
+
+        for shacl_dict in (self.shacl_dict, {literal_shapes_path: "turtle"}):
+            conforms, report_graph, report_text = get_shacl_validator(shacl_dict).validate(graph)
+            report = validate_sharded(graph, shacl_dict, workers=2)
+            self.assertFalse(report.conforms)
+            self.assertEqual(report.conforms, conforms)
+            self.assertEqual(report.report_text, report_text)
+            self.assertTrue(report.report_graph.isomorphic(report_graph))
+        get_graph_cache().discard(literal_shapes_path, "turtle")
+
+        target_shapes_path = join(self.tmp_dir.name, "target_shapes.ttl")
+        with open(target_shapes_path, "w") as outfile:
+            outfile.write(TARGET_NODE_SHAPES_TTL)
+        shacl_dict = {target_shapes_path: "turtle"}
+        graph = Graph().parse(data=TARGET_NODE_TTL, format="turtle")
+        self.assertTrue(get_shacl_validator(shacl_dict).validate_report(graph).conforms)
+        self.assertTrue(validate_sharded(graph, shacl_dict, workers=3).conforms)
+        graph.remove((None, URIRef("http://example.org/p"), None))
+        report = validate_sharded(graph, shacl_dict, workers=3)
+        self.assertEqual(len(report.results), 1)
+        self.assertEqual(report.results[0].focus_node, URIRef("http://example.org/x"))
+        get_graph_cache().discard(target_shapes_path, "turtle")
+
+    def test_cached_validators(self):
+        self.assertTrue(check_shacl_constraints(self.valid, self.shacl_dict))
+        self.assertFalse(check_shacl_constraints(self.invalid, self.shacl_dict, quiet=True))
+        with self.assertRaises(SHACLViolation):
+            check_shacl_constraints(self.invalid, self.shacl_dict)
+
+        validator = get_shacl_validator(self.shacl_dict)
+        self.assertIs(get_shacl_validator(dict(self.shacl_dict)), validator)
+        clear_shacl_validators()
+        self.assertIsNot(get_shacl_validator(self.shacl_dict), validator)
+
+        # changed shapes are parsed again after clearing
+        with open(self.shapes_path, "w") as outfile:
+            outfile.write(SHAPES_TTL.replace("sh:minCount 1", "").replace("sh:maxCount 1", ""))
+        self.assertFalse(check_shacl_constraints(self.invalid, self.shacl_dict, quiet=True))
+        clear_shacl_validators()
+        self.assertTrue(check_shacl_constraints(self.invalid, self.shacl_dict, quiet=True))
+
+    def test_slow_validator_creation(self):
+        validator = get_shacl_validator(self.shacl_dict)
+        server = StandInServer(SHAPES_TTL.encode("utf-8"), delay=0.5)
+        remote_dict = {f"{server.base_url}/shapes.ttl": "turtle"}
+        try:
+            threads = [
+                threading.Thread(target=get_shacl_validator, args=(remote_dict,)) for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.1)
+            # cached validators are returned while another one is created
+            start = time.perf_counter()
+            self.assertIs(get_shacl_validator(self.shacl_dict), validator)
+            self.assertLess(time.perf_counter() - start, 0.1)
+            for thread in threads:
+                thread.join()
+            self.assertEqual(server.paths, ["/shapes.ttl"])
+        finally:
+            server.stop()
+            clear_shacl_validators()
+
+    def test_public_api(self):
+        # validate and check only use pyshacl.validate
+        validator = ShaclValidator(self.shacl_dict)
+        with mock.patch.object(ShaclValidator, "_validate_focus", side_effect=AssertionError):
+            self.assertEqual(
+                validator.validate(self.invalid)[2], validator.validate(self.invalid)[2]
+            )
+            with self.assertRaises(SHACLViolation) as raised:
+                validator.check(self.invalid)
+        report = raised.exception.report
+        assert report is not None
+        self.assertEqual(len(report.results), 2)
+        self.assertIsNone(report.results[0].text)
+        self.assertEqual(pickle.loads(pickle.dumps(report)).report_text, report.report_text)
+
+        with mock.patch.object(pyshacl, "__version__", "0.41.0"):
+            self.assertFalse(constraints._has_pyshacl_internals())
+
+    def test_untested_pyshacl(self):
+        graph = Graph().parse(data=INVALID_TTL, format="turtle")
+        graph.parse(data=VALID_TTL, format="turtle")
+        with mock.patch.object(constraints, "_PYSHACL_INTERNALS", False):
+            validator = ShaclValidator(self.shacl_dict, compile_shapes=True)
+            self.assertEqual(validator._compiled_shapes, {})
+            conforms, _, report_text = validator.validate(graph)
+            self.assertFalse(conforms)
+            self.assertIsNone(validator._prepared_shapes)
+
+            report = validator.validate_report(graph)
+            self.assertEqual(report.report_text, report_text)
+            self.assertEqual(len(report.results), 2)
+            report = validator.validate_report(graph, max_violations=1)
+            self.assertFalse(report.conforms)
+            self.assertFalse(report.complete)
+            self.assertTrue(validator.validate_report(self.valid, max_violations=1).complete)
+
+            # only ex:a1 is validated, pyshacl's inference falls back to validating all nodes
+            name = URIRef("http://example.org/name")
+            added = [(URIRef("http://example.org/a1"), name, Literal("a1"))]
+            graph.add(added[0])
+            self.assertIn("Results (1)", validator.validate_delta(graph, added, []).report_text)
+            closure_validator = ShaclValidator(self.shacl_dict, inference=RdfsClosure(None))
+            self.assertTrue(closure_validator.validate_delta(graph, added, []).conforms)
+            report = closure_validator.validate_delta(graph, added, [], report)
+            self.assertEqual(report.report_text, validator.validate(graph)[2])
+            self.assertIn("Results (1)", report.report_text)
+            self.assertTrue(closure_validator.validate_delta(graph, [], []).conforms)
+
+            reports = validate_many([self.valid, self.invalid], self.shacl_dict, workers=1)
+            self.assertEqual([r.conforms for r in reports], [True, False])
+            self.assertEqual(reports[1].report_text, validator.validate(self.invalid)[2])
+            report = validate_sharded(graph, self.shacl_dict, workers=2)
+            self.assertEqual(report.report_text, validator.validate(graph)[2])
+            self.assertIsNone(get_shacl_validator(self.shacl_dict)._prepared_shapes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: MPL-2.0
+import os
+import socket
+import tempfile
+import unittest
+
+from stand_in_server import StandInServer
+
+from rdf_utils.http_pool import ConnectionPool, build_pooled_opener
+from rdf_utils.resolver import IriToFileResolver
+
+TEST_BODY = b"@prefix ex: <http://example.org/> .\n" * 100
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(TEST_BODY, keep_alive=True)
+        self.base_url = self.server.base_url
+        self.pool = ConnectionPool()
+        self.opener = build_pooled_opener(self.pool)
+
+    def tearDown(self):
+        self.pool.clear()
+        self.server.stop()
+
+    def read(self, path: str) -> bytes:
+        with self.opener.open(f"{self.base_url}{path}") as response:
+            return response.read()
+
+    def test_connection_reused(self):
+        for i in range(5):
+            self.assertEqual(self.read(f"/model{i}.ttl"), TEST_BODY)
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertEqual(self.pool.stats(), {"created": 1, "reused": 4, "idle": 1})
+
+    def test_partially_read_connection_dropped(self):
+        with self.opener.open(f"{self.base_url}/partial.ttl") as response:
+            response.read(10)
+        self.assertEqual(self.read("/full.ttl"), TEST_BODY)
+        self.assertEqual(len(self.server.connections), 2)
+
+    def test_closed_idle_connection(self):
+        self.read("/first.ttl")
+        self.server.connections[0].shutdown(socket.SHUT_RDWR)
+        self.assertEqual(self.read("/second.ttl"), TEST_BODY)
+        self.assertEqual(len(self.server.connections), 2)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_forked_child(self):
+        self.read("/parent.ttl")
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                # the child must not reuse the connection that stays idle in the parent's pool
+                idle = self.pool.stats()["idle"]
+                os.write(write_fd, bytes([idle, self.read("/child.ttl") == TEST_BODY]))
+            finally:
+                os._exit(0)
+
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd, "rb") as infile:
+            self.assertEqual(infile.read(), bytes([0, 1]))
+        self.assertEqual(len(self.server.connections), 2)
+        self.assertEqual(self.read("/parent.ttl"), TEST_BODY)
+        self.assertEqual(self.pool.stats(), {"created": 1, "reused": 1, "idle": 1})
+
+    def test_resolver_downloads(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            resolver = IriToFileResolver(url_map={self.base_url: tmp_dir}, quiet=True)
+            for i in range(5):
+                with resolver.open(f"{self.base_url}/models/model{i}.ttl") as fp:
+                    self.assertEqual(fp.read(), TEST_BODY)
+            with resolver.default_opener.open(f"{self.base_url}/unmapped.ttl") as fp:
+                self.assertEqual(fp.read(), TEST_BODY)
+        self.assertEqual(len(self.server.connections), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
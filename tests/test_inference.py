@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: MPL-2.0
+import tempfile
+import threading
+import time
+import unittest
+from os.path import join
+
+from owlrl import DeductiveClosure
+from pyshacl.inference.custom_rdfs_closure import CustomRDFSSemantics
+from rdflib import RDF, RDFS, Graph, URIRef
+from stand_in_server import StandInServer
+
+from rdf_utils.inference import RdfsClosure, clear_rdfs_closures, get_rdfs_closure
+
+ONTOLOGY_TTL = """
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+ex:Robot rdfs:subClassOf ex:Agent .
+ex:Agent rdfs:subClassOf ex:Thing .
+ex:Thing a rdfs:Class .
+ex:name rdfs:domain ex:Agent ; rdfs:range xsd:string .
+ex:label rdfs:subPropertyOf ex:name .
+ex:knows rdfs:range ex:Agent .
+ex:member a rdfs:ContainerMembershipProperty .
+xsd:int a rdfs:Datatype .
+"""
+
+# extends the class and property hierarchies of the ontology
+DATA_TTL = """
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.org/> .
+ex:r1 a ex:Robot ; ex:label "r1" ; ex:knows ex:r2 .
+ex:r2 ex:member ex:r3 .
+ex:Drone rdfs:subClassOf ex:Robot .
+ex:nick rdfs:subPropertyOf ex:label .
+ex:d1 a ex:Drone ; ex:nick "d1" .
+"""
+
+EX = "http://example.org/"
+
+
+def owlrl_closure(*graphs: Graph) -> Graph:
+    """Closure computed like pyshacl's RDFS pre-inference."""
+    closed = Graph()
+    for graph in graphs:
+        closed += graph
+    DeductiveClosure(CustomRDFSSemantics).expand(closed)
+    return closed
+
+
+class RdfsClosureTest(unittest.TestCase):
+    def setUp(self):
+        self.ontology = Graph().parse(data=ONTOLOGY_TTL, format="turtle")
+        self.data = Graph().parse(data=DATA_TTL, format="turtle")
+
+    def test_like_owlrl(self):
+        self.assertEqual(set(RdfsClosure(self.ontology).graph), set(owlrl_closure(self.ontology)))
+
+        for ontology in (None, self.ontology):
+            closure = RdfsClosure(ontology)
+            expected = (
+                owlrl_closure(self.data) if ontology is None else owlrl_closure(ontology, self.data)
+            )
+            num_triples = len(self.data)
+            inferred = closure.infer(self.data)
+            self.assertEqual(len(self.data), num_triples)
+            self.assertEqual(set(closure.graph) | set(self.data) | set(inferred), set(expected))
+            for triple in inferred:
+                self.assertNotIn(triple, self.data)
+                self.assertNotIn(triple, closure.graph)
+
+    def test_expand(self):
+        closure = RdfsClosure(self.ontology)
+        expanded = closure.expand(self.data)
+        d1 = URIRef(EX + "d1")
+        for cls in ("Drone", "Robot", "Agent", "Thing"):
+            self.assertIn((d1, RDF.type, URIRef(EX + cls)), expanded)
+        self.assertIn((d1, URIRef(EX + "name"), None), expanded)
+        self.assertIn((URIRef(EX + "r2"), RDF.type, URIRef(EX + "Agent")), expanded)
+        # statements about data nodes are copied from the ontology, others are not
+        self.assertIn((URIRef(EX + "name"), RDFS.domain, URIRef(EX + "Agent")), expanded)
+        self.assertNotIn((URIRef(EX + "Thing"), RDF.type, RDFS.Class), expanded)
+
+    def test_cached_closures(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ont_dict = {join(tmp_dir, "ontology.ttl"): "turtle"}
+            for path in ont_dict:
+                with open(path, "w") as outfile:
+                    outfile.write(ONTOLOGY_TTL)
+            closure = get_rdfs_closure(ont_dict)
+            self.assertIs(get_rdfs_closure(dict(ont_dict)), closure)
+            robot_thing = (URIRef(EX + "Robot"), RDFS.subClassOf, URIRef(EX + "Thing"))
+            self.assertIn(robot_thing, closure.graph)
+
+            # changed ontologies are parsed again after clearing
+            for path in ont_dict:
+                with open(path, "w") as outfile:
+                    outfile.write(ONTOLOGY_TTL.replace("ex:Agent rdfs:subClassOf ex:Thing .", ""))
+            self.assertIs(get_rdfs_closure(ont_dict), closure)
+            clear_rdfs_closures()
+            self.assertNotIn(robot_thing, get_rdfs_closure(ont_dict).graph)
+            closure = get_rdfs_closure(ont_dict)
+
+            # cached closures are returned while another one is computed
+            server = StandInServer(ONTOLOGY_TTL.encode("utf-8"), delay=0.5)
+            remote_dict = {f"{server.base_url}/ontology.ttl": "turtle"}
+            try:
+                threads = [
+                    threading.Thread(target=get_rdfs_closure, args=(remote_dict,)) for _ in range(3)
+                ]
+                for thread in threads:
+                    thread.start()
+                time.sleep(0.1)
+                start = time.perf_counter()
+                self.assertIs(get_rdfs_closure(ont_dict), closure)
+                self.assertLess(time.perf_counter() - start, 0.1)
+                for thread in threads:
+                    thread.join()
+                self.assertEqual(server.paths, ["/ontology.ttl"])
+            finally:
+                server.stop()
+                clear_rdfs_closures()
+
+
+if __name__ == "__main__":
+    unittest.main()
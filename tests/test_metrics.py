@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: MPL-2.0
+import logging
+import tempfile
+import unittest
+
+from stand_in_server import StandInServer
+
+from rdf_utils.caching import get_url_cache, read_url_and_cache
+from rdf_utils.metrics import LatencyHistogram, get_metrics, logging_hook
+from rdf_utils.resolver import IriToFileResolver
+
+TEST_BODY = b"@prefix ex: <http://example.org/> .\n"
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_buckets(self):
+        histogram = LatencyHistogram(bounds=(0.01, 0.1))
+        for seconds in (0.001, 0.01, 0.05, 2.0):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.to_dict()["buckets"], {"le_0.01": 2, "le_0.1": 1, "le_inf": 1})
+        self.assertEqual(histogram.max, 2.0)
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(TEST_BODY)
+        self.base_url = self.server.base_url
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.metrics = get_metrics()
+        self.metrics.reset()
+
+    def tearDown(self):
+        self.metrics.enabled = False
+        self.metrics.reset()
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def test_disabled(self):
+        resolver = IriToFileResolver(url_map={self.base_url: self.tmp_dir.name}, quiet=True)
+        with resolver.open(f"{self.base_url}/disabled.ttl") as fp:
+            fp.read()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_resolver(self):
+        self.metrics.enabled = True
+        prefix = f"{self.base_url}/models"
+        resolver = IriToFileResolver(url_map={prefix: self.tmp_dir.name}, quiet=True)
+        for _ in range(3):
+            with resolver.open(f"{prefix}/model.ttl") as fp:
+                fp.read()
+        with resolver.open(f"{self.base_url}/unmapped.ttl") as fp:
+            fp.read()
+
+        stats = self.metrics.snapshot()["resolver"]
+        self.assertEqual(set(stats), {prefix, self.base_url})
+        self.assertEqual(
+            {event: stats[prefix][event] for event in ("hit", "miss", "download", "fallthrough")},
+            {"hit": 2, "miss": 1, "download": 1, "fallthrough": 0},
+        )
+        self.assertEqual(stats[prefix]["bytes"], len(TEST_BODY))
+        self.assertEqual(stats[prefix]["latency"]["hit"]["count"], 2)
+        self.assertEqual(stats[self.base_url]["fallthrough"], 1)
+
+    def test_url_cache_and_logging_hook(self):
+        self.metrics.enabled = True
+        hook = logging_hook(level=logging.INFO)
+        self.metrics.add_hook(hook)
+        url = f"{self.base_url}/url-cache.ttl"
+        try:
+            with self.assertLogs("rdf_utils.metrics", level=logging.INFO) as logs:
+                read_url_and_cache(url)
+                read_url_and_cache(url)
+        finally:
+            self.metrics.remove_hook(hook)
+            get_url_cache().discard(url)
+
+        stats = self.metrics.snapshot()["url_cache"][self.base_url]
+        self.assertEqual((stats["hit"], stats["miss"], stats["download"]), (1, 1, 1))
+        # an installed resolver may log its own events
+        url_cache_logs = [line for line in logs.output if "url_cache" in line]
+        self.assertEqual(len(url_cache_logs), 3)
+        self.assertIn("url_cache download", url_cache_logs[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: MPL-2.0
+import contextlib
+import io
+import tempfile
+import unittest
+from os.path import exists, join
+
+from stand_in_server import StandInServer
+
+from rdf_utils.namespace import URL_MM_GEOM_SHACL_COORD, URL_MM_PYTHON_SHACL
+from rdf_utils.prefetch import get_metamodel_urls, main, prefetch
+from rdf_utils.resolver import IriToFileResolver
+
+TEST_BODY = b"@prefix sh: <http://www.w3.org/ns/shacl#> .\n"
+
+
+class PrefetchTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(TEST_BODY)
+        self.base_url = self.server.base_url
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def test_metamodel_urls(self):
+        urls = get_metamodel_urls()
+        self.assertIn(URL_MM_PYTHON_SHACL, urls)
+        self.assertIn(URL_MM_GEOM_SHACL_COORD, urls)
+        self.assertEqual(len(urls), len(set(urls)))
+
+    def test_prefetch(self):
+        resolver = IriToFileResolver(url_map={self.base_url: self.tmp_dir.name}, quiet=True)
+        urls = [f"{self.base_url}/models/a.ttl", f"{self.base_url}/missing.ttl"]
+        results = prefetch(urls=urls, resolver=resolver)
+
+        self.assertEqual([res.url for res in results], urls)
+        self.assertIsNone(results[0].error)
+        self.assertEqual(results[0].size, len(TEST_BODY))
+        self.assertTrue(exists(join(self.tmp_dir.name, "models", "a.ttl")))
+        self.assertIsNotNone(results[1].error)
+
+    def test_main(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            self.assertEqual(main([f"{self.base_url}/models/b.ttl"]), 0)
+            self.assertEqual(main(["-q", f"{self.base_url}/missing.ttl"]), 1)
+        self.assertIn("fetched 1/1 URLs", stdout.getvalue())
+        self.assertIn("FAILED", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,30 @@
 # SPDX-License-Identifier:  MPL-2.0
+import asyncio
+import gzip
+import lzma
+import os
+import tempfile
+import time
 import unittest
-from os.path import exists
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from os import listdir
+from os.path import exists, join
+from urllib.error import ContentTooShortError, HTTPError, URLError
 from urllib.request import urlopen
 
+from stand_in_server import StandInServer
+
+from rdf_utils.caching import ContentCache
 from rdf_utils.namespace import URL_SECORO_MM
-from rdf_utils.resolver import install_resolver
+from rdf_utils.resolver import (
+    IriToFileResolver,
+    UrlPrefixMap,
+    install_resolver,
+    open_urls_async,
+)
 
 TEST_URL = f"{URL_SECORO_MM}/languages/python.json"
+TEST_BODY = b'{"@context": {}}'
 
 
 class ResolverTest(unittest.TestCase):
@@ -22,5 +40,212 @@ class ResolverTest(unittest.TestCase):
             )
 
 
+def read_in_new_resolver(base_url: str, cache_dir: str, url: str) -> bytes:
+    """Stands in for a separate worker process with its own resolver."""
+    resolver = IriToFileResolver(url_map={base_url: cache_dir}, download=True, quiet=True)
+    with resolver.open(url) as fp:
+        return fp.read()
+
+
+class UrlPrefixMapTest(unittest.TestCase):
+    def test_longest_prefix(self):
+        prefix_map = UrlPrefixMap(
+            {
+                "https://example.org": "root",
+                "https://example.org/models/": "models",
+                "https://example.org/models/robots": "robots",
+            }
+        )
+        self.assertEqual(
+            prefix_map.match("https://example.org/models/robots/kinova.json"),
+            ("https://example.org/models/robots", "robots", ["kinova.json"]),
+        )
+        self.assertEqual(
+            prefix_map.match("https://example.org/models/robots.json")[1:],
+            ("models", ["robots.json"]),
+        )
+        self.assertEqual(
+            prefix_map.match("https://example.org/metamodels/a/b.ttl")[1:],
+            ("root", ["metamodels", "a", "b.ttl"]),
+        )
+        self.assertIsNone(prefix_map.match("https://example.com/models/a.json"))
+        self.assertIsNone(prefix_map.match("http://example.org/models/a.json"))
+
+    def test_whole_segments(self):
+        prefix_map = UrlPrefixMap({"https://example.org/foo": "foo"})
+        self.assertIsNone(prefix_map.match("https://example.org/foobar/a.json"))
+        self.assertEqual(prefix_map.match("https://example.org/foo/a.json")[2], ["a.json"])
+
+
+class LocalResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(TEST_BODY, delay=0.2, check_modified=True)
+        self.base_url = self.server.base_url
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.resolver = IriToFileResolver(
+            url_map={self.base_url: self.tmp_dir.name}, download=True, quiet=True
+        )
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def test_concurrent_download(self):
+        def read_url(_):
+            with self.resolver.open(f"{self.base_url}/models/concurrent.json") as fp:
+                return fp.read()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            contents = set(executor.map(read_url, range(8)))
+        self.assertEqual(contents, {TEST_BODY})
+        self.assertEqual(self.server.paths, ["/models/concurrent.json"])
+        self.assertTrue(exists(join(self.tmp_dir.name, "models", "concurrent.json")))
+
+    def test_multi_process_download(self):
+        url = f"{self.base_url}/models/processes.json"
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(read_in_new_resolver, self.base_url, self.tmp_dir.name, url)
+                for _ in range(4)
+            ]
+            self.assertEqual({future.result() for future in futures}, {TEST_BODY})
+        self.assertEqual(self.server.paths, ["/models/processes.json"])
+
+        # only the cached file and its lock file remain, no temporary files
+        self.assertEqual(
+            sorted(listdir(join(self.tmp_dir.name, "models"))),
+            [".processes.json.lock", "processes.json"],
+        )
+
+    def test_truncated_download(self):
+        with self.assertRaises(ContentTooShortError):
+            self.resolver.open(f"{self.base_url}/models/truncated.json")
+        self.assertEqual(listdir(join(self.tmp_dir.name, "models")), [".truncated.json.lock"])
+
+    def test_open_urls_async(self):
+        urls = [f"{self.base_url}/models/async-{i}.json" for i in range(4)]
+        contents = asyncio.run(open_urls_async(urls, resolver=self.resolver))
+        self.assertEqual(contents, [TEST_BODY] * 4)
+        for i in range(4):
+            self.assertTrue(exists(join(self.tmp_dir.name, "models", f"async-{i}.json")))
+
+    def test_no_download(self):
+        resolver = IriToFileResolver(
+            url_map={self.base_url: self.tmp_dir.name}, download=False, quiet=True
+        )
+        with resolver.open(f"{self.base_url}/models/remote.json") as fp:
+            self.assertEqual(fp.read(), TEST_BODY)
+        self.assertFalse(exists(join(self.tmp_dir.name, "models", "remote.json")))
+
+        resolver.url_map = {f"{self.base_url}/models": self.tmp_dir.name}
+        with open(join(self.tmp_dir.name, "local.json"), "wb") as outfile:
+            outfile.write(b"{}")
+        with resolver.open(f"{self.base_url}/models/local.json") as fp:
+            self.assertEqual(fp.read(), b"{}")
+        self.assertEqual(self.server.paths, ["/models/remote.json"])
+
+    def test_memory_cache(self):
+        memory_cache: ContentCache[bytes] = ContentCache(max_bytes=len(TEST_BODY))
+        resolver = IriToFileResolver(
+            url_map={self.base_url: self.tmp_dir.name}, quiet=True, memory_cache=memory_cache
+        )
+        url = f"{self.base_url}/models/memory.json"
+        for _ in range(3):
+            with resolver.open(url) as fp:
+                self.assertEqual(fp.read(), TEST_BODY)
+        self.assertEqual(self.server.paths, ["/models/memory.json"])
+        self.assertEqual(memory_cache.stats()["hits"], 2)
+
+        # served from memory, even after the file is removed
+        file_path = join(self.tmp_dir.name, "models", "memory.json")
+        os.unlink(file_path)
+        with resolver.open(url) as fp:
+            self.assertEqual(fp.read(), TEST_BODY)
+
+        # evicted by a newer entry, read from disk again
+        with open(join(self.tmp_dir.name, "other.json"), "wb") as outfile:
+            outfile.write(TEST_BODY)
+        with resolver.open(f"{self.base_url}/other.json") as fp:
+            self.assertEqual(fp.read(), TEST_BODY)
+        self.assertNotIn(file_path, memory_cache)
+
+    def test_retry_backoff(self):
+        url = f"{self.base_url}/models/missing.json"
+        for _ in range(2):
+            with self.assertRaises(HTTPError):
+                self.resolver.open(url)
+        self.assertEqual(len(self.server.paths), 2)
+
+        resolver = IriToFileResolver(
+            url_map={self.base_url: self.tmp_dir.name}, quiet=True, retry_backoff=60
+        )
+        with self.assertRaises(HTTPError):
+            resolver.open(url)
+        start = time.perf_counter()
+        with self.assertRaises(URLError) as context:
+            resolver.open(url)
+        self.assertNotIsInstance(context.exception, HTTPError)
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(len(self.server.paths), 3)
+
+    def test_revalidate(self):
+        resolver = IriToFileResolver(
+            url_map={self.base_url: self.tmp_dir.name},
+            quiet=True,
+            revalidate_after={f"{self.base_url}/models": 3600},
+        )
+        models_dir = join(self.tmp_dir.name, "models")
+        os.makedirs(models_dir)
+        for name in ("same.json", "changed.json", "missing.json", "fresh.json"):
+            with open(join(models_dir, name), "wb") as outfile:
+                outfile.write(b"{}")
+            if name != "fresh.json":
+                os.utime(join(models_dir, name), (0, 0))
+
+        for name in ("same.json", "changed.json", "missing.json", "fresh.json"):
+            with resolver.open(f"{self.base_url}/models/{name}") as fp:
+                content = fp.read()
+            # only a changed file is downloaded again, others are served from the local file
+            self.assertEqual(content, TEST_BODY if name == "changed.json" else b"{}", name)
+
+        self.assertEqual(
+            self.server.paths,
+            ["/models/same.json", "/models/changed.json", "/models/missing.json"],
+        )
+        self.assertGreater(os.stat(join(models_dir, "same.json")).st_mtime, 0)
+        self.assertEqual(os.stat(join(models_dir, "missing.json")).st_mtime, 0)
+
+    def test_compression(self):
+        with self.assertRaises(ValueError):
+            IriToFileResolver(url_map={}, compression="zip")
+
+        resolver = IriToFileResolver(
+            url_map={self.base_url: self.tmp_dir.name}, quiet=True, compression="gzip"
+        )
+        url = f"{self.base_url}/models/compressed.json"
+        for _ in range(2):
+            with resolver.open(url) as fp:
+                self.assertEqual(fp.read(), TEST_BODY)
+        self.assertEqual(self.server.paths, ["/models/compressed.json"])
+
+        models_dir = join(self.tmp_dir.name, "models")
+        self.assertEqual(
+            sorted(listdir(models_dir)), [".compressed.json.lock", "compressed.json.gz"]
+        )
+        with gzip.open(join(models_dir, "compressed.json.gz")) as infile:
+            self.assertEqual(infile.read(), TEST_BODY)
+
+        # existing entries are read whatever their compression
+        with open(join(models_dir, "plain.json"), "wb") as outfile:
+            outfile.write(b"{}")
+        with lzma.open(join(models_dir, "lzma.json.xz"), "wb") as outfile:
+            outfile.write(b"[]")
+        with resolver.open(f"{self.base_url}/models/plain.json") as fp:
+            self.assertEqual(fp.read(), b"{}")
+        with resolver.open(f"{self.base_url}/models/lzma.json") as fp:
+            self.assertEqual(fp.read(), b"[]")
+        self.assertEqual(len(self.server.paths), 1)
+
+
 if __name__ == "__main__":
     unittest.main()
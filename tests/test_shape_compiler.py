@@ -0,0 +1,154 @@
+# SPDX-License-Identifier: MPL-2.0
+import random
+import tempfile
+import unittest
+from os.path import join
+
+import pyshacl
+from rdflib import RDF, RDFS, XSD, BNode, Graph, Literal, Namespace
+
+from rdf_utils.constraints import ShaclReport, ShaclValidator
+from rdf_utils.shape_compiler import compile_shape
+
+EX = Namespace("http://example.org/")
+
+SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:FrameShape a sh:NodeShape ;
+    sh:targetClass ex:Frame ;
+    sh:nodeKind sh:IRI ;
+    sh:property [
+        sh:path ex:name ;
+        sh:datatype xsd:string ;
+        sh:minCount 1 ;
+        sh:maxCount 1 ;
+    ] , [
+        sh:path [ sh:inversePath ex:of ] ;
+        sh:class ex:Position ;
+        sh:maxCount 2 ;
+    ] .
+
+ex:PositionShape a sh:NodeShape ;
+    sh:targetClass ex:Position ;
+    sh:property [
+        sh:path ex:of ;
+        sh:class ex:Frame ;
+        sh:nodeKind sh:BlankNodeOrIRI ;
+        sh:minCount 1 ;
+    ] , [
+        sh:path ex:quantity ;
+        sh:in ( ex:Length ex:Angle ) ;
+        sh:hasValue ex:Length ;
+    ] , [
+        sh:path ex:value ;
+        sh:datatype xsd:double ;
+        sh:property [ sh:path ex:unit ; sh:minCount 1 ] ;
+    ] .
+
+ex:UnitShape a sh:PropertyShape ;
+    sh:targetSubjectsOf ex:unit ;
+    sh:path ex:unit ;
+    sh:nodeKind sh:Literal ;
+    sh:datatype xsd:string ;
+    sh:severity sh:Warning .
+
+ex:DeactivatedShape a sh:NodeShape ;
+    sh:targetClass ex:Frame ;
+    sh:deactivated true ;
+    sh:class ex:Position .
+
+ex:PatternShape a sh:NodeShape ;
+    sh:targetClass ex:Frame ;
+    sh:property [ sh:path ex:name ; sh:pattern "^f" ] .
+
+ex:OrShape a sh:NodeShape ;
+    sh:targetClass ex:Position ;
+    sh:or ( [ sh:class ex:Position ] [ sh:class ex:Frame ] ) .
+"""
+
+UNSUPPORTED_SHAPES = ("PatternShape", "OrShape")
+
+
+def random_graph(rng: random.Random, num_nodes: int) -> Graph:
+    """Graph of frames and positions of which a random part violates the shapes."""
+    graph = Graph()
+    graph.bind("ex", EX)
+    graph.add((EX.SubFrame, RDFS.subClassOf, EX.Frame))
+    frames = [BNode() if rng.random() < 0.1 else EX[f"f{i}"] for i in range(num_nodes)]
+    for i, frame in enumerate(frames):
+        graph.add((frame, RDF.type, rng.choice((EX.Frame, EX.SubFrame))))
+        for _ in range(rng.choice((0, 1, 1, 1, 2))):
+            graph.add((frame, EX.name, rng.choice((Literal(f"f{i}-{rng.random()}"), EX.name))))
+
+    for i in range(num_nodes):
+        position = EX[f"p{i}"]
+        graph.add((position, RDF.type, EX.Position))
+        if rng.random() < 0.9:
+            graph.add((position, EX.of, rng.choice((*frames, EX.Length))))
+        graph.add((position, EX.quantity, rng.choice((EX.Length, EX.Length, EX.Angle, EX.Mass))))
+        value = rng.choice((Literal(rng.random()), Literal(1.0, datatype=XSD.float), position))
+        unit = BNode()
+        graph.add((position, EX.value, unit if rng.random() < 0.2 else value))
+        if rng.random() < 0.5:
+            graph.add((unit, EX.unit, rng.choice((Literal("m"), Literal(1), EX.Meter))))
+    return graph
+
+
+class ShapeCompilerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.shacl_path = join(self.tmp_dir.name, "shapes.ttl")
+        with open(self.shacl_path, "w") as outfile:
+            outfile.write(SHAPES_TTL)
+        self.shacl_dict = {self.shacl_path: "turtle"}
+        self.shacl_graph = Graph().parse(data=SHAPES_TTL, format="turtle")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_compile_shape(self):
+        shapes_graph = pyshacl.ShapesGraph(self.shacl_graph)
+        for shape in shapes_graph.shapes:
+            if shape.node in (EX[name] for name in UNSUPPORTED_SHAPES):
+                self.assertIsNone(compile_shape(shape), shape.node)
+            elif not shape.is_property_shape or shape.node == EX.UnitShape:
+                self.assertIsNotNone(compile_shape(shape), shape.node)
+
+    def test_like_pyshacl(self):
+        rng = random.Random(7)
+        uncompiled = {
+            inference: ShaclValidator(self.shacl_dict, inference=inference)
+            for inference in ("none", "rdfs")
+        }
+        for inference in ("none", "rdfs"):
+            validator = ShaclValidator(self.shacl_dict, inference=inference, compile_shapes=True)
+            for name in ("FrameShape", "PositionShape", "UnitShape", *UNSUPPORTED_SHAPES):
+                self.assertEqual(
+                    EX[name] in validator._compiled_shapes, name not in UNSUPPORTED_SHAPES
+                )
+            for num_nodes in (1, 5, 30):
+                graph = random_graph(rng, num_nodes)
+                conforms, report_graph, report_text = pyshacl.validate(
+                    graph, shacl_graph=self.shacl_graph, inference=inference
+                )
+                report = validator.validate_report(graph)
+                self.assertEqual(report.conforms, conforms)
+                self.assertEqual(report.report_text, report_text)
+                self.assertEqual(len(report.report_graph), len(report_graph))
+
+                # only some focus nodes, like in an incremental validation
+                focus = set(rng.sample(sorted(graph.all_nodes()), 5))
+                reports = [
+                    ShaclReport(v._shapes_graph, v._validate_focus(v._prepare(graph), focus)[0])
+                    for v in (validator, uncompiled[inference])
+                ]
+                self.assertEqual(reports[0].report_text, reports[1].report_text)
+
+
+if __name__ == "__main__":
+    unittest.main()
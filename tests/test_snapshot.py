@@ -0,0 +1,126 @@
+# SPDX-License-Identifier: MPL-2.0
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from os.path import join
+from unittest.mock import patch
+
+from rdflib import RDF, XSD, BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+
+from rdf_utils.caching import GraphCache
+from rdf_utils.snapshot import (
+    dump_graph_snapshot,
+    load_graph_snapshot,
+    loads_graph_snapshot,
+    parse_with_snapshot,
+    save_graph_snapshot,
+)
+
+TEST_MODEL = """
+@prefix ex: <http://example.org/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+ex:frame a ex:Frame ;
+    ex:label "frame"@en, "Rahmen"@de ;
+    ex:value "1.5"^^xsd:double ;
+    ex:index 3 ;
+    ex:origin [ a ex:Point ; ex:coords ( 1.0 2.0 3.0 ) ] ;
+    ex:relative <child> .
+"""
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.model_path = join(self.tmp_dir.name, "model.ttl")
+        with open(self.model_path, "w") as outfile:
+            outfile.write(TEST_MODEL)
+        self.snapshot_dir = join(self.tmp_dir.name, "snapshots")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        graph = Graph()
+        graph.parse(self.model_path, format="turtle")
+        graph.add((BNode(), RDF.value, Literal(2, datatype=XSD.integer)))
+
+        snapshot_path = join(self.snapshot_dir, "model.rdfsnap")
+        save_graph_snapshot(graph, snapshot_path)
+        loaded = load_graph_snapshot(snapshot_path)
+
+        self.assertTrue(isomorphic(graph, loaded))
+        self.assertEqual(set(graph), set(loaded), "blank node IDs should be preserved")
+        self.assertIn(("ex", URIRef("http://example.org/")), set(loaded.namespaces()))
+
+    def test_parse_with_snapshot(self):
+        graph = parse_with_snapshot(self.model_path, "turtle", snapshot_dir=self.snapshot_dir)
+        self.assertEqual(len(os.listdir(self.snapshot_dir)), 1)
+        # relative IRIs are resolved against the file location as with Graph.parse
+        self.assertIn(
+            URIRef(f"file://{os.path.abspath(self.tmp_dir.name)}/child"),
+            set(graph.objects()),
+        )
+
+        with patch.object(Graph, "parse", side_effect=AssertionError("parser used")):
+            loaded = parse_with_snapshot(self.model_path, "turtle", snapshot_dir=self.snapshot_dir)
+        self.assertTrue(isomorphic(graph, loaded))
+
+        # changed content gets a new snapshot
+        with open(self.model_path, "a") as outfile:
+            outfile.write("ex:frame ex:extra true .\n")
+        self.assertEqual(
+            len(parse_with_snapshot(self.model_path, "turtle", snapshot_dir=self.snapshot_dir)),
+            len(graph) + 1,
+        )
+        self.assertEqual(len(os.listdir(self.snapshot_dir)), 2)
+
+    def test_json_ld_contexts(self):
+        # the document loads a context, which loads another one
+        json_ld_path = join(self.tmp_dir.name, "model.json")
+        with open(json_ld_path, "w") as outfile:
+            json.dump({"@context": "context.json", "@id": "ex:frame", "name": "frame"}, outfile)
+        with open(join(self.tmp_dir.name, "context.json"), "w") as outfile:
+            json.dump({"@context": ["prefixes.json", {"name": "ex:name"}]}, outfile)
+        prefixes_path = join(self.tmp_dir.name, "prefixes.json")
+        with open(prefixes_path, "w") as outfile:
+            json.dump({"@context": {"ex": "http://example.org/"}}, outfile)
+
+        graph = parse_with_snapshot(json_ld_path, "json-ld", snapshot_dir=self.snapshot_dir)
+        self.assertIn(URIRef("http://example.org/name"), set(graph.predicates()))
+        self.assertEqual(len(os.listdir(self.snapshot_dir)), 1)
+        with patch.object(Graph, "parse", side_effect=AssertionError("parser used")):
+            loaded = parse_with_snapshot(json_ld_path, "json-ld", snapshot_dir=self.snapshot_dir)
+        self.assertTrue(isomorphic(graph, loaded))
+
+        # a changed context, even if loaded by another context, gets a new snapshot
+        with open(prefixes_path, "w") as outfile:
+            json.dump({"@context": {"ex": "http://example.org/v2/"}}, outfile)
+        graph = parse_with_snapshot(json_ld_path, "json-ld", snapshot_dir=self.snapshot_dir)
+        self.assertIn(URIRef("http://example.org/v2/name"), set(graph.predicates()))
+        self.assertEqual(len(os.listdir(self.snapshot_dir)), 2)
+
+    def test_graph_cache_with_snapshots(self):
+        cache = GraphCache(
+            parse_func=lambda source, fmt: parse_with_snapshot(source, fmt, self.snapshot_dir)
+        )
+        graph = Graph()
+        graph.parse(self.model_path, format="turtle")
+        self.assertEqual(len(cache.get(self.model_path, "turtle")), len(graph))
+        self.assertEqual(len(os.listdir(self.snapshot_dir)), 1)
+
+    def test_invalid_snapshot(self):
+        with self.assertRaises(ValueError):
+            loads_graph_snapshot(b"not a snapshot")
+
+        data = dump_graph_snapshot(Graph())
+        header = data[: data.index(b"\x80")]
+        with self.assertRaises(ValueError):
+            loads_graph_snapshot(header + pickle.dumps(Graph()))
+
+
+if __name__ == "__main__":
+    unittest.main()